@@ -1,19 +1,60 @@
+import time
+STARTED = time.perf_counter()  # startup timing starts before the imports
+
 import os
 import shutil
-from datetime import datetime
+import tempfile
+import importlib
+import queue
+import threading
+import multiprocessing
+import fnmatch
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
-import pyodbc
-import pandas as pd
-import re
-
-from components.components import LabeledEntry
-from tabs.func1_tab import Func1Tab
-from tabs.func2_tab import Func2Tab
-from tabs.func3_tab import Func3Tab
-from tabs.func4_tab import Func4Tab
-from tabs.func5_tab import Func5Tab
-from tabs.func6_tab import Func6Tab
+
+from utils.lazy_import import LazyModule
+from components.components import LabeledEntry, VirtualGrid
+from utils.table_search import TableSearch, ScanSearch
+from utils.search_query import parse, is_plain, compile_where, evaluate, QueryError, CannotPushDown
+from utils.table_cache import TableCache
+from utils.compact import compact_frame, format_bytes, query_column_types, set_cell, unique_columns
+from utils.table_sort import SortCache
+from utils.change_set import ChangeSet
+from utils.bulk_update import bulk_update_diff
+from utils.snapshot import SnapshotStore
+from utils.backup_store import BackupStore, BackupCancelled, MANIFEST_DIR, STORE_ROOT, copy_file, read_manifest
+from utils.backup_index import BackupIndex
+from utils.save_diff import connection_string, diff_saves
+from utils.save_restore import restore_plan, restore_rows
+from utils.connection import ConnectionManager
+from utils.db_executor import DbExecutor
+from utils.events import EventBus, CONNECT, RELOAD, EJECT, TABLE_WRITTEN
+
+# pandas, NumPy and pyodbc are imported on first use, so the window shows before they load
+pyodbc = LazyModule("pyodbc")
+pd = LazyModule("pandas")
+np = LazyModule("numpy")
+
+# Table loading is paged on the primary key: the first page is shown right away, later pages
+# double in size up to PAGE_SIZE_MAX and are fetched from after() callbacks in FETCH_CHUNK chunks
+PAGE_SIZE_FIRST = 500
+PAGE_SIZE_MAX = 20000
+FETCH_CHUNK = 1000
+# Memory cap of the loaded-table cache, in MB
+TABLE_CACHE_MB = 256
+# Startup, tab build and connect timings are only printed with TEW_PAL_TIMINGS=1 set
+PRINT_TIMINGS = os.environ.get("TEW_PAL_TIMINGS") == "1"
+# Notebook tabs as (attribute, module, class, title). Each tab is imported and built the first
+# time it is selected.
+TABS = [
+    ("tab_func1", "tabs.func1_tab", "Func1Tab", "Round Robin Generator"),
+    ("tab_func2", "tabs.func2_tab", "Func2Tab", "Dojo Manager"),
+    ("tab_func3", "tabs.func3_tab", "Func3Tab", "Alliance Manager"),
+    ("tab_func4", "tabs.func4_tab", "Func4Tab", "Pre Book"),
+    ("tab_func5", "tabs.func5_tab", "Func5Tab", "Alliance Manager"),
+    ("tab_func6", "tabs.func6_tab", "Func6Tab", "Alliance Manager"),
+]
+IMPORTED = time.perf_counter()
 
 class MDBApp(tk.Tk):
     """
@@ -29,11 +70,38 @@ class MDBApp(tk.Tk):
         self.title("SWalker's TEW IX Pal")
         self.geometry("1200x800")
 
+        self.db = DbExecutor(self)
+        self.indexer = DbExecutor(self)  # compacts and indexes loaded tables, never touches the connection
+        self.connection = ConnectionManager(self.db)
+        self.events = EventBus()
         self.conn = None
         self.df = None
         self.tables = []
         self.current_table = None
         self.pk_col = None
+        self.search_engine = None
+        self.column_types = {}
+        self.table_complete = False
+        self.sorter = None
+        self.sort_keys = []  # (column, descending), primary key first
+        self.view_mask = None  # mask of the current search result, None shows all rows
+        self.change_set = ChangeSet()
+        self._load_generation = 0
+        self._load_job = None
+        self._index_job = None
+        self._search_job = None
+        self._frame_edits = 0  # cell edits of the browser's DataFrame, an index built meanwhile is stale
+        self.conn_str = None
+        self.table_cache = None
+        self.snapshot = None
+        self._prefetch_queue = queue.Queue()
+        self._prefetching = False
+        self._backup_thread = None
+        self._backup_cancel = None
+        self._backup_copied = None
+        self._backup_queue = queue.Queue()
+        self._connect_pending = False
+        self.last_diff = None
 
         # Backup path variable
         self.backup_path_var = tk.StringVar()
@@ -47,6 +115,12 @@ class MDBApp(tk.Tk):
         self.eject_btn.pack(side=tk.LEFT, padx=5, pady=5)
         self.clear_backups_btn = ttk.Button(self.headercontrol_frame, text="Clear Backups", command=self.clear_backups)
         self.clear_backups_btn.pack(side=tk.LEFT, padx=5, pady=5)
+        self.prune_btn = ttk.Button(self.headercontrol_frame, text="Prune Backups", command=self.prune_backups_dialog)
+        self.prune_btn.pack(side=tk.LEFT, padx=5, pady=5)
+        self.restore_btn = ttk.Button(self.headercontrol_frame, text="Restore Backup", command=self.restore_backup)
+        self.restore_btn.pack(side=tk.LEFT, padx=5, pady=5)
+        self.diff_btn = ttk.Button(self.headercontrol_frame, text="Diff Backup", command=self.diff_backup)
+        self.diff_btn.pack(side=tk.LEFT, padx=5, pady=5)
 
         # Tabs
         self.notebook = ttk.Notebook(self)
@@ -57,29 +131,63 @@ class MDBApp(tk.Tk):
         self.notebook.add(self.tab_general, text="Load Database File")
         self.build_general_tab(self.tab_general)
 
-        # Func1 tab
-        self.tab_func1 = Func1Tab(self.notebook, self)
-        self.notebook.add(self.tab_func1, text="Round Robin Generator")
+        # Function tabs: an empty frame each until the tab is first selected
+        self.tab_frames = {}
+        for attr, _, _, title in TABS:
+            setattr(self, attr, None)
+            frame = ttk.Frame(self.notebook)
+            self.notebook.add(frame, text=title)
+            self.tab_frames[str(frame)] = attr
+        self.notebook.bind("<<NotebookTabChanged>>", self.on_notebook_tab_changed)
 
-        # Func2 tab
-        self.tab_func2 = Func2Tab(self.notebook, self)
-        self.notebook.add(self.tab_func2, text="Dojo Manager")
+    # ------------------ Tabs ------------------
 
-        # Func3 tab
-        self.tab_func3 = Func3Tab(self.notebook, self)
-        self.notebook.add(self.tab_func3, text="Alliance Manager")
+    def on_notebook_tab_changed(self, event=None):
+        """
+        Build a function tab the first time it is selected, or reload it if it went stale while hidden.
+        """
+        attr = self.tab_frames.get(self.notebook.select())
+        if attr is None:
+            return
+        if getattr(self, attr) is None:
+            self.build_tab(attr)
+        else:
+            getattr(self, attr).refresh_if_visible()
 
-        # Func4 tab
-        self.tab_func4 = Func4Tab(self.notebook, self)
-        self.notebook.add(self.tab_func4, text="Pre Book")
+    def build_tab(self, attr):
+        """
+        Import and build the function tab stored in attr, and hand it the connection if there is one.
+        """
+        start = time.perf_counter()
+        frame = next(self.nametowidget(w) for w, a in self.tab_frames.items() if a == attr)
+        _, module, cls, title = next(t for t in TABS if t[0] == attr)
+        tab = getattr(importlib.import_module(module), cls)(frame, self)
+        tab.pack(fill=tk.BOTH, expand=True)
+        setattr(self, attr, tab)
+        if self.conn:
+            tab.on_connect()
+        if PRINT_TIMINGS:
+            print(f"Built tab {title} in {(time.perf_counter() - start) * 1000:.0f} ms")
+        return tab
 
-        # Func5 tab
-        self.tab_func5 = Func5Tab(self.notebook, self)
-        self.notebook.add(self.tab_func5, text="Alliance Manager")
+    def is_tab_visible(self, tab):
+        """
+        Return True if tab is the selected notebook page.
+        """
+        return self.notebook.select() == str(tab.master)
 
-        # Func6 tab
-        self.tab_func6 = Func6Tab(self.notebook, self)
-        self.notebook.add(self.tab_func6, text="Alliance Manager")
+    def report_startup(self, built):
+        """
+        Print how long startup took: imports, building the window and the first paint.
+        """
+        if not PRINT_TIMINGS:
+            return
+        painted = time.perf_counter()
+        print(
+            f"Startup: imports {(IMPORTED - STARTED) * 1000:.0f} ms, "
+            f"window built {(built - IMPORTED) * 1000:.0f} ms, "
+            f"first paint {(painted - STARTED) * 1000:.0f} ms after start"
+        )
 
     # --- General tab ---
     def build_general_tab(self, parent):
@@ -117,6 +225,14 @@ class MDBApp(tk.Tk):
         ttk.Label(backup_frame, text="Last Backup:").pack(side=tk.LEFT)
         self.backup_entry = ttk.Entry(backup_frame, textvariable=self.backup_path_var, state="readonly", width=60)
         self.backup_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        progress_frame = ttk.Frame(parent)
+        progress_frame.pack(fill=tk.X, padx=10)
+        self.backup_progress = ttk.Progressbar(progress_frame, maximum=100, length=200)
+        self.backup_progress.pack(side=tk.LEFT)
+        self.backup_cancel_btn = ttk.Button(progress_frame, text="Cancel Backup", command=self.cancel_backup, state="disabled")
+        self.backup_cancel_btn.pack(side=tk.LEFT, padx=5)
+        self.backup_status_var = tk.StringVar()
+        ttk.Label(progress_frame, textvariable=self.backup_status_var).pack(side=tk.LEFT, padx=5)
 
         # Driver
         driver_frame = ttk.Frame(parent)
@@ -163,17 +279,15 @@ class MDBApp(tk.Tk):
         self.table_combo = ttk.Combobox(table_frame, state="readonly")
         self.table_combo.pack(side=tk.LEFT, fill=tk.X, expand=True)
         self.table_combo.bind("<<ComboboxSelected>>", self.on_table_selected)
+        self.snapshot_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(table_frame, text="Use snapshot cache", variable=self.snapshot_var).pack(side=tk.LEFT, padx=5)
+        ttk.Button(table_frame, text="Build Snapshot", command=self.build_snapshot).pack(side=tk.LEFT, padx=5)
 
-        # Treeview with horizontal and vertical scrollbars
-        tree_frame = ttk.Frame(parent)
-        tree_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-        self.tree = ttk.Treeview(tree_frame, show='headings')
-        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        self.tree_scroll_x = ttk.Scrollbar(tree_frame, orient="horizontal", command=self.tree.xview)
-        self.tree_scroll_x.pack(side=tk.BOTTOM, fill=tk.X)
-        self.tree_scroll_y = ttk.Scrollbar(tree_frame, orient="vertical", command=self.tree.yview)
-        self.tree_scroll_y.pack(side=tk.RIGHT, fill=tk.Y)
-        self.tree.configure(xscrollcommand=self.tree_scroll_x.set, yscrollcommand=self.tree_scroll_y.set)
+        # Virtualized grid (only the visible rows are inserted into the treeview)
+        self.grid_view = VirtualGrid(parent)
+        self.grid_view.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        self.tree = self.grid_view.tree
+        self.tree.bind("<Shift-Button-1>", self.on_heading_shift_click)
 
         # Search bar
         search_frame = ttk.Frame(parent)
@@ -182,8 +296,26 @@ class MDBApp(tk.Tk):
         self.search_var = tk.StringVar()
         search_entry = ttk.Entry(search_frame, textvariable=self.search_var)
         search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        search_entry.bind("<KeyRelease>", self.on_search_typed)
+        search_entry.bind("<Return>", lambda e: self.apply_search())
+        self._search_after_id = None
         ttk.Button(search_frame, text="Go", command=self.apply_search).pack(side=tk.LEFT, padx=5)
         ttk.Button(search_frame, text="Clear", command=self.clear_search).pack(side=tk.LEFT, padx=5)
+        # Only enabled once every row of the table is loaded, see set_table_frame
+        self.bulk_btn = ttk.Button(search_frame, text="Bulk Update", command=self.bulk_update_dialog, state="disabled")
+        self.bulk_btn.pack(side=tk.LEFT, padx=5)
+        self.table_status_var = tk.StringVar()
+        ttk.Label(parent, textvariable=self.table_status_var).pack(fill=tk.X, padx=10)
+
+        # Staged edits: collected in memory and written in one transaction on Apply
+        changes_frame = ttk.Frame(parent)
+        changes_frame.pack(fill=tk.X, padx=10, pady=5)
+        self.stage_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(changes_frame, text="Stage edits", variable=self.stage_var).pack(side=tk.LEFT)
+        ttk.Button(changes_frame, text="Apply Changes", command=self.apply_changes).pack(side=tk.LEFT, padx=5)
+        ttk.Button(changes_frame, text="Discard Changes", command=self.discard_changes).pack(side=tk.LEFT, padx=5)
+        self.changes_var = tk.StringVar()
+        ttk.Label(changes_frame, textvariable=self.changes_var).pack(side=tk.LEFT, padx=5)
 
         # Editable checkbox
         self.editable_var = tk.BooleanVar(value=False)
@@ -201,46 +333,100 @@ class MDBApp(tk.Tk):
     def apply_search(self):
         """
         Apply a search filter to the currently loaded DataFrame and update the treeview.
-        Supports AND/OR and column-specific queries.
+        Supports AND/OR, parentheses, column comparisons (=, <>, <, >, <=, >=), BETWEEN, LIKE and IN.
+        If the table is not loaded in full, the query is compiled to a WHERE clause and run on the
+        connection; queries that can't be pushed down load the table and are filtered in pandas.
         """
         if self.df is None:
             return
         query = self.search_var.get().strip()
+        columns = list(self.df.columns)
         if not query:
-            self.populate_tree()
+            if not self.table_complete and self._load_job is None:
+                if self.resolve_pending_changes():
+                    self.load_table(self.current_table)
+                return
+            self.view_mask = None
+            self.grid_view.set_rows(self.view_rows())
             return
-        df = self.df
-
-        # Split by OR first (case-insensitive)
-        or_parts = re.split(r'\s+OR\s+', query, flags=re.IGNORECASE)
-        result_indices = set()
-
-        for or_part in or_parts:
-            # Split by AND (case-insensitive)
-            and_parts = re.split(r'\s+AND\s+', or_part, flags=re.IGNORECASE)
-            mask = pd.Series([True] * len(df))
-            for cond in and_parts:
-                cond = cond.strip()
-                m = re.match(r"(\w+)\s*=\s*'([^']*)'", cond)
-                if m and m.group(1) in df.columns:
-                    col, val = m.group(1), m.group(2)
-                    mask &= (df[col].astype(str) == val)
-                elif cond:
-                    # General keyword search (any column contains term)
-                    mask &= df.apply(lambda row: cond.lower() in str(row).lower(), axis=1)
-            result_indices |= set(df[mask].index)
-
-        filtered = df.loc[list(result_indices)]
-        self.tree.delete(*self.tree.get_children())
-        for _, row in filtered.iterrows():
-            self.tree.insert("", tk.END, values=list(row))
+        try:
+            node = parse(query, columns)
+        except QueryError:
+            node = None
+        if not self.table_complete:
+            if not self.resolve_pending_changes():
+                return
+            self.cancel_table_load()
+            table, conn, generation = self.current_table, self.conn, self._load_generation
+            try:
+                if node is None:
+                    raise CannotPushDown("Query could not be parsed")
+                where, params = compile_where(node, self.column_types)
+            except CannotPushDown:
+                # Filtered in pandas once the whole table is read
+                self.table_status_var.set(f"Loading {table} to search it...")
+                self._search_job = self.db.submit(
+                    lambda job: pd.read_sql(f"SELECT * FROM [{table}]", conn),
+                    on_done=lambda df: self._search_fetched(generation, df, complete=True),
+                    on_error=lambda e: self._search_failed(generation, e),
+                )
+                return
+            self.table_status_var.set(f"Searching {table}...")
+            self._search_job = self.db.submit(
+                lambda job: pd.read_sql(f"SELECT * FROM [{table}] WHERE {where}", conn, params=params),
+                on_done=lambda df: self._search_fetched(generation, df, complete=False),
+                on_error=lambda e: self._search_failed(generation, e),
+            )
+            return
+        if node is None or is_plain(query, columns):
+            mask = self.search_engine.mask(query)
+        else:
+            mask = evaluate(node, self.search_engine, self.column_types)
+        self.view_mask = mask
+        self.grid_view.set_rows(self.view_rows())
+
+    def _search_fetched(self, generation, df, complete):
+        """
+        Show the rows a search read from the connection. A whole table read for a query that
+        couldn't be pushed down is then searched like any loaded table.
+        """
+        if generation != self._load_generation:
+            return
+        self._search_job = None
+        self.set_table_frame(df, complete=complete)
+        self.populate_tree()
+        if complete:
+            self.apply_search()
+        else:
+            self.table_status_var.set(f"{len(df)} matching rows fetched from {self.current_table}.")
+
+    def _search_failed(self, generation, error):
+        if generation != self._load_generation:
+            return
+        self._search_job = None
+        self.table_status_var.set("")
+        messagebox.showerror("Search Error", str(error))
+
+    def on_search_typed(self, event=None):
+        """
+        Search as you type, debounced so only the last keystroke of a burst runs a query.
+        """
+        if self._search_after_id:
+            self.after_cancel(self._search_after_id)
+            self._search_after_id = None
+        if self.table_complete:  # until the table is loaded, each search is a SQL query on Go/Enter
+            self._search_after_id = self.after(150, self._run_typed_search)
+
+    def _run_typed_search(self):
+        self._search_after_id = None
+        self.apply_search()
 
     def clear_search(self):
         """
         Clear the search bar and repopulate the treeview with all data.
         """
         self.search_var.set("")
-        self.populate_tree()
+        self.apply_search()
 
     def load_file(self):
         """
@@ -260,27 +446,197 @@ class MDBApp(tk.Tk):
             # Custom backup logic for temp folder
             folder, filename = os.path.split(file_path)
             top_folder = os.path.basename(os.path.dirname(folder)) if os.path.basename(folder).lower() == 'temp' else os.path.basename(folder)
-            now = datetime.now().strftime("%Y-%m-%d-%H%M%S")
             if os.path.basename(folder).lower() == 'temp':
-                backup_dir = os.path.join("backups", top_folder, now, "temp")
+                name = os.path.join(top_folder, "temp")
             else:
-                backup_dir = os.path.join("backups", top_folder, now)
-            os.makedirs(backup_dir, exist_ok=True)
-            backup_file = os.path.join(backup_dir, filename)
-            shutil.copy2(file_path, backup_file)
-            self.backup_path_var.set(backup_file)
+                name = top_folder
+            self.start_backup(file_path, name)
+
+    # ------------------ Database Jobs ------------------
+
+    def run_db_job(self, title, fn, *args, on_done=None, wait=False):
+        """
+        Run fn(job, *args) on the database executor behind a modal progress window with a Cancel
+        button, so the window keeps repainting and nothing else uses the connection meanwhile.
+        Writes the job has not committed are rolled back if it fails or is cancelled.
+        on_done(result) is called on the Tk thread when the job succeeds. Returns the Job; with
+        wait, only once the job has finished, processing Tk events in the meantime.
+        """
+        conn = self.conn
+        dialog = tk.Toplevel(self)
+        dialog.title(title)
+        dialog.transient(self)
+        dialog.resizable(False, False)
+        status_var = tk.StringVar(value=f"{title}...")
+        ttk.Label(dialog, textvariable=status_var, width=50).pack(padx=10, pady=(10, 5))
+        bar = ttk.Progressbar(dialog, maximum=100, length=300)
+        bar.pack(padx=10, pady=5)
+
+        def work(job, *job_args):
+            try:
+                return fn(job, *job_args)
+            except BaseException:
+                try:
+                    conn.rollback()
+                except Exception:
+                    pass
+                raise
+
+        def progress(done, total, text):
+            if total:
+                bar["value"] = 100 * done / total
+            if text:
+                status_var.set(text)
+
+        def finish():
+            dialog.grab_release()
+            dialog.destroy()
+
+        def done(result):
+            finish()
+            if on_done:
+                on_done(result)
+
+        def failed(error):
+            finish()
+            messagebox.showerror(title, f"{title} failed, uncommitted changes were rolled back:\n{error}")
+
+        def cancelled():
+            finish()
+            messagebox.showinfo(title, f"{title} was cancelled, uncommitted changes were rolled back.")
+
+        job = self.db.submit(work, *args, on_done=done, on_error=failed, on_progress=progress, on_cancel=cancelled)
+
+        def cancel():
+            job.cancel()
+            status_var.set("Cancelling...")
+
+        ttk.Button(dialog, text="Cancel", command=cancel).pack(pady=(5, 10))
+        dialog.protocol("WM_DELETE_WINDOW", cancel)
+        dialog.grab_set()
+        if wait:
+            self.wait_window(dialog)
+        return job
+
+    # ------------------ Backup ------------------
+
+    def start_backup(self, file_path, name):
+        """
+        Back up the save on a background thread: the file is first copied to a staging snapshot
+        (copy-on-write clone where the filesystem supports it), then the copy is stored as
+        deduplicated chunks. Connecting is deferred only until the snapshot copy exists.
+        """
+        if self._backup_thread is not None and self._backup_thread.is_alive():
+            messagebox.showwarning("Backup running", "Wait for the current backup to finish or cancel it.")
+            return
+        self._backup_cancel = threading.Event()
+        self._backup_copied = threading.Event()
+        self.backup_progress["value"] = 0
+        self.backup_cancel_btn.config(state="normal")
+        self.backup_status_var.set("Starting backup...")
+        args = (file_path, name, self._backup_cancel, self._backup_copied, self._backup_queue)
+        self._backup_thread = threading.Thread(target=self._backup_worker, args=args, daemon=True)
+        self._backup_thread.start()
+        self.after(100, self._poll_backup)
+
+    @staticmethod
+    def _backup_worker(file_path, name, cancel, copied, results):
+        """
+        Copy the save to a staging file and store it in the backup store, reporting through results.
+        """
+        store = BackupStore()
+        staging = os.path.join(store.root, "staging")
+        os.makedirs(staging, exist_ok=True)
+        staged = os.path.join(staging, f"{threading.get_ident()}-{os.path.basename(file_path)}")
+
+        def progress(phase):
+            def report(done, total):
+                if cancel.is_set():
+                    raise BackupCancelled()
+                results.put(("progress", phase, done, total))
+            return report
+
+        try:
+            method = copy_file(file_path, staged, progress("Copying save"))
+            copied.set()
+            results.put(("copied", method))
+            manifest_path, written = store.backup(staged, name, progress("Storing chunks"), source=file_path)
+            results.put(("done", manifest_path, written))
+        except BackupCancelled:
+            results.put(("cancelled",))
+        except Exception as e:
+            results.put(("error", str(e)))
+        finally:
+            copied.set()
+            store.close()
+            if os.path.exists(staged):
+                os.remove(staged)
+
+    def _poll_backup(self):
+        """
+        Apply progress messages of the backup thread to the UI.
+        """
+        while True:
+            try:
+                message = self._backup_queue.get_nowait()
+            except queue.Empty:
+                self.after(100, self._poll_backup)
+                return
+            kind = message[0]
+            if kind == "progress":
+                _, phase, done, total = message
+                percent = 100 * done / total if total else 100
+                self.backup_progress["value"] = percent
+                self.backup_status_var.set(f"{phase}: {percent:.0f}%")
+                continue
+            if kind == "copied":
+                self.backup_status_var.set(f"Save copied ({message[1]}), storing chunks...")
+                self._run_pending_connect()
+                continue
+            if kind == "done":
+                _, manifest_path, written = message
+                if written:
+                    self.backup_path_var.set(manifest_path)
+                    self.backup_status_var.set(f"Backup done, {written / (1024 * 1024):.1f} MB of new chunks.")
+                else:
+                    self.backup_path_var.set(f"{manifest_path} (unchanged since this backup)")
+                    self.backup_status_var.set("Backup done, save unchanged.")
+            elif kind == "cancelled":
+                self.backup_status_var.set("Backup cancelled.")
+            else:
+                self.backup_status_var.set("Backup failed.")
+                messagebox.showerror("Backup Error", f"The backup could not be created:\n{message[1]}")
+            self.backup_progress["value"] = 0
+            self.backup_cancel_btn.config(state="disabled")
+            self._run_pending_connect()
+            return
+
+    def _run_pending_connect(self):
+        if self._connect_pending:
+            self._connect_pending = False
+            self.connect_mdb()
+
+    def cancel_backup(self):
+        """
+        Ask the running backup to stop; chunks already stored are kept for later backups.
+        """
+        if self._backup_cancel is not None:
+            self._backup_cancel.set()
+            self.backup_status_var.set("Cancelling backup...")
 
     def eject_file(self):
         """
         Eject the current database connection and clear all UI fields and tables.
         """
-        # Close DB connection
-        if self.conn:
-            try:
-                self.conn.close()
-            except Exception:
-                pass
-            self.conn = None
+        if not self.resolve_pending_changes():
+            return
+        self.cancel_table_load()
+        # Closed after the jobs already queued on the connection
+        self.db.submit(lambda job: self.connection.close())
+        self.conn = None
+        self.conn_str = None
+        self.table_cache = None
+        self.snapshot = None
 
         # Clear all fields and trees
         self.path_entry.entry.config(state="normal")
@@ -294,20 +650,11 @@ class MDBApp(tk.Tk):
         self.password_entry.entry.config(state="disabled")
         self.password_edit_var.set(False)
         self.table_combo.set("")
-        self.tree.delete(*self.tree.get_children())
-        self.tree["columns"] = []
-        self.tree["show"] = ""
-        if hasattr(self, "tab_func1"):
-            self.tab_func1.participant_tree.delete(*self.tab_func1.participant_tree.get_children())
-            self.tab_func1.combined_tree.delete(*self.tab_func1.combined_tree.get_children())
-            self.tab_func1.tourney_combo.set("")
-            self.tab_func1.match_combo.set("")
-        if hasattr(self, "tab_func2"):
-            self.tab_func2.tree.delete(*self.tab_func2.tree.get_children())
-        if hasattr(self, "tab_func3"):
-            self.tab_func3.member_tree.delete(*self.tab_func3.member_tree.get_children())
-            self.tab_func3.belt_tree.delete(*self.tab_func3.belt_tree.get_children())
-            self.tab_func3.alliance_combo.set("")
+        self.grid_view.clear()
+        self.table_complete = False
+        self.bulk_btn.config(state="disabled")
+        self.table_status_var.set("")
+        self.events.publish(EJECT)
 
         self.connect_btn.config(state="normal")
         self.eject_btn.config(state="disabled")
@@ -315,47 +662,74 @@ class MDBApp(tk.Tk):
     def connect_mdb(self):
         """
         Connect to the selected MDB file using the provided driver and password.
-        Loads available tables and updates tabs with the connection.
         """
-        db_file = self.path_entry.get()
-        driver = self.driver_entry.get()
-        password = self.password_entry.get()
-        if not db_file:
+        if not self.path_entry.get():
             messagebox.showwarning("No file", "Select an MDB file first.")
             return
+        if self._backup_copied is not None and not self._backup_copied.is_set():
+            # The backup reads the live file until its snapshot copy is done
+            self._connect_pending = True
+            self.backup_status_var.set("Connecting once the backup has copied the save...")
+            return
+        self.open_database()
+
+    def open_database(self, event=CONNECT):
+        """
+        Open the file in path_entry through the connection manager, which also prefetches the
+        lookups shared by the tabs, on the database executor. Once it is open, publish event
+        (CONNECT or RELOAD) to the tabs; only the visible tab reloads right away. No table is
+        loaded until one is selected.
+        """
+        db_file = self.path_entry.get()
+        driver, password = self.driver_entry.get(), self.password_entry.get()
+        self.cancel_table_load()
+        self.conn = None
+        self.conn_str = None
+        self.connect_btn.config(state="disabled")
+        self.db.submit(
+            lambda job: self.connection.open(db_file, driver, password),
+            on_done=lambda conn: self._database_opened(db_file, conn, event),
+            on_error=self._database_failed,
+        )
 
+    def _database_opened(self, db_file, conn, event):
         try:
-            conn_str = f'DRIVER={driver};DBQ={db_file};UID={""};PWD={password};'
-            self.conn = pyodbc.connect(conn_str)
-            cursor = self.conn.cursor()
-            self.tables = [row.table_name for row in cursor.tables(tableType="TABLE")]
+            self.conn = conn
+            self.conn_str = self.connection.conn_str
+            start = time.perf_counter()
+            self.table_cache = TableCache(db_file, TABLE_CACHE_MB)
+            self.open_snapshot(db_file)
+            self.connection.timing("caches", start)
+            self.tables = self.connection.tables
             if not self.tables:
+                self.connect_btn.config(state="normal")
                 messagebox.showinfo("No tables", "No tables found in MDB.")
                 return
             self.table_combo["values"] = self.tables
-            self.table_combo.current(0)
-            self.current_table = self.tables[0]
-            self.load_table(self.current_table)
-
-            self.tab_func1.conn = self.conn
-            self.tab_func1.load_tournaments()
-
-            self.tab_func3.reload_alliances(self.conn)
-
-            if hasattr(self, "tab_func4"):
-                self.tab_func4.conn = self.conn
-                self.tab_func4.refresh_tab()
-            if hasattr(self, "tab_func5"):
-                self.tab_func5.conn = self.conn
-                self.tab_func5.refresh()
-            if hasattr(self, "tab_func6"):
-                self.tab_func6.conn = self.conn
-                self.tab_func6.refresh()
-
-            self.connect_btn.config(state="disabled")
+            self.table_combo.set("")
+            self.current_table = None
+            self.df = None
+            self.table_complete = False
+            self.bulk_btn.config(state="disabled")
+            self.sort_keys = []
+            self.grid_view.clear()
+            self.table_status_var.set(f"{len(self.tables)} tables, select one to browse it.")
+            start = time.perf_counter()
+            self.events.publish(event)
+            self.connection.timing("tabs", start)
             self.eject_btn.config(state="normal")
         except Exception as e:
-            messagebox.showerror("Error", f"Could not connect:\n{e}")
+            self._database_failed(e)
+            return
+        if PRINT_TIMINGS:
+            print(f"Connected to {os.path.basename(db_file)}: {self.connection.report()}")
+
+    def _database_failed(self, error):
+        self.db.submit(lambda job: self.connection.close())
+        self.conn = None
+        self.conn_str = None
+        self.connect_btn.config(state="normal")
+        messagebox.showerror("Error", f"Could not connect:\n{error}")
 
     def on_table_selected(self, event=None):
         """
@@ -363,44 +737,438 @@ class MDBApp(tk.Tk):
         """
         table = self.table_combo.get()
         if table:
+            if not self.resolve_pending_changes():
+                self.table_combo.set(self.current_table)
+                return
+            if self.table_cache is not None:
+                self.table_cache.record_switch(self.current_table, table)
             self.current_table = table
+            self.sort_keys = []
             self.load_table(table)
 
     def load_table(self, table):
         """
         Load the selected table from the database into a DataFrame and display it in the treeview.
+        Tables are streamed with keyset pagination on the primary key: the first page is shown
+        right away and later pages are appended as they arrive. Every query runs as a job on the
+        database executor, so the window stays responsive. Until the last page arrives, searches
+        run as SQL on the connection.
+        Fully loaded tables are kept in the table cache, so switching back to them is instant,
+        and read from the on-disk snapshot cache when that is enabled.
         """
-        try:
-            self.df = pd.read_sql(f"SELECT * FROM [{table}]", self.conn)
-            self.pk_col = self.df.columns[0] 
+        self.cancel_table_load()
+        cached = self.table_cache.get(table) if self.table_cache is not None else None
+        if cached is not None:
+            df, engine, self.column_types = cached
+            self.set_table_frame(df, complete=True, engine=engine)
             self.populate_tree()
-        except Exception as e:
-            messagebox.showerror("Error", f"Could not load table {table}:\n{e}")
+            self.prefetch_tables(table)
+            return
+        snap = self.snapshot.get(table) if self.snapshot is not None else None
+        if snap is not None:
+            df, self.column_types = snap
+            self.set_table_frame(df, complete=True)
+            self.populate_tree()
+            self.table_status_var.set(f"{len(df)} rows loaded from the snapshot cache.")
+            return
+        generation = self._load_generation
+        self.table_status_var.set(f"Loading {table}...")
+        self._load_job = self.db.submit(
+            self._table_info, self.conn, table,
+            on_done=lambda info: self._table_info_loaded(table, generation, info),
+            on_error=lambda e: self._table_load_failed(table, generation, e),
+        )
+
+    @staticmethod
+    def _table_info(job, conn, table):
+        """
+        Executor job: return (column types, primary key, whether it is unique, row count) of a table.
+        The key is the first column, unique if unique_columns says so.
+        """
+        column_types = query_column_types(conn, table)
+        pk_col = next(iter(column_types))
+        unique = pk_col in unique_columns(conn, table)
+        cursor = conn.cursor()
+        try:
+            cursor.execute(f"SELECT COUNT(*) FROM [{table}]")
+            total = cursor.fetchone()[0]
+        finally:
+            cursor.close()
+        return column_types, pk_col, unique, total
+
+    def _table_info_loaded(self, table, generation, info):
+        if generation != self._load_generation:
+            return
+        self.column_types, pk_col, unique, total = info
+        if not unique:
+            # Keyset pages would skip duplicate keys, so read the table in one go
+            conn = self.conn
+            self._load_job = self.db.submit(
+                lambda job: pd.read_sql(f"SELECT * FROM [{table}]", conn),
+                on_done=lambda df: self._table_read(generation, df),
+                on_error=lambda e: self._table_load_failed(table, generation, e),
+            )
+            return
+        self.set_table_frame(pd.DataFrame(columns=list(self.column_types)), complete=False)
+        self.populate_tree()
+        self._load_page(table, pk_col, total, generation, None, PAGE_SIZE_FIRST)
+
+    def _table_read(self, generation, df):
+        if generation != self._load_generation:
+            return
+        self._load_job = None
+        self.set_table_frame(df, complete=True)
+        self.populate_tree()
+
+    def _table_load_failed(self, table, generation, error):
+        if generation != self._load_generation:
+            return
+        self._load_job = None
+        self.table_status_var.set("")
+        messagebox.showerror("Error", f"Could not load table {table}:\n{error}")
+
+    def _load_page(self, table, pk_col, total, generation, last_key, size):
+        """
+        Fetch the next keyset page of a streamed table on the executor.
+        """
+        self._load_job = self.db.submit(
+            self._fetch_page, self.conn, table, pk_col, last_key, size,
+            on_done=lambda page: self._page_loaded(table, pk_col, total, generation, size, *page),
+            on_error=lambda e: self._table_load_failed(table, generation, e),
+        )
+
+    @staticmethod
+    def _fetch_page(job, conn, table, pk_col, last_key, size):
+        """
+        Executor job: return the next page of a table after last_key as a DataFrame, and the key
+        of its last row.
+        """
+        cursor = conn.cursor()
+        try:
+            if last_key is None:
+                cursor.execute(f"SELECT TOP {size} * FROM [{table}] ORDER BY [{pk_col}]")
+            else:
+                cursor.execute(f"SELECT TOP {size} * FROM [{table}] WHERE [{pk_col}] > ? ORDER BY [{pk_col}]", (last_key,))
+            columns = [d[0] for d in cursor.description]
+            rows = []
+            while True:
+                job.check()
+                chunk = cursor.fetchmany(FETCH_CHUNK)
+                if not chunk:
+                    break
+                rows.extend(tuple(r) for r in chunk)
+        finally:
+            cursor.close()
+        next_key = rows[-1][columns.index(pk_col)] if rows else None
+        return pd.DataFrame.from_records(rows, columns=columns, coerce_float=True), next_key
+
+    def _page_loaded(self, table, pk_col, total, generation, size, page, next_key):
+        """
+        Append a fetched page to the table browser and request the next one.
+        """
+        if generation != self._load_generation:
+            return
+        self._load_job = None
+        df = page if self.df.empty else pd.concat([self.df, page], ignore_index=True)
+        if len(page) < size:
+            self.set_table_frame(df, complete=True)
+            self.grid_view.extend(self.df, self.view_rows())
+            return
+        self.df = df
+        self.sorter = SortCache(df)
+        self.grid_view.extend(df, self.view_rows())
+        self.table_status_var.set(f"Loading {table}: {len(df)} of {total} rows...")
+        self._load_page(table, pk_col, total, generation, next_key, min(size * 2, PAGE_SIZE_MAX))
+
+    def cancel_table_load(self):
+        """
+        Stop streaming the current table, pending pages are dropped.
+        """
+        self._load_generation += 1
+        if self._load_job is not None:
+            self._load_job.cancel()
+            self._load_job = None
+        if self._index_job is not None:
+            self._index_job.cancel()
+            self._index_job = None
+        if self._search_job is not None:
+            self._search_job.cancel()
+            self._search_job = None
+
+    def set_table_frame(self, df, complete, engine=None):
+        """
+        Set the DataFrame of the table browser.
+        complete tells whether df holds every row of the table. A complete table without an engine
+        is compacted to smaller dtypes and indexed on the indexer thread, meanwhile searches scan
+        the rows; once the index is swapped in, the table is put into the table cache.
+        """
+        self.df = df
+        self.pk_col = self.df.columns[0]
+        self.table_complete = complete
+        self.bulk_btn.config(state="normal" if complete else "disabled")
+        self.sorter = SortCache(df)
+        self.view_mask = None
+        self.search_engine = None
+        if not complete:
+            return
+        if engine is not None:
+            self._table_frame_ready(engine, f"{len(df)} rows loaded.", cached=True)
+            return
+        self.search_engine = ScanSearch(df)
+        self.table_status_var.set(f"{len(df)} rows loaded, building the search index...")
+        self._build_index()
+
+    def _build_index(self):
+        generation = self._load_generation
+        edits = self._frame_edits
+        # A copy, as cells may be edited on the Tk thread while the indexer reads it
+        self._index_job = self.indexer.submit(
+            self._index_frame, self.df.copy(), self.column_types,
+            on_done=lambda result: self._index_built(generation, edits, result),
+            on_error=lambda e: print(f"Indexing {self.current_table} failed: {e}"),
+        )
+
+    @staticmethod
+    def _index_frame(job, df, column_types):
+        """
+        Indexer job: return the compacted DataFrame, its search index and the memory before and after.
+        """
+        df, before, after = compact_frame(df, column_types)
+        job.check()
+        return df, TableSearch(df), before, after
+
+    def _index_built(self, generation, edits, result):
+        if generation != self._load_generation:
+            return
+        self._index_job = None
+        if edits != self._frame_edits:
+            self._build_index()  # cells were edited while indexing, index the edited frame again
+            return
+        df, engine, before, after = result
+        self.df = df
+        self.sorter = SortCache(df)
+        self.grid_view.extend(df, self.view_rows())
+        self._table_frame_ready(engine, f"{len(df)} rows loaded ({format_bytes(before)} -> {format_bytes(after)} in memory).", cached=False)
+
+    def _table_frame_ready(self, engine, status, cached):
+        """
+        Use engine to search the complete table and keep the table in the snapshot and, unless
+        it came from there (cached), in the table cache.
+        """
+        self.search_engine = engine
+        if not cached and self.table_cache is not None:
+            self.table_cache.put(self.current_table, self.df, engine, self.column_types)
+            self.prefetch_tables(self.current_table)
+        if self.snapshot is not None and self.current_table not in self.snapshot:
+            try:
+                self.snapshot.put(self.current_table, self.df, self.column_types)
+            except Exception as e:
+                print(f"Snapshot of {self.current_table} failed: {e}")
+        self.table_status_var.set(status)
+
+    def notify_table_written(self, *tables, in_place=False):
+        """
+        Called after the app commits writes to the given tables, drops them from the table cache
+        and the snapshot and publishes TABLE_WRITTEN to the tabs. in_place tells that the browser's
+        DataFrame was edited along with the database, so its table cache entry is still valid.
+        """
+        if self.table_cache is not None:
+            self.table_cache.written(*([] if in_place else tables))
+        if self.snapshot is not None:
+            self.snapshot.written(*tables)
+        self.connection.written(*tables)
+        if self.connection.uids is not None:
+            self.connection.uids.written()
+        self.events.publish(TABLE_WRITTEN, tables=tables)
+
+    def snapshot_table(self, table):
+        """
+        Return a table from the snapshot cache for read-only use, or None if it isn't available.
+        """
+        if self.snapshot is None:
+            return None
+        cached = self.snapshot.get(table)
+        return cached[0] if cached is not None else None
+
+    # ------------------ Snapshot ------------------
+
+    def open_snapshot(self, db_file):
+        """
+        Open the snapshot cache of the connected file if it is enabled.
+        """
+        self.snapshot = None
+        if self.snapshot_var.get():
+            try:
+                self.snapshot = SnapshotStore(db_file)
+            except OSError as e:
+                messagebox.showwarning("Snapshot", f"Snapshot cache not available:\n{e}")
+
+    def build_snapshot(self):
+        """
+        Export every table that isn't in the snapshot yet, one executor job per table.
+        """
+        if not self.conn:
+            messagebox.showerror("Error", "Connect to a database first.")
+            return
+        if not self.snapshot_var.get():
+            self.snapshot_var.set(True)
+        if self.snapshot is None:
+            self.open_snapshot(self.path_entry.get())
+            if self.snapshot is None:
+                return
+        pending = [t for t in self.tables if t not in self.snapshot]
+        self._snapshot_next(self.snapshot, pending, len(pending))
+
+    def _snapshot_next(self, snapshot, pending, total):
+        if snapshot is not self.snapshot:
+            return  # ejected or reconnected
+        if not pending:
+            self.table_status_var.set(f"Snapshot complete, {len(self.tables)} tables cached.")
+            return
+        table = pending.pop(0)
+        self.table_status_var.set(f"Snapshot: exporting {table} ({total - len(pending)} of {total})...")
+        version = snapshot.version
+
+        def done(result):
+            if snapshot is self.snapshot and snapshot.version == version:
+                try:
+                    snapshot.put(table, *result)
+                except Exception as e:
+                    print(f"Snapshot of {table} failed: {e}")
+            self._snapshot_next(snapshot, pending, total)
+
+        def failed(error):
+            print(f"Snapshot of {table} failed: {error}")
+            self._snapshot_next(snapshot, pending, total)
+
+        self.db.submit(
+            self._snapshot_table, self.conn, table,
+            on_done=done, on_error=failed,
+        )
+
+    @staticmethod
+    def _snapshot_table(job, conn, table):
+        """
+        Executor job: return a table's compacted DataFrame and column types for the snapshot.
+        """
+        column_types = query_column_types(conn, table)
+        df, _, _ = compact_frame(pd.read_sql(f"SELECT * FROM [{table}]", conn), column_types)
+        return df, column_types
+
+    # ------------------ Prefetching ------------------
+
+    def prefetch_tables(self, table):
+        """
+        Load the tables usually opened after the given one into the table cache,
+        on a background thread with its own connection.
+        """
+        if self.table_cache is None or self._prefetching:
+            return
+        tables = self.table_cache.likely_next(table)
+        if not tables:
+            return
+        self._prefetching = True
+        args = (self.conn_str, tables, self.table_cache, self.table_cache.version, self._prefetch_queue)
+        threading.Thread(target=self._prefetch_worker, args=args, daemon=True).start()
+        self.after(200, self._poll_prefetch)
+
+    @staticmethod
+    def _prefetch_worker(conn_str, tables, cache, version, results):
+        """
+        Read whole tables and build their search index off the UI thread.
+        """
+        try:
+            conn = pyodbc.connect(conn_str)
+            try:
+                for table in tables:
+                    column_types = query_column_types(conn, table)
+                    df, _, _ = compact_frame(pd.read_sql(f"SELECT * FROM [{table}]", conn), column_types)
+                    results.put((cache, version, table, df, TableSearch(df), column_types))
+            finally:
+                conn.close()
+        except Exception:
+            pass  # prefetching is best effort, the table is loaded normally when opened
+        results.put(None)
+
+    def _poll_prefetch(self):
+        """
+        Move prefetched tables into the table cache. Results are dropped if the file was
+        reconnected or written since the prefetch started.
+        """
+        while True:
+            try:
+                item = self._prefetch_queue.get_nowait()
+            except queue.Empty:
+                self.after(200, self._poll_prefetch)
+                return
+            if item is None:
+                self._prefetching = False
+                return
+            cache, version, table, df, engine, column_types = item
+            if cache is self.table_cache and cache.get(table) is None and cache.version == version:
+                cache.put(table, df, engine, column_types)
 
     def populate_tree(self):
         """
         Populate the treeview with the current DataFrame.
+        Only the visible window of rows is rendered by the virtual grid.
         """
-        self.tree.delete(*self.tree.get_children())
         self.tree["columns"] = list(self.df.columns)
         self.tree["show"] = "headings"
+        self.sort_keys = [key for key in self.sort_keys if key[0] in self.df.columns]
         for col in self.df.columns:
-            self.tree.heading(col, text=col, command=lambda c=col: self.sort_by_column(c, False))
+            self.tree.heading(col, text=self._heading_text(col), command=lambda c=col: self.sort_by_column(c))
             self.tree.column(col, width=220)  
-        for _, row in self.df.iterrows():
-            self.tree.insert("", tk.END, values=list(row))
+        self.grid_view.set_data(self.df, self.view_rows())
         if hasattr(self, 'editable_var') and self.editable_var.get():
             self.tree.bind("<Double-1>", self.on_double_click)
         else:
             self.tree.unbind("<Double-1>")
 
-    def sort_by_column(self, col, reverse):
+    def view_rows(self):
         """
-        Sort the DataFrame by the given column and update the treeview.
+        Return the positional rows shown in the grid: the search result in the current sort order.
         """
-        self.df.sort_values(by=col, ascending=not reverse, inplace=True, kind='mergesort')
-        self.populate_tree()
-        self.tree.heading(col, command=lambda: self.sort_by_column(col, not reverse))
+        if self.sort_keys:
+            order = self.sorter.order(self.sort_keys)
+            return order if self.view_mask is None else order[self.view_mask[order]]
+        return range(len(self.df)) if self.view_mask is None else np.flatnonzero(self.view_mask)
+
+    def _heading_text(self, col):
+        for i, (key, descending) in enumerate(self.sort_keys):
+            if key == col:
+                number = i + 1 if len(self.sort_keys) > 1 else ""
+                return f"{col} {'▼' if descending else '▲'}{number}"
+        return col
+
+    def sort_by_column(self, col, add=False):
+        """
+        Sort the table browser by the given column, clicking the sort column again reverses it.
+        With add (Shift+click) the column becomes an extra sort key, or is reversed if it already is one.
+        The DataFrame is not reordered: the grid shows its rows through a cached permutation.
+        """
+        if add:
+            if col in dict(self.sort_keys):
+                self.sort_keys = [(c, not d if c == col else d) for c, d in self.sort_keys]
+            else:
+                self.sort_keys.append((col, False))
+        elif self.sort_keys == [(col, False)]:
+            self.sort_keys = [(col, True)]
+        else:
+            self.sort_keys = [(col, False)]
+        for c in self.df.columns:
+            self.tree.heading(c, text=self._heading_text(c))
+        self.grid_view.set_rows(self.view_rows())
+
+    def on_heading_shift_click(self, event):
+        """
+        Shift+click on a column heading adds it as a secondary sort key.
+        """
+        if self.df is None or self.tree.identify_region(event.x, event.y) != "heading":
+            return
+        col_index = int(self.tree.identify_column(event.x).replace("#", "")) - 1
+        self.sort_by_column(self.df.columns[col_index], add=True)
+        return "break"
 
     def on_double_click(self, event):
         """
@@ -422,27 +1190,215 @@ class MDBApp(tk.Tk):
         def save_edit(event):
             new_val = entry.get()
             entry.destroy()
-            values = list(self.tree.item(item_id, "values"))
-            values[col_index] = new_val
-            self.tree.item(item_id, values=values)
-            row_idx = self.tree.index(item_id)
-            self.df.iat[row_idx, col_index] = new_val
-            try:
-                pk_val = self.df.iat[row_idx, 0]
-                sql = f"UPDATE [{self.current_table}] SET [{col_name}] = ? WHERE [{self.pk_col}] = ?"
-                cursor = self.conn.cursor()
-                cursor.execute(sql, (new_val, pk_val))
-                self.conn.commit()
-            except Exception as e:
-                messagebox.showerror("Update Error", str(e))
+            row_idx = self.grid_view.row_at(item_id)
+            if row_idx is None:
+                return
+            original = self.df.iat[row_idx, col_index]
+            pk_val = self.df.iat[row_idx, 0]
+            pk_val = pk_val.item() if hasattr(pk_val, "item") else pk_val  # NumPy scalar of a compacted column
+            new_val = self.set_browser_cell(row_idx, col_index, new_val)
+            if self.stage_var.get():
+                self.change_set.stage(row_idx, col_index, col_name, pk_val, original, new_val)
+                self.update_changes_view()
+                return
+            table, conn, df = self.current_table, self.conn, self.df
+            sql = f"UPDATE [{table}] SET [{col_name}] = ? WHERE [{self.pk_col}] = ?"
+
+            def write(job):
+                cursor = conn.cursor()
+                try:
+                    cursor.execute(sql, (new_val, pk_val))
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+                finally:
+                    cursor.close()
+
+            def failed(error):
+                # Show the value the save still holds; the cached frame has the edit, so drop it
+                if self.df is df:
+                    self.set_browser_cell(row_idx, col_index, original)
+                if self.table_cache is not None:
+                    self.table_cache.invalidate(table)
+                messagebox.showerror("Update Error", str(error))
+
+            self.db.submit(
+                write,
+                on_done=lambda _: self.notify_table_written(table, in_place=True),
+                on_error=failed,
+            )
 
         entry.bind("<Return>", save_edit)
         entry.bind("<FocusOut>", lambda e: entry.destroy())
 
+    def set_browser_cell(self, row, col_index, value):
+        """
+        Set a cell of the table browser's DataFrame and keep the search index, sort cache and grid in sync.
+        Returns the value as stored in the DataFrame.
+        """
+        col_name = self.df.columns[col_index]
+        value = set_cell(self.df, row, col_index, value)
+        self._frame_edits += 1
+        if self.search_engine:
+            self.search_engine.update_cell(row, col_name, value)
+        self.sorter.invalidate(col_name)
+        self.grid_view.refresh_row(row)
+        return value
+
+    # ------------------ Bulk Update ------------------
+
+    def bulk_update_dialog(self):
+        """
+        Open a dialog to set one column for every row of the current search result.
+        The value is a constant or an expression over other columns, evaluated vectorized;
+        the changed rows are previewed and written in one transaction.
+        """
+        if self.df is None or not self.conn:
+            messagebox.showerror("Error", "Load a table first.")
+            return
+        if not self.table_complete:
+            # The search result would only cover the rows loaded so far
+            messagebox.showinfo("Loading", f"Wait until {self.current_table} is fully loaded.")
+            return
+        if not self.resolve_pending_changes():
+            return
+        rows = self.view_rows()
+        columns = [c for c in self.df.columns if c != self.pk_col]
+        dialog = tk.Toplevel(self)
+        dialog.title(f"Bulk Update {self.current_table}")
+        dialog.geometry("640x480")
+        ttk.Label(dialog, text=f"Update {len(rows)} rows of the current search result.").pack(padx=10, pady=5, anchor="w")
+
+        form = ttk.Frame(dialog)
+        form.pack(fill=tk.X, padx=10, pady=5)
+        ttk.Label(form, text="Column:").pack(side=tk.LEFT)
+        col_combo = ttk.Combobox(form, values=columns, state="readonly", width=25)
+        col_combo.pack(side=tk.LEFT, padx=5)
+        ttk.Label(form, text="New value:").pack(side=tk.LEFT)
+        expr_entry = ttk.Entry(form)
+        expr_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        ttk.Label(dialog, text="A constant (0, 'Tokyo') or an expression over other columns (Popularity + 5).").pack(padx=10, anchor="w")
+
+        preview = VirtualGrid(dialog)
+        preview.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        summary_var = tk.StringVar()
+        ttk.Label(dialog, textvariable=summary_var).pack(padx=10, anchor="w")
+        state = {"diff": None, "col": None}
+
+        def show_preview():
+            col = col_combo.get()
+            if not col:
+                messagebox.showwarning("Missing", "Select a column.", parent=dialog)
+                return
+            try:
+                diff = bulk_update_diff(self.df, rows, col, expr_entry.get())
+            except ValueError as e:
+                messagebox.showerror("Expression Error", str(e), parent=dialog)
+                return
+            state["diff"], state["col"] = diff, col
+            shown = diff[["pk", "old", "new"]].rename(columns={"pk": self.pk_col, "old": f"Old {col}", "new": f"New {col}"})
+            preview.tree["columns"] = list(shown.columns)
+            preview.tree["show"] = "headings"
+            for c in shown.columns:
+                preview.tree.heading(c, text=c)
+                preview.tree.column(c, width=180)
+            preview.set_data(shown)
+            summary_var.set(f"{len(diff)} of {len(rows)} rows change.")
+
+        def apply():
+            diff, col = state["diff"], state["col"]
+            if diff is None or col != col_combo.get():
+                show_preview()
+                diff, col = state["diff"], state["col"]
+                if diff is None:
+                    return
+            if diff.empty:
+                messagebox.showinfo("Nothing to do", "No row changes.", parent=dialog)
+                return
+            if not messagebox.askyesno("Confirm", f"Write {len(diff)} changed rows to {self.current_table}?", parent=dialog):
+                return
+            col_index = self.df.columns.get_loc(col)
+            changes = ChangeSet()
+            for row, pk, old, new in diff.itertuples(index=False, name=None):
+                changes.stage(row, col_index, col, pk, old, new)
+            table, conn, pk_col = self.current_table, self.conn, self.pk_col
+
+            def applied(count):
+                for row, new in zip(diff["row"], diff["new"]):
+                    self.set_browser_cell(int(row), col_index, new)
+                self.notify_table_written(table, in_place=True)
+                self.table_status_var.set(f"{count} rows of {col} updated in {table}.")
+                dialog.destroy()
+
+            self.run_db_job("Bulk update", lambda job: changes.apply(conn, table, pk_col), on_done=applied)
+
+        buttons = ttk.Frame(dialog)
+        buttons.pack(pady=5)
+        ttk.Button(buttons, text="Preview", command=show_preview).pack(side=tk.LEFT, padx=5)
+        ttk.Button(buttons, text="Apply", command=apply).pack(side=tk.LEFT, padx=5)
+        ttk.Button(buttons, text="Cancel", command=dialog.destroy).pack(side=tk.LEFT, padx=5)
+
+    # ------------------ Staged Changes ------------------
+
+    def update_changes_view(self):
+        """
+        Highlight the rows with staged edits and show their count.
+        """
+        self.grid_view.set_highlighted(self.change_set.rows())
+        self.changes_var.set(f"{len(self.change_set)} staged edits" if len(self.change_set) else "")
+
+    def apply_changes(self, wait=False):
+        """
+        Write the staged edits grouped by column in one transaction, as a database job.
+        Nothing is written if any row fails. With wait, returns True once the edits are written.
+        """
+        if not len(self.change_set):
+            return True
+        table, conn, pk_col = self.current_table, self.conn, self.pk_col
+        written = []
+
+        def applied(count):
+            written.append(count)
+            self.notify_table_written(table, in_place=True)
+            self.update_changes_view()
+            self.table_status_var.set(f"{count} cells written to {table}.")
+
+        self.run_db_job("Applying changes", lambda job: self.change_set.apply(conn, table, pk_col), on_done=applied, wait=wait)
+        return bool(written)
+
+    def discard_changes(self):
+        """
+        Drop the staged edits and restore the original values, without touching the database.
+        """
+        for row, col_index, original in self.change_set.discard():
+            self.set_browser_cell(row, col_index, original)
+        self.update_changes_view()
+
+    def resolve_pending_changes(self):
+        """
+        Ask whether to apply or discard staged edits before the browsed table is replaced.
+        Returns False if the user cancelled or applying failed.
+        """
+        if not len(self.change_set):
+            return True
+        answer = messagebox.askyesnocancel(
+            "Pending changes", f"Apply {len(self.change_set)} staged edits to {self.current_table}?"
+        )
+        if answer is None:
+            return False
+        if answer:
+            return self.apply_changes(wait=True)
+        self.discard_changes()
+        return True
+
     def clear_backups(self):
         """
         Clear the backups folder after confirmation.
         """
+        if self._backup_thread is not None and self._backup_thread.is_alive():
+            messagebox.showwarning("Backup running", "Wait for the current backup to finish or cancel it.")
+            return
         if messagebox.askyesno("Are you sure?", "Are you sure you want to delete all backups?"):
             backup_dir = os.path.join(os.getcwd(), "backups")
             if os.path.exists(backup_dir):
@@ -451,53 +1407,280 @@ class MDBApp(tk.Tk):
             else:
                 messagebox.showinfo("No Backups", "No backups folder found.")
 
-    def reload_mdb(self):
+    def prune_backups_dialog(self):
         """
-        Disconnects the current MDB connection and reconnects to the file in the path_entry field.
+        Open a dialog to apply the backup retention policies: keep the last N backups of each save,
+        one per day for D days, and delete the oldest until the backups fit a size cap.
         """
-        # Close current connection if open
-        if self.conn:
+        if self._backup_thread is not None and self._backup_thread.is_alive():
+            messagebox.showwarning("Backup running", "Wait for the current backup to finish or cancel it.")
+            return
+        index = BackupIndex()
+        count = len(index.backups())
+        total = index.total_stored()
+        index.close()
+        dialog = tk.Toplevel(self)
+        dialog.title("Prune Backups")
+        ttk.Label(dialog, text=f"{count} backups using {total / (1024 * 1024):.1f} MB.").grid(row=0, column=0, columnspan=2, padx=10, pady=5)
+        fields = {}
+        for row, (key, label, default) in enumerate([
+            ("keep_last", "Keep last N backups per save:", "10"),
+            ("daily_days", "Keep one per day for D days:", "7"),
+            ("max_mb", "Total size cap in MB (empty = none):", ""),
+        ], start=1):
+            ttk.Label(dialog, text=label).grid(row=row, column=0, sticky="w", padx=10, pady=2)
+            var = tk.StringVar(value=default)
+            ttk.Entry(dialog, textvariable=var, width=10).grid(row=row, column=1, padx=10, pady=2)
+            fields[key] = var
+
+        def prune():
             try:
-                self.conn.close()
-            except Exception:
-                pass
-            self.conn = None
-        # Reconnect using the current path_entry
-        db_file = self.path_entry.get()
-        driver = self.driver_entry.get()
-        password = self.password_entry.get()
-        if not db_file:
-            messagebox.showwarning("No file", "Select an MDB file first.")
+                values = {k: int(v.get()) if v.get().strip() else None for k, v in fields.items()}
+            except ValueError:
+                messagebox.showerror("Invalid value", "Enter whole numbers.", parent=dialog)
+                return
+            max_bytes = values["max_mb"] * 1024 * 1024 if values["max_mb"] is not None else None
+            index = BackupIndex()
+            try:
+                deleted, reclaimed = index.prune(values["keep_last"], values["daily_days"], max_bytes)
+            finally:
+                index.close()
+            dialog.destroy()
+            messagebox.showinfo("Backups Pruned", f"Deleted {deleted} backups, reclaimed {reclaimed / (1024 * 1024):.1f} MB.")
+
+        ttk.Button(dialog, text="Prune", command=prune).grid(row=4, column=0, pady=10)
+        ttk.Button(dialog, text="Cancel", command=dialog.destroy).grid(row=4, column=1, pady=10)
+
+    def restore_backup(self):
+        """
+        Restore a backup chosen by its manifest to a file, verified by checksum.
+        The database must not be connected while restoring.
+        """
+        if self.conn:
+            messagebox.showwarning("Connected", "Eject the database before restoring a backup.")
+            return
+        manifest_path = filedialog.askopenfilename(
+            initialdir=MANIFEST_DIR if os.path.isdir(MANIFEST_DIR) else None,
+            filetypes=[("Backup manifest", "*.json")],
+            title="Select a backup"
+        )
+        if not manifest_path:
+            return
+        manifest = read_manifest(manifest_path)
+        destination = filedialog.asksaveasfilename(
+            initialdir=os.path.dirname(manifest["source"]),
+            initialfile=manifest["filename"],
+            filetypes=[("Access Database", "*.mdb;*.accdb")],
+            title="Restore backup to"
+        )
+        if not destination:
             return
         try:
-            conn_str = f'DRIVER={driver};DBQ={db_file};UID={""};PWD={password};'
-            self.conn = pyodbc.connect(conn_str)
-            cursor = self.conn.cursor()
-            self.tables = [row.table_name for row in cursor.tables(tableType="TABLE")]
-            if not self.tables:
-                messagebox.showinfo("No tables", "No tables found in MDB.")
+            with BackupStore() as store:
+                store.restore(manifest_path, destination)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Restore Error", f"The backup could not be restored:\n{e}")
+            return
+        messagebox.showinfo("Restored", f"Backup from {manifest['created']} restored to {destination}.")
+
+    # ------------------ Backup Diff ------------------
+
+    @staticmethod
+    def remove_staged(staged):
+        """
+        Remove the staged copy of a backup diff together with its directory; staged may be None.
+        """
+        if staged:
+            shutil.rmtree(os.path.dirname(staged), ignore_errors=True)
+
+    def diff_backup(self):
+        """
+        Compare every table of the connected save with a backup, row by row.
+        The backup is restored to a staging file and diffed on a background thread,
+        which runs one table per worker process.
+        """
+        if not self.conn:
+            messagebox.showerror("Error", "Connect to a database first.")
+            return
+        path = filedialog.askopenfilename(
+            initialdir=MANIFEST_DIR if os.path.isdir(MANIFEST_DIR) else None,
+            filetypes=[("Backup", "*.json;*.mdb;*.accdb")],
+            title="Select a backup to compare with"
+        )
+        if not path:
+            return
+        staged = None
+        if path.endswith(".json"):
+            # Each diff gets its own directory, so two open diffs never share a staged copy
+            os.makedirs(os.path.join(STORE_ROOT, "staging"), exist_ok=True)
+            staging = tempfile.mkdtemp(prefix="diff-", dir=os.path.join(STORE_ROOT, "staging"))
+            staged = os.path.join(staging, "backup")
+            try:
+                staged = os.path.join(staging, os.path.basename(read_manifest(path)["filename"]))
+                with BackupStore() as store:
+                    store.restore(path, staged)
+            except (OSError, ValueError) as e:
+                self.remove_staged(staged)
+                messagebox.showerror("Diff Error", f"The backup could not be read:\n{e}")
                 return
-            self.table_combo["values"] = self.tables
-            self.table_combo.current(0)
-            self.current_table = self.tables[0]
-            self.load_table(self.current_table)
-            self.tab_func1.conn = self.conn
-            self.tab_func1.load_tournaments()
-            self.tab_func3.reload_alliances(self.conn)
-            if hasattr(self, "tab_func4"):
-                self.tab_func4.conn = self.conn
-                self.tab_func4.refresh_tab()
-            if hasattr(self, "tab_func5"):
-                self.tab_func5.conn = self.conn
-                self.tab_func5.refresh()
-            if hasattr(self, "tab_func6"):
-                self.tab_func6.conn = self.conn
-                self.tab_func6.refresh()
-            self.connect_btn.config(state="disabled")
-            self.eject_btn.config(state="normal")
-        except Exception as e:
-            messagebox.showerror("Error", f"Could not reconnect:\n{e}")
+        backup_file = staged or path
+        driver, password = self.driver_entry.get(), self.password_entry.get()
+        live = connection_string(driver, self.path_entry.get(), password)
+        backup = connection_string(driver, backup_file, password)
+        results = queue.Queue()
+        tables = list(self.tables)
+
+        def work():
+            try:
+                results.put(("done", diff_saves(live, backup, tables, progress=lambda d, t: results.put(("progress", d, t)))))
+            except Exception as e:
+                results.put(("error", str(e)))
+
+        def poll():
+            while True:
+                try:
+                    message = results.get_nowait()
+                except queue.Empty:
+                    self.after(200, poll)
+                    return
+                if message[0] == "progress":
+                    self.table_status_var.set(f"Comparing with backup: {message[1]} of {message[2]} tables...")
+                    continue
+                if message[0] == "error":
+                    self.table_status_var.set("")
+                    self.remove_staged(staged)
+                    messagebox.showerror("Diff Error", message[1])
+                    return
+                # The staged copy is kept while the diff is shown, to restore rows from it
+                self.last_diff = {"backup": path, "file": backup_file, "staged": staged, "results": message[1]}
+                self.table_status_var.set("")
+                self.show_diff(self.last_diff)
+                return
+
+        self.table_status_var.set("Comparing with backup...")
+        threading.Thread(target=work, daemon=True).start()
+        self.after(200, poll)
+
+    def show_diff(self, diff):
+        """
+        Show a backup diff: one node per changed table with its added, removed and modified rows.
+        Selected tables or rows can be restored from the backup into the live save.
+        """
+        results = diff["results"]
+        dialog = tk.Toplevel(self)
+        dialog.title(f"Diff with {os.path.basename(diff['backup'])}")
+        dialog.geometry("800x600")
+        changed = [r for r in results.values() if r["status"] != "same"]
+        ttk.Label(dialog, text=f"{len(results) - len(changed)} tables unchanged, {len(changed)} changed.").pack(padx=10, pady=5, anchor="w")
+        select_frame = ttk.Frame(dialog)
+        select_frame.pack(fill=tk.X, padx=10)
+        pattern_entry = LabeledEntry(select_frame, "Select tables (e.g. tblPreBooking*):")
+        pattern_entry.pack(side=tk.LEFT)
+        frame = ttk.Frame(dialog)
+        frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        tree = ttk.Treeview(frame, columns=["detail"], show="tree headings", selectmode="extended")
+        tree.heading("#0", text="Table / Row")
+        tree.heading("detail", text="Change")
+        tree.column("#0", width=260)
+        tree.column("detail", width=500)
+        scroll = ttk.Scrollbar(frame, orient="vertical", command=tree.yview)
+        tree.configure(yscrollcommand=scroll.set)
+        scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        items = {}  # tree item -> (table, primary key value, or None for the whole table)
+        for r in sorted(changed, key=lambda r: r["table"]):
+            if r["status"] == "error":
+                tree.insert("", tk.END, text=r["table"], values=[f"Error: {r['error']}"])
+                continue
+            summary = f"+{len(r['added'])} -{len(r['removed'])} ~{len(r['modified'])} rows"
+            node = tree.insert("", tk.END, text=r["table"], values=[summary], open=False)
+            items[node] = (r["table"], None)
+            for key in r["added"]:
+                items[tree.insert(node, tk.END, text=f"{r['pk']}={key}", values=["added since the backup"])] = (r["table"], key)
+            for key in r["removed"]:
+                items[tree.insert(node, tk.END, text=f"{r['pk']}={key}", values=["removed since the backup"])] = (r["table"], key)
+            for key, cells in r["modified"]:
+                detail = ", ".join(f"{col}: {old!r} -> {new!r}" for col, old, new in cells)
+                items[tree.insert(node, tk.END, text=f"{r['pk']}={key}", values=[detail])] = (r["table"], key)
+
+        def select_pattern():
+            pattern = pattern_entry.get().strip()
+            if pattern:
+                tree.selection_set([i for i, (table, key) in items.items() if key is None and fnmatch.fnmatch(table, pattern)])
+
+        def close():
+            self.remove_staged(diff["staged"])
+            dialog.destroy()
+
+        def restore_selected():
+            selected = [items[i] for i in tree.selection() if i in items]
+            if not selected:
+                messagebox.showinfo("Restore", "Select the tables or rows to restore.", parent=dialog)
+                return
+            # The diff is out of date once the rows are restored
+            self.restore_from_diff(diff, selected, parent=dialog, on_done=close)
+
+        ttk.Button(select_frame, text="Select", command=select_pattern).pack(side=tk.LEFT, padx=5)
+        ttk.Button(select_frame, text="Restore Selected", command=restore_selected).pack(side=tk.RIGHT, padx=5)
+        dialog.protocol("WM_DELETE_WINDOW", close)
+        return dialog, tree
+
+    def restore_from_diff(self, diff, selected, parent=None, on_done=None):
+        """
+        Write the selected tables and rows of a backup diff back into the live save, in one transaction
+        run as a database job. selected is a list of (table, primary key value or None for every
+        changed row of the table). on_done() is called once the rows are restored.
+        """
+        if not self.conn:
+            messagebox.showerror("Error", "Connect to a database first.", parent=parent)
+            return
+        whole = {table for table, key in selected if key is None}
+        keys = {}
+        for table, key in selected:
+            if table not in whole:
+                keys.setdefault(table, set()).add(key)
+        try:
+            plans = {t: restore_plan(diff["results"][t]) for t in whole}
+            plans.update({t: restore_plan(diff["results"][t], k) for t, k in keys.items()})
+        except ValueError as e:
+            messagebox.showerror("Restore Error", f"Nothing was restored:\n{e}", parent=parent)
+            return
+        total = sum(len(p["delete"]) + len(p["insert"]) + len(p["update"]) for p in plans.values())
+        if not messagebox.askyesno(
+            "Restore from backup",
+            f"Restore {total} rows in {len(plans)} tables from {os.path.basename(diff['backup'])}?\n"
+            "Changes made to these rows since the backup are lost.",
+            parent=parent,
+        ):
+            return
+        if self.current_table in plans and not self.resolve_pending_changes():
+            return
+        backup = connection_string(self.driver_entry.get(), diff["file"], self.password_entry.get())
+
+        def restored(counts):
+            self.notify_table_written(*plans)
+            if self.current_table in plans:
+                self.load_table(self.current_table)
+            lines = [f"{t}: {d} deleted, {i} inserted, {u} updated" for t, (d, i, u) in sorted(counts.items())]
+            messagebox.showinfo("Restored", "\n".join(lines), parent=parent)
+            if on_done:
+                on_done()
+
+        self.run_db_job("Restoring rows", lambda job, *args: restore_rows(*args), self.conn, backup, plans, on_done=restored)
+
+    def reload_mdb(self):
+        """
+        Disconnects the current MDB connection and reconnects to the file in the path_entry field.
+        """
+        if not self.resolve_pending_changes():
+            return
+        if not self.path_entry.get():
+            messagebox.showwarning("No file", "Select an MDB file first.")
+            return
+        self.open_database(RELOAD)
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # the backup diff uses worker processes, also in the packaged EXE
     app = MDBApp()
+    app.after_idle(app.report_startup, time.perf_counter())
     app.mainloop()
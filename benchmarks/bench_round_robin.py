@@ -0,0 +1,95 @@
+"""
+Benchmark for the round-robin schedule generator (utils/round_robin.py).
+Compares the lazy circle-method generator with the previous eager implementation (kept here
+as legacy_schedule) on league sizes up to a few thousand participants, and reports the time
+to the first round, to a full single and double round robin, and a check of the pairings.
+The multi-block part keeps the block size fixed and grows the field, where generation
+should grow linearly with the number of participants.
+
+Run from the repository root:
+    python -m benchmarks.bench_round_robin
+"""
+import random
+import time
+from itertools import islice
+
+from utils.round_robin import BYE, block_rounds, round_robin_rounds, split_blocks
+
+SIZES = [16, 1_000, 2_001, 4_000]
+BLOCK_SIZE = 10
+BLOCK_FIELDS = [1_000, 10_000, 100_000]
+
+def legacy_schedule(participant_ids):
+    """
+    The eager implementation round_robin_rounds replaced, for comparison.
+    """
+    participant_ids = list(participant_ids)
+    if len(participant_ids) % 2 != 0:
+        participant_ids.append(BYE)
+    schedule = []
+    rounds = participant_ids + participant_ids
+    for i in range(1, len(participant_ids)):
+        round_matches = []
+        for j in range(len(participant_ids)//2):
+            match = (rounds[j], rounds[len(participant_ids)-1-j])
+            match_list = list(match)
+            random.shuffle(match_list)
+            round_matches.append(tuple(match_list))
+        random.shuffle(round_matches)
+        schedule.append(round_matches)
+        rounds = [rounds[0]] + [rounds[-1]] + rounds[1:-1]
+    return schedule
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+def check(n, rounds):
+    """
+    Verify every pair meets exactly once and nobody plays twice in a round.
+    """
+    seen = set()
+    for matches in rounds:
+        players = [p for match in matches for p in match]
+        assert len(players) == len(set(players)), "participant twice in one round"
+        for a, b in matches:
+            pair = (a, b) if str(a) < str(b) else (b, a)
+            assert pair not in seen, f"{pair} scheduled twice"
+            seen.add(pair)
+    field = n + n % 2
+    assert len(seen) == field * (field - 1) // 2, "missing pairings"
+
+def bench(n):
+    ids = list(range(1, n + 1))
+    print(f"\n{n:>6,} participants")
+    _, first = timed(lambda: next(round_robin_rounds(ids, seed=1)))
+    print(f"  {first * 1000:9.1f} ms  first round (lazy)")
+    count, single = timed(lambda: sum(len(matches) for matches in round_robin_rounds(ids, seed=1)))
+    print(f"  {single * 1000:9.1f} ms  single round robin, {count:,} matches streamed")
+    count, double = timed(lambda: sum(len(matches) for matches in round_robin_rounds(ids, seed=1, double=True)))
+    print(f"  {double * 1000:9.1f} ms  double round robin, {count:,} matches streamed")
+    _, legacy = timed(lambda: legacy_schedule(ids))
+    print(f"  {legacy * 1000:9.1f} ms  legacy eager single round robin")
+    if n <= 2_001:
+        check(n, round_robin_rounds(ids, seed=1))
+        again = list(islice(round_robin_rounds(ids, seed=1), 3))
+        assert again == list(islice(round_robin_rounds(ids, seed=1), 3)), "same seed, different schedule"
+        print("  pairings and seed reproducibility OK")
+
+def bench_blocks(n):
+    ids = list(range(1, n + 1))
+    blocks = n // BLOCK_SIZE
+    start = time.perf_counter()
+    days = list(block_rounds(split_blocks(ids, blocks, "snake"), seed=1))
+    seconds = time.perf_counter() - start
+    matches = sum(len(day) for day in days)
+    print(f"  {seconds * 1000:9.1f} ms  {n:>7,} participants in {blocks:,} blocks, {len(days)} days, "
+          f"{matches:,} matches ({seconds / n * 1e6:.2f} us per participant)")
+
+if __name__ == "__main__":
+    for n in SIZES:
+        bench(n)
+    print(f"\nBlocks of {BLOCK_SIZE}")
+    for n in BLOCK_FIELDS:
+        bench_blocks(n)
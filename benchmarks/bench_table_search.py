@@ -0,0 +1,62 @@
+"""
+Benchmark for the indexed table search engine (utils/table_search.py).
+Builds synthetic tblWorker-like frames and reports the index build time, the latency per
+query and the latency of an as-you-type sequence that refines the previous query.
+
+Run from the repository root:
+    python -m benchmarks.bench_table_search
+"""
+import time
+import numpy as np
+import pandas as pd
+
+from utils.table_search import TableSearch
+
+SIZES = [10_000, 100_000, 1_000_000]
+QUERIES = [
+    "smith",
+    "Fed='12'",
+    "smith AND Fed='12'",
+    "smith OR jones",
+    "Fed='3' AND active OR zzz-no-match",
+]
+TYPING = ["s", "sm", "smi", "smit", "smith", "smith AND worker 1"]
+
+def make_frame(n, seed=0):
+    """
+    Build a synthetic table with integer, boolean and text columns.
+    """
+    rng = np.random.default_rng(seed)
+    surnames = np.array(["Smith", "Jones", "Tanaka", "Garcia", "Okafor", "Muller", "Rossi", "Kowalski"])
+    return pd.DataFrame({
+        "UID": np.arange(1, n + 1),
+        "Name": [f"Worker {i} {surnames[i % len(surnames)]}" for i in range(n)],
+        "Fed": rng.integers(0, 50, n),
+        "Active": rng.integers(0, 2, n).astype(bool),
+        "Nickname": rng.choice(["The Beast", "Rocket", "", "Active Duty", "Kid"], n),
+        "Salary": rng.integers(100, 100_000, n),
+    })
+
+def bench(n, repeat=3):
+    df = make_frame(n)
+    start = time.perf_counter()
+    engine = TableSearch(df)
+    build = time.perf_counter() - start
+    print(f"\n{n:>9,} rows  (build {build * 1000:8.1f} ms)")
+    for query in QUERIES:
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            hits = int(engine.mask(query).sum())
+            timings.append(time.perf_counter() - start)
+        print(f"  {min(timings) * 1000:8.1f} ms  {hits:>9,} hits  {query}")
+    print("  as-you-type:")
+    engine.mask("")
+    for query in TYPING:
+        start = time.perf_counter()
+        hits = int(engine.mask(query).sum())
+        print(f"  {(time.perf_counter() - start) * 1000:8.1f} ms  {hits:>9,} hits  {query}")
+
+if __name__ == "__main__":
+    for n in SIZES:
+        bench(n)
@@ -1,5 +1,9 @@
 import tkinter as tk
-from tkinter import ttk
+from tkinter import ttk, messagebox
+from utils.lazy_import import LazyModule
+from utils.events import CONNECT, RELOAD, EJECT, TABLE_WRITTEN
+
+pd = LazyModule("pandas")
 
 class LabeledEntry(ttk.Frame):
     """Reusable labeled entry widget"""
@@ -16,4 +20,276 @@ class LabeledEntry(ttk.Frame):
 
     def set(self, text):
         self.entry.delete(0, tk.END)
-        self.entry.insert(0, text)
\ No newline at end of file
+        self.entry.insert(0, text)
+
+
+def run_statements(conn, statements):
+    """
+    Execute [(sql, params), ...] and commit, rolling back if any statement fails.
+    """
+    cursor = conn.cursor()
+    try:
+        for sql, params in statements:
+            cursor.execute(sql, params)
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+class DatabaseTab(ttk.Frame):
+    """
+    Base of the function tabs. Listens to the app's events: connecting, reloading or a write to
+    one of TABLES marks the tab stale, and a stale tab only reloads (on_connect) while it is
+    visible, so hidden tabs cost nothing until they are selected.
+    """
+    TABLES = ()  # tables whose writes make the tab reload
+
+    def __init__(self, parent, app):
+        super().__init__(parent)
+        self.app = app
+        self.conn = None
+        self.stale = False
+        app.events.subscribe(CONNECT, self.mark_stale)
+        app.events.subscribe(RELOAD, self.mark_stale)
+        app.events.subscribe(EJECT, self._ejected)
+        app.events.subscribe(TABLE_WRITTEN, self._table_written)
+
+    def mark_stale(self, **_):
+        self.stale = True
+        self.refresh_if_visible()
+
+    def _table_written(self, tables=(), **_):
+        if set(tables) & set(self.TABLES):
+            self.mark_stale()
+
+    def _ejected(self, **_):
+        self.stale = False
+        self.conn = None
+        self.on_eject()
+
+    def refresh_if_visible(self):
+        """
+        Reload the tab if it is stale, connected and currently shown.
+        """
+        if self.stale and self.app.conn and self.app.is_tab_visible(self):
+            self.stale = False
+            self.on_connect()
+
+    def on_connect(self):
+        """
+        Load the tab's data from the connected save.
+        """
+        self.conn = self.app.conn
+
+    def on_eject(self):
+        """
+        Clear what the tab shows of the closed save.
+        """
+
+    def db_job(self, fn, *args, on_done=None, title="Database Error"):
+        """
+        Run fn(conn, *args) on the database executor and call on_done(result) on the Tk thread.
+        Failures are shown in a message box titled title. Results for a connection the tab no
+        longer uses (ejected or reconnected meanwhile) are dropped. Returns the Job.
+        """
+        conn = self.conn
+
+        def done(result):
+            if self.conn is conn and on_done:
+                on_done(result)
+
+        return self.app.db.submit(
+            lambda job: fn(conn, *args),
+            on_done=done,
+            on_error=lambda e: messagebox.showerror(title, str(e)),
+        )
+
+    def db_write(self, statements, tables, on_done=None):
+        """
+        Run [(sql, params), ...] in one transaction on the database executor, then report the write
+        of tables to the app and call on_done(). Nothing is written if a statement fails.
+        """
+        def written(_):
+            self.app.notify_table_written(*tables)
+            if on_done:
+                on_done()
+
+        return self.db_job(run_statements, statements, on_done=written, title="Update Error")
+
+
+class VirtualGrid(ttk.Frame):
+    """
+    Virtualized table widget backed by a DataFrame.
+    Only the rows inside the visible window (plus a small overscan) exist as Treeview items,
+    the scrollbar position is mapped to a row offset into the DataFrame instead.
+    """
+    def __init__(self, parent, overscan=5, default_rowheight=20, **kwargs):
+        super().__init__(parent)
+        self.overscan = overscan
+        self.df = None
+        self.rows = []  # positional row indices into df, in display order
+        self.offset = 0
+        self.visible = 1
+        self._items = []  # pooled item ids, reused on every render
+        self._item_rows = {}  # item id -> positional row index
+        self.highlighted = set()  # positional rows drawn with the "changed" tag
+
+        self.tree = ttk.Treeview(self, show='headings', **kwargs)
+        self.scroll_x = ttk.Scrollbar(self, orient="horizontal", command=self.tree.xview)
+        self.scroll_y = ttk.Scrollbar(self, orient="vertical", command=self.yview)
+        self.scroll_x.pack(side=tk.BOTTOM, fill=tk.X)
+        self.scroll_y.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.tree.configure(xscrollcommand=self.scroll_x.set)
+        self.tree.tag_configure("changed", background="#fff2a8")
+
+        style = ttk.Style(self)
+        try:
+            self.rowheight = int(style.lookup("Treeview", "rowheight")) or default_rowheight
+        except (tk.TclError, ValueError):
+            self.rowheight = default_rowheight
+
+        self.tree.bind("<Configure>", self._on_configure)
+        self.tree.bind("<MouseWheel>", self._on_mousewheel)
+        self.tree.bind("<Button-4>", lambda e: self.scroll(-3))
+        self.tree.bind("<Button-5>", lambda e: self.scroll(3))
+        self.tree.bind("<Prior>", lambda e: self.scroll(-self.visible))
+        self.tree.bind("<Next>", lambda e: self.scroll(self.visible))
+
+    # ---------------- Model ----------------
+
+    def set_data(self, df, rows=None):
+        """
+        Set the DataFrame shown by the grid and optionally the rows (positional indices) to display.
+        Column headings are left to the caller.
+        """
+        self.df = df
+        self.set_rows(range(len(df)) if rows is None else rows)
+
+    def set_rows(self, rows):
+        """
+        Show only the given positional rows of the current DataFrame, in the given order.
+        """
+        self.rows = rows
+        self.offset = 0
+        self.render()
+
+    def extend(self, df, rows=None):
+        """
+        Replace the DataFrame with one that has more rows appended, keeping the scroll position.
+        Shows all rows unless the rows to display are given.
+        """
+        self.df = df
+        self.rows = range(len(df)) if rows is None else rows
+        self.render()
+
+    def refresh_row(self, row):
+        """
+        Re-render a single positional row if it is currently on screen.
+        """
+        for item_id, r in self._item_rows.items():
+            if r == row:
+                self.tree.item(item_id, values=self._row_values(row))
+
+    def set_highlighted(self, rows):
+        """
+        Highlight the given positional rows, e.g. rows with unsaved edits.
+        """
+        self.highlighted = set(rows)
+        for item_id, row in self._item_rows.items():
+            self.tree.item(item_id, tags=("changed",) if row in self.highlighted else ())
+
+    def row_at(self, item_id):
+        """
+        Return the positional DataFrame row index shown by the given item, or None.
+        """
+        return self._item_rows.get(item_id)
+
+    def clear(self):
+        """
+        Remove the model and all items and columns from the grid.
+        """
+        self.df = None
+        self.rows = []
+        self.offset = 0
+        self.highlighted = set()
+        self.tree.delete(*self.tree.get_children())
+        self._items = []
+        self._item_rows = {}
+        self.tree["columns"] = []
+        self.tree["show"] = ""
+        self.scroll_y.set(0.0, 1.0)
+
+    # ---------------- Rendering ----------------
+
+    @staticmethod
+    def _display(values):
+        # Missing values show as empty cells, whatever the column dtype stores for them (None, NaN, NA)
+        return ["" if v is None or (pd.api.types.is_scalar(v) and pd.isna(v)) else v for v in values]
+
+    def _row_values(self, row):
+        return self._display(self.df.iloc[row])
+
+    def render(self):
+        """
+        Render the current window of rows by reusing the pooled Treeview items.
+        """
+        if self.df is None:
+            return
+        total = len(self.rows)
+        self.offset = max(0, min(self.offset, total - self.visible))
+        window = self.rows[self.offset:self.offset + self.visible + self.overscan]
+        values = self.df.iloc[list(window)].itertuples(index=False, name=None) if len(window) else []
+
+        # Grow or shrink the item pool to fit the window
+        while len(self._items) < len(window):
+            self._items.append(self.tree.insert("", tk.END, values=()))
+        if len(self._items) > len(window):
+            self.tree.delete(*self._items[len(window):])
+            del self._items[len(window):]
+
+        self.tree.selection_remove(self.tree.selection())
+        self._item_rows = {}
+        for item_id, row, vals in zip(self._items, window, values):
+            self.tree.item(item_id, values=self._display(vals), tags=("changed",) if row in self.highlighted else ())
+            self._item_rows[item_id] = row
+        self.tree.yview_moveto(0)
+
+        if total:
+            self.scroll_y.set(self.offset / total, min(1.0, (self.offset + self.visible) / total))
+        else:
+            self.scroll_y.set(0.0, 1.0)
+
+    def yview(self, *args):
+        """
+        Scrollbar command: map 'moveto' fractions and 'scroll' steps to a row offset.
+        """
+        if not args:
+            return
+        if args[0] == "moveto":
+            self.offset = int(float(args[1]) * len(self.rows))
+            self.render()
+        elif args[0] == "scroll":
+            step = int(args[1])
+            self.scroll(step * self.visible if args[2] == "pages" else step)
+
+    def scroll(self, rows):
+        """
+        Move the visible window by the given number of rows.
+        """
+        self.offset += rows
+        self.render()
+        return "break"
+
+    def _on_mousewheel(self, event):
+        return self.scroll(-3 if event.delta > 0 else 3)
+
+    def _on_configure(self, event):
+        # The header takes roughly one row, the rest are data rows
+        visible = max(1, event.height // self.rowheight - 1)
+        if visible != self.visible:
+            self.visible = visible
+            self.render()
@@ -1,33 +1,39 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
+from components.components import DatabaseTab
 import json 
+import random
+import string
 from utils.round_robin import (
     clear_pre_booking,
     query_tournaments,
     query_tournament_participants,
     query_shows_of_fed,
     generate_round_robin_tournament,
-    query_worker_name_by_id
+    split_blocks,
+    block_rounds,
 )
 from utils.round_robin import book_tournament as backend_book_tournament
+from utils.table_cache import PREBOOKING_TABLES
 
-class Func1Tab(ttk.Frame):
+class Func1Tab(DatabaseTab):
     """
     Round Robin Generator tab for managing tournaments, participants, and booking.
     Provides UI and logic for selecting tournaments, generating pairings, and booking matches.
     """
+    TABLES = ("tblTournament", "tblTournamentRobin", "tblCard", "tblMatch", "tblWorker")
+
     def __init__(self, parent, app):
         """
         Initialize the Round Robin Generator tab UI and widgets.
         """
-        super().__init__(parent)
-        self.app = app
-        self.conn = None
+        super().__init__(parent, app)
         self.tournaments = {}
         self.fed_id = None
         self.tournament_type = None
         self.participants = []  # list of tuples (worker_id, worker_name)
         self.schedule = []
+        self.seed = None  # seed the current schedule was drawn with
         self.shows = {}  # {show_id: show_name}
 
         # Sidebar
@@ -41,7 +47,7 @@ class Func1Tab(ttk.Frame):
             \n\n2)  Match type gets auto-selected based on the tournament type (Single/Tag/Trios). You can choose a different match if needed. 
             \n\n3)  Participants can be reordered by dragging them in the list. 
             \n\n4)  Choose a prefix for match names (max 8 characters). 
-            \n\n5)  Click 'Generate Pairings' to create a round-robin schedule. 
+            \n\n5)  Click 'Generate Pairings' to create a round-robin schedule. With more than 1 block the participants are dealt into blocks in list order (seeded or snake) and every day holds one round of each block. Leave Seed empty for a new random draw; enter a previous seed to get the same schedule again. 
             \n\n6)  Assign shows from the dropdown and match lengths to each match in the schedule. 
             \n\n7)  Matches can be reordered by dragging them in the schedule list. 
             \n\n8)  Finally, click 'Book Tournament' to save everything to the database. 
@@ -97,10 +103,23 @@ class Func1Tab(ttk.Frame):
         ttk.Entry(prefix_frame, textvariable=self.all_length_var, width=5).pack(side=tk.LEFT)
         ttk.Button(prefix_frame, text="Apply", command=self.set_all_lengths).pack(side=tk.LEFT, padx=2)
 
+        # --- Step 4b: Blocks ---
+        block_frame = ttk.Frame(self)
+        block_frame.pack(fill=tk.X, pady=5)
+        ttk.Label(block_frame, text="Blocks:").pack(side=tk.LEFT)
+        self.blocks_var = tk.IntVar(value=1)
+        ttk.Spinbox(block_frame, from_=1, to=len(string.ascii_uppercase), textvariable=self.blocks_var, width=4).pack(side=tk.LEFT, padx=5)
+        ttk.Label(block_frame, text="Draw:").pack(side=tk.LEFT, padx=(15, 2))
+        self.draw_var = tk.StringVar(value="Snake")
+        ttk.Combobox(block_frame, values=["Snake", "Seeded"], textvariable=self.draw_var, state="readonly", width=8).pack(side=tk.LEFT)
+        ttk.Label(block_frame, text="Seed:").pack(side=tk.LEFT, padx=(15, 2))
+        self.seed_var = tk.StringVar()
+        ttk.Entry(block_frame, textvariable=self.seed_var, width=12).pack(side=tk.LEFT)
+
         # --- Step 5: Combined Schedule + Shows + Length ---
         ttk.Label(self, text="Schedule with Shows & Match Length (drag to reorder):").pack()
-        self.combined_tree = ttk.Treeview(self, columns=["Day", "Match", "Show", "Length"], show="headings", height=10)
-        for col in ["Day", "Match", "Show", "Length"]:
+        self.combined_tree = ttk.Treeview(self, columns=["Day", "Match", "Show", "Length", "Block"], show="headings", height=10)
+        for col in ["Day", "Match", "Show", "Length", "Block"]:
             self.combined_tree.heading(col, text=col)
         self.combined_tree.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         self.enable_drag_and_drop(self.combined_tree)
@@ -121,8 +140,27 @@ class Func1Tab(ttk.Frame):
         Clear pre-booking in the database if enabled.
         """
         if self.conn and self.clear_var.get():
-            clear_pre_booking(self.conn)
-            messagebox.showinfo("Done", "Pre-booking cleared!")
+            self.db_job(clear_pre_booking, on_done=self.prebooking_cleared, title="Clear Pre-Booking Error")
+
+    def prebooking_cleared(self, _):
+        self.app.notify_table_written(*PREBOOKING_TABLES)
+        messagebox.showinfo("Done", "Pre-booking cleared!")
+
+    def on_connect(self):
+        """
+        Load the tournaments of the connected save.
+        """
+        self.conn = self.app.conn
+        self.load_tournaments()
+
+    def on_eject(self):
+        """
+        Clear the tournament, participants and pairings of the closed save.
+        """
+        self.participant_tree.delete(*self.participant_tree.get_children())
+        self.combined_tree.delete(*self.combined_tree.get_children())
+        self.tourney_combo.set("")
+        self.match_combo.set("")
 
     def load_tournaments(self):
         """
@@ -130,9 +168,16 @@ class Func1Tab(ttk.Frame):
         """
         if not self.conn:
             return
-        self.tournaments, self.fed_id = query_tournaments(self.conn)
+        self.db_job(self._read_tournaments, on_done=self.show_tournaments)
+
+    @staticmethod
+    def _read_tournaments(conn):
+        tournaments, fed_id = query_tournaments(conn)
+        return tournaments, fed_id, query_shows_of_fed(conn, fed_id)
+
+    def show_tournaments(self, result):
+        self.tournaments, self.fed_id, self.shows = result
         self.tourney_combo["values"] = [f"{tid}: {val[0]}" for tid, val in self.tournaments.items()]
-        self.shows = query_shows_of_fed(self.conn, self.fed_id)
 
     def load_tournament(self):
         """
@@ -151,20 +196,29 @@ class Func1Tab(ttk.Frame):
         tourney_id = int(sel.split(":")[0])
         self.tournament_type = self.tournaments[tourney_id][1]
 
-        participant_ids = query_tournament_participants(self.conn, tourney_id, self.tournament_type)
-
-        self.participants.clear()
-
-        if self.tournament_type == 1:  # Singles
-            self.participants = [(pid, query_worker_name_by_id(self.conn, pid)) for pid in participant_ids]
-        else:  # Tag or Trios
-            # Flatten teams into names for display
-            for team in participant_ids:
-                team_names = [query_worker_name_by_id(self.conn, pid) for pid in team]
-                # store as (team_ids, "Name1|Name2|...")
-                self.participants.append((team, "|".join(team_names)))
+        self.db_job(
+            self._read_participants, tourney_id, self.tournament_type, self.app.connection.worker_names,
+            on_done=lambda participants: self.show_participants(sel, participants),
+        )
 
-        # Populate tree
+    @staticmethod
+    def _read_participants(conn, tourney_id, tournament_type, names):
+        """
+        Return the tournament's participants as [(pid, name)] for singles or [(team_ids, "Name1|Name2|...")] for teams.
+        """
+        participant_ids = query_tournament_participants(conn, tourney_id, tournament_type)
+        if tournament_type == 1:  # Singles
+            names.resolve(participant_ids)
+            return [(pid, names.name(pid)) for pid in participant_ids]
+        # Tag or Trios
+        names.resolve(pid for team in participant_ids for pid in team)
+        return [(team, names.team(team)) for team in participant_ids]
+
+    def show_participants(self, sel, participants):
+        if self.tourney_combo.get() != sel:
+            return  # Another tournament was picked while this one loaded
+        self.participants = participants
+        self.participant_tree.delete(*self.participant_tree.get_children())
         for ids, name in self.participants:
             self.participant_tree.insert("", tk.END, values=[name], tags=(str(ids),))
         self.load_matches()
@@ -176,20 +230,25 @@ class Func1Tab(ttk.Frame):
         if not self.conn or not self.tournament_type:
             return
 
-        cursor = self.conn.cursor()
+        self.db_job(self._read_matches, self.tournament_type, on_done=self.show_matches)
+
+    @staticmethod
+    def _read_matches(conn, tournament_type):
+        cursor = conn.cursor()
         try:
             # tblTournament.Type gives tournament_type: 1,2,3
             # tblMatch.Match_Type should match
-            cursor.execute("SELECT UID, Name FROM tblMatch WHERE Match_Type = ?", (self.tournament_type,))
-            rows = cursor.fetchall()
-            self.match_options = {row.UID: row.Name for row in rows}
-            self.match_combo["values"] = list(self.match_options.values())
-            if rows:
-                self.match_combo.current(0)
+            cursor.execute("SELECT UID, Name FROM tblMatch WHERE Match_Type = ?", (tournament_type,))
+            return {row.UID: row.Name for row in cursor.fetchall()}
         finally:
             cursor.close()
 
-        
+    def show_matches(self, match_options):
+        self.match_options = match_options
+        self.match_combo["values"] = list(self.match_options.values())
+        if match_options:
+            self.match_combo.current(0)
+
     def generate_pairings(self):
         """
         Generate round-robin pairings for the selected tournament and participants.
@@ -200,6 +259,7 @@ class Func1Tab(ttk.Frame):
                 for i in self.participant_tree.get_children()]
 
         # Map display names
+        team_names = dict(items)
         id_to_name = {}
         for tag, name in items:
             try:
@@ -225,18 +285,41 @@ class Func1Tab(ttk.Frame):
         # Generate round-robin schedule
         if self.tournament_type == 1:
             participant_ids = [json.loads(tag) for tag, _ in items]
-            if all(isinstance(pid, int) for pid in participant_ids):
-                self.schedule = generate_round_robin_tournament(participant_ids)
-            else:
+            if not all(isinstance(pid, int) for pid in participant_ids):
                 participant_ids = [p for sub in participant_ids for p in (sub if isinstance(sub, list) else [sub])]
-                self.schedule = generate_round_robin_tournament(participant_ids)
         else:
-            self.schedule = generate_round_robin_tournament([json.loads(tag) for tag, _ in items])
+            participant_ids = [json.loads(tag) for tag, _ in items]
+        try:
+            blocks = self.blocks_var.get()
+        except tk.TclError:
+            blocks = 0
+        if not 1 <= blocks <= len(string.ascii_uppercase) or len(participant_ids) < 2 * blocks:
+            messagebox.showerror("Error", "Every block needs at least 2 participants!")
+            return
+        seed_text = self.seed_var.get().strip()
+        if not seed_text:
+            seed = random.randrange(2**32)
+        elif seed_text.isdigit():
+            seed = int(seed_text)
+        else:
+            messagebox.showerror("Error", "Seed must be a whole number, or empty for a random one!")
+            return
+        # Show the seed so the same schedule can be drawn again
+        self.seed_var.set(str(seed))
+        self.seed = seed
+        if blocks == 1:
+            self.schedule = generate_round_robin_tournament(participant_ids, seed=seed)
+            block_of = [[""] * len(matches) for matches in self.schedule]
+        else:
+            # All blocks in one pass: each day holds a round of every block
+            days = list(block_rounds(split_blocks(participant_ids, blocks, self.draw_var.get().lower()), seed=seed))
+            self.schedule = [[m for _, m in day] for day in days]
+            block_of = [[string.ascii_uppercase[b] for b, _ in day] for day in days]
         # Clear combined tree and widgets
         self.combined_tree.delete(*self.combined_tree.get_children())
         # Insert matches
         for day, matches in enumerate(self.schedule, start=1):
-            for m in matches:
+            for m, block in zip(matches, block_of[day - 1]):
                 if 'bye' in m:
                     continue
                 if self.tournament_type == 1:
@@ -244,14 +327,14 @@ class Func1Tab(ttk.Frame):
                 else:
                     # m is a tuple/list of two teams, each a list of pids
                     def team_name(team):
-                        # If team is a list, join names, else just get name
+                        # A team is shown under the name of its participant row, tagged with its ids
                         if isinstance(team, (list, tuple)):
-                            return "|".join(query_worker_name_by_id(self.conn, pid) for pid in team)
+                            return team_names[json.dumps(list(team))]
                         else:
-                            return query_worker_name_by_id(self.conn, team)
+                            return id_to_name[team]
                     match_str = f"{team_name(m[0])} vs {team_name(m[1])}"
                 tag_value = json.dumps(m)
-                self.combined_tree.insert("", tk.END, values=(day, match_str, "", 10), tags=(tag_value,))
+                self.combined_tree.insert("", tk.END, values=(day, match_str, "", 10, block), tags=(tag_value,))
 
     # ---------------- Book Tournament ----------------
     def on_book_tournament(self):
@@ -292,6 +375,7 @@ class Func1Tab(ttk.Frame):
         # Build schedule and match lengths dict
         sched_dict = {}
         match_lengths_dict = {}
+        labels_dict = {}
         for idx, i in enumerate(self.combined_tree.get_children()):
             r = self.combined_tree.item(i, "values")
             day = int(r[0])
@@ -306,6 +390,7 @@ class Func1Tab(ttk.Frame):
             if day not in sched_dict:
                 sched_dict[day] = []
                 match_lengths_dict[day] = []
+                labels_dict[day] = []
 
             # Singles as tuple, teams as list
             if self.tournament_type == 1:
@@ -314,6 +399,7 @@ class Func1Tab(ttk.Frame):
                 sched_dict[day].append(match)
 
             match_lengths_dict[day].append(lengths[idx])
+            labels_dict[day].append(r[4] if len(r) > 4 else "")
 
         # Get selected match UID
         match_name = self.match_var.get()
@@ -327,8 +413,17 @@ class Func1Tab(ttk.Frame):
             messagebox.showerror("Error", "Please select a match!")
             return
         print(show_order)
-        # Call backend
-        backend_book_tournament(
+        # Call backend on the database executor
+        self.app.run_db_job(
+            "Booking tournament",
+            lambda job, *args: backend_book_tournament(
+                *args,
+                match_uid=match_uid,
+                progress=job.progress,
+                names=self.app.connection.worker_names,
+                uids=self.app.connection.uids,
+                labels_dict=labels_dict,
+            ),
             self.conn,
             prefix,
             sched_dict,
@@ -336,9 +431,13 @@ class Func1Tab(ttk.Frame):
             match_lengths_dict,
             self.tournament_type,
             self.fed_id,
-            match_uid=match_uid  # NEW
+            on_done=self.on_tournament_booked,
         )
-        messagebox.showinfo("Success", "Tournament booked successfully!")
+
+    def on_tournament_booked(self, report):
+        self.app.notify_table_written(*PREBOOKING_TABLES)
+        lines = [f"{table}: {rows} rows in {seconds:.2f}s" for table, (rows, seconds) in report.items()]
+        messagebox.showinfo("Success", f"Tournament booked successfully!\nPairing seed: {self.seed}\n\n" + "\n".join(lines))
 
     # ---------------- Drag & Drop ----------------
     def enable_drag_and_drop(self, tree):
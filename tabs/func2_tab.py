@@ -1,19 +1,23 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import pandas as pd
+from components.components import DatabaseTab
+from utils.compact import compact_frame, query_column_types, set_cell
+from utils.lazy_import import LazyModule
 
-class Func2Tab(ttk.Frame):
+pd = LazyModule("pandas")
+
+class Func2Tab(DatabaseTab):
     """
     Dojo Manager tab for managing dojos, their owners, and types.
     Provides UI and logic for loading dojos and editing their owners.
     """
+    TABLES = ("tblDojo", "tblWorker", "tblFed")
+
     def __init__(self, parent, app):
         """
         Initialize the Dojo Manager tab UI and widgets.
         """
-        super().__init__(parent)
-        self.app = app
-        self.conn = None
+        super().__init__(parent, app)
 
         # Sidebar
         sidebar_frame = ttk.Frame(self)
@@ -42,6 +46,20 @@ class Func2Tab(ttk.Frame):
         self.tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         self.tree.bind("<Double-1>", self.on_double_click)
 
+    def on_connect(self):
+        """
+        Reload the dojo list if it was loaded; it is otherwise only loaded on request.
+        """
+        self.conn = self.app.conn
+        if self.tree.get_children():
+            self.load_dojos()
+
+    def on_eject(self):
+        """
+        Clear the dojo list of the closed save.
+        """
+        self.tree.delete(*self.tree.get_children())
+
     def load_dojos(self):
         """
         Load dojos from the database and display them in the treeview.
@@ -51,7 +69,29 @@ class Func2Tab(ttk.Frame):
         if not self.conn:
             messagebox.showerror("Error", "Connect to a database first.")
             return
-        df = pd.read_sql("SELECT UID, Name, Owner, School, Dojo, Centre FROM tblDojo WHERE Active=1", self.conn)
+        snapshot = self.app.snapshot_table("tblDojo")
+        if snapshot is not None:
+            active = (snapshot["Active"] == 1).fillna(False).astype(bool)
+            self.show_dojos(snapshot.loc[active, ["UID", "Name", "Owner", "School", "Dojo", "Centre"]].reset_index(drop=True))
+        else:
+            self.db_job(self._read_dojos, on_done=self.show_dojos)
+
+    @staticmethod
+    def _read_dojos(conn):
+        df = pd.read_sql("SELECT UID, Name, Owner, School, Dojo, Centre FROM tblDojo WHERE Active=1", conn)
+        df, _, _ = compact_frame(df, query_column_types(conn, "tblDojo"))
+        return df
+
+    @staticmethod
+    def _read_owners(conn, table):
+        cursor = conn.cursor()
+        try:
+            cursor.execute(f"SELECT UID, Name FROM {table}")
+            return {str(uid): name for uid, name in cursor.fetchall()}
+        finally:
+            cursor.close()
+
+    def show_dojos(self, df):
         self.df = df
         self.tree.delete(*self.tree.get_children())
         for _, row in df.iterrows():
@@ -78,16 +118,20 @@ class Func2Tab(ttk.Frame):
         is_centre = bool(dojo_row["Centre"])
 
         # Query possible owners
-        cursor = self.conn.cursor()
         if is_school:
-            cursor.execute("SELECT UID, Name FROM tblWorker")
+            table = "tblWorker"
         elif is_dojo or is_centre:
-            cursor.execute("SELECT UID, Name FROM tblFed")
+            table = "tblFed"
         else:
             return
-        owners = cursor.fetchall()
-        owner_dict = {str(uid): name for uid, name in owners}
+        self.db_job(self._read_owners, table, on_done=lambda owners: self.edit_owner(item_id, col_id, col_index, row_idx, owners))
 
+    def edit_owner(self, item_id, col_id, col_index, row_idx, owner_dict):
+        """
+        Show the owner dropdown over the double-clicked cell and write the chosen owner.
+        """
+        if not self.tree.exists(item_id):
+            return
         x, y, width, height = self.tree.bbox(item_id, col_id)
         combo = ttk.Combobox(self.tree, values=[f"{uid}: {name}" for uid, name in owner_dict.items()], state="normal", width=40)
         combo.place(x=x, y=y, width=width, height=height)
@@ -110,15 +154,9 @@ class Func2Tab(ttk.Frame):
             values = list(self.tree.item(item_id, "values"))
             values[col_index] = uid
             self.tree.item(item_id, values=values)
-            self.df.iat[row_idx, col_index] = uid
-            try:
-                dojo_uid = int(self.df.iat[row_idx, 0])  # Ensure Python int
-                sql = "UPDATE tblDojo SET Owner = ? WHERE UID = ?"
-                cur2 = self.conn.cursor()
-                cur2.execute(sql, (int(uid), dojo_uid))  # Ensure both are Python int
-                self.conn.commit()
-            except Exception as e:
-                messagebox.showerror("Update Error", str(e))
+            set_cell(self.df, row_idx, col_index, uid)
+            dojo_uid = int(self.df.iat[row_idx, 0])  # Ensure Python int
+            self.db_write([("UPDATE tblDojo SET Owner = ? WHERE UID = ?", (int(uid), dojo_uid))], ["tblDojo"])
 
         combo.bind("<Return>", save_owner)
         combo.bind("<FocusOut>", lambda e: combo.destroy())
@@ -144,17 +182,11 @@ class Func2Tab(ttk.Frame):
         owner_combo = ttk.Combobox(dialog, state="normal", width=40, textvariable=owner_var)
         owner_combo.pack(pady=5)
         def update_owner_options(*args):
-            if type_var.get() == "School":
-                cursor = self.conn.cursor()
-                cursor.execute("SELECT UID, Name FROM tblWorker")
-                owners = cursor.fetchall()
-                cursor.close()
-            else:
-                cursor = self.conn.cursor()
-                cursor.execute("SELECT UID, Name FROM tblFed")
-                owners = cursor.fetchall()
-                cursor.close()
-            owner_dict = {str(uid): name for uid, name in owners}
+            table = "tblWorker" if type_var.get() == "School" else "tblFed"
+            self.db_job(self._read_owners, table, on_done=show_owner_options)
+        def show_owner_options(owner_dict):
+            if not dialog.winfo_exists():
+                return
             owner_combo['values'] = [f"{uid}: {name}" for uid, name in owner_dict.items()]
             def on_owner_keyrelease(event):
                 val = owner_var.get().lower()
@@ -178,9 +210,11 @@ class Func2Tab(ttk.Frame):
             elif t == "Centre":
                 centre = 1
             sql = "UPDATE tblDojo SET School=?, Dojo=?, Centre=?, Owner=? WHERE UID=?"
-            cur2 = self.conn.cursor()
-            cur2.execute(sql, (school, dojo, centre, uid, dojo_uid))
-            self.conn.commit()
+            self.db_write([(sql, (school, dojo, centre, uid, dojo_uid))], ["tblDojo"], on_done=lambda: updated(uid, school, dojo, centre))
+            dialog.destroy()
+        def updated(uid, school, dojo, centre):
+            if not self.tree.exists(item_id):
+                return
             # Update UI
             values = list(self.tree.item(item_id, "values"))
             values[2] = uid
@@ -188,10 +222,9 @@ class Func2Tab(ttk.Frame):
             values[4] = dojo
             values[5] = centre
             self.tree.item(item_id, values=values)
-            self.df.iat[row_idx, 2] = uid
-            self.df.iat[row_idx, 3] = school
-            self.df.iat[row_idx, 4] = dojo
-            self.df.iat[row_idx, 5] = centre
-            dialog.destroy()
+            set_cell(self.df, row_idx, 2, uid)
+            set_cell(self.df, row_idx, 3, school)
+            set_cell(self.df, row_idx, 4, dojo)
+            set_cell(self.df, row_idx, 5, centre)
         ttk.Button(dialog, text="Apply", command=apply).pack(pady=10)
         ttk.Button(dialog, text="Cancel", command=dialog.destroy).pack()
@@ -1,19 +1,22 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import pandas as pd
+from components.components import DatabaseTab, run_statements
+from utils.lazy_import import LazyModule
 
-class Func3Tab(ttk.Frame):
+pd = LazyModule("pandas")
+
+class Func3Tab(DatabaseTab):
     """
     Alliance Manager tab for managing alliances, their members, and belts.
     Provides UI and logic for selecting alliances, adding/removing members and belts.
     """
+    TABLES = ("tblUmbrella", "tblUmbrellaMember", "tblBelt", "tblFed")
+
     def __init__(self, parent, app):
         """
         Initialize the Alliance Manager tab UI and widgets.
         """
-        super().__init__(parent)
-        self.app = app
-        self.conn = None
+        super().__init__(parent, app)
 
         # Sidebar
         sidebar_frame = ttk.Frame(self)
@@ -67,35 +70,44 @@ class Func3Tab(ttk.Frame):
         ttk.Button(belt_btn_frame, text="Add Belt", command=self.add_belt_dialog).pack(side=tk.LEFT, padx=2)
         ttk.Button(belt_btn_frame, text="Remove Belt", command=self.remove_belt).pack(side=tk.LEFT, padx=2)
 
-        # Load alliances if connection exists
-        self.after(500, self.try_load_alliances)
-
-    def try_load_alliances(self):
+    def on_connect(self):
         """
-        Attempt to load alliances if a DB connection exists.
+        Fill the alliance dropdown from the connected save.
         """
-        self.conn = self.app.conn
-        if self.conn:
-            self.load_alliances()
+        self.reload_alliances(self.app.conn)
 
     def load_alliances(self):
         """
         Load all alliances from the database and populate the dropdown, showing if they are active or not.
         """
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT UID, Name, Active FROM tblUmbrella")
-        self.alliances = {row.UID: row.Name for row in cursor.fetchall()}
-        cursor.execute("SELECT UID, Name, Active FROM tblUmbrella")
+        self.db_job(self._read_alliances, on_done=self.show_alliances)
+
+    @staticmethod
+    def _read_alliances(conn):
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT UID, Name, Active FROM tblUmbrella")
+            return [tuple(row) for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+
+    def show_alliances(self, rows):
+        self.alliances = {uid: name for uid, name, _ in rows}
         alliance_display = []
         self.alliance_uid_map = {}
-        for row in cursor.fetchall():
-            status = "Active" if row.Active else "Inactive"
-            display = f"{row.Name} ({status})"
+        for uid, name, active in rows:
+            status = "Active" if active else "Inactive"
+            display = f"{name} ({status})"
             alliance_display.append(display)
-            self.alliance_uid_map[display] = row.UID
+            self.alliance_uid_map[display] = uid
+        current = self.alliance_combo.get()
         self.alliance_combo["values"] = alliance_display
         if alliance_display:
-            self.alliance_combo.current(0)
+            # Keep the shown alliance when reloading after a write
+            if current in alliance_display:
+                self.alliance_combo.set(current)
+            else:
+                self.alliance_combo.current(0)
             self.load_alliance()
 
     def get_selected_alliance_uid(self):
@@ -115,27 +127,48 @@ class Func3Tab(ttk.Frame):
         uid = self.get_selected_alliance_uid()
         if not uid:
             return
+        self.db_job(self._read_alliance, uid, on_done=lambda rows: self.show_alliance(uid, *rows))
 
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            SELECT m.UID, f.Name, m.Permanent, m.Active
-            FROM tblUmbrellaMember AS m
-            INNER JOIN tblFed AS f ON m.MemberUID = f.UID
-            WHERE m.UmbrellaUID = ?
-        """, (uid,))
-        self.member_tree.delete(*self.member_tree.get_children())
-        for row in cursor.fetchall():
-            self.member_tree.insert("", tk.END, values=tuple(row))
+    @staticmethod
+    def _read_alliance(conn, uid):
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                SELECT m.UID, f.Name, m.Permanent, m.Active
+                FROM tblUmbrellaMember AS m
+                INNER JOIN tblFed AS f ON m.MemberUID = f.UID
+                WHERE m.UmbrellaUID = ?
+            """, (uid,))
+            members = [tuple(row) for row in cursor.fetchall()]
+            cursor.execute("""
+                SELECT b.UID, b.Name, f.Name
+                FROM tblBelt AS b
+                LEFT JOIN tblFed AS f ON b.Fed = f.UID
+                WHERE b.AllianceUID = ?
+            """, (uid,))
+            belts = [tuple(row) for row in cursor.fetchall()]
+            return members, belts
+        finally:
+            cursor.close()
 
-        cursor.execute("""
-            SELECT b.UID, b.Name, f.Name
-            FROM tblBelt AS b
-            LEFT JOIN tblFed AS f ON b.Fed = f.UID
-            WHERE b.AllianceUID = ?
-        """, (uid,))
+    def show_alliance(self, uid, members, belts):
+        if self.get_selected_alliance_uid() != uid:
+            return  # Another alliance was picked while this one loaded
+        self.member_tree.delete(*self.member_tree.get_children())
+        for row in members:
+            self.member_tree.insert("", tk.END, values=row)
         self.belt_tree.delete(*self.belt_tree.get_children())
-        for row in cursor.fetchall():
-            self.belt_tree.insert("", tk.END, values=tuple(row))
+        for row in belts:
+            self.belt_tree.insert("", tk.END, values=row)
+
+    @staticmethod
+    def _read_options(conn, sql, params=()):
+        cursor = conn.cursor()
+        try:
+            cursor.execute(sql, params)
+            return [tuple(row) for row in cursor.fetchall()]
+        finally:
+            cursor.close()
 
     def add_member_dialog(self):
         """
@@ -144,14 +177,15 @@ class Func3Tab(ttk.Frame):
         uid = self.get_selected_alliance_uid()
         if not uid:
             return
-        cursor = self.conn.cursor()
-        cursor.execute("""
+        sql = """
             SELECT UID, Name FROM tblFed
             WHERE UID NOT IN (
                 SELECT MemberUID FROM tblUmbrellaMember WHERE UmbrellaUID = ?
             )
-        """, (uid,))
-        options = cursor.fetchall()
+        """
+        self.db_job(self._read_options, sql, (uid,), on_done=lambda options: self.show_add_member(uid, options))
+
+    def show_add_member(self, uid, options):
         if not options:
             messagebox.showinfo("No Federations", "No federations available to add.")
             return
@@ -161,11 +195,11 @@ class Func3Tab(ttk.Frame):
         dialog.geometry("420x180")
         ttk.Label(dialog, text="Select Federation:").pack(padx=10, pady=5)
         fed_var = tk.StringVar()
-        fed_combo = ttk.Combobox(dialog, values=[f"{row.UID}: {row.Name}" for row in options], state="normal", width=40, textvariable=fed_var)
+        fed_combo = ttk.Combobox(dialog, values=[f"{fed_uid}: {name}" for fed_uid, name in options], state="normal", width=40, textvariable=fed_var)
         fed_combo.pack(padx=10, pady=5)
         def on_fed_keyrelease(event):
             val = fed_var.get().lower()
-            filtered = [f"{row.UID}: {row.Name}" for row in options if val in row.Name.lower() or val in str(row.UID)]
+            filtered = [f"{fed_uid}: {name}" for fed_uid, name in options if val in name.lower() or val in str(fed_uid)]
             fed_combo['values'] = filtered
         fed_combo.bind('<KeyRelease>', on_fed_keyrelease)
         perm_var = tk.BooleanVar()
@@ -177,19 +211,27 @@ class Func3Tab(ttk.Frame):
             if not val:
                 return
             fed_uid = int(val.split(":")[0])
-            cursor.execute("SELECT MAX(UID) FROM tblUmbrellaMember")
-            max_uid = cursor.fetchone()[0]
-            next_uid = (max_uid + 1) if max_uid is not None else 1
-            cursor.execute(
-                "INSERT INTO tblUmbrellaMember (UID, Recordname, UmbrellaUID, MemberUID, Permanent, Active) VALUES (?, ?, ?, ?, ?, ?)",
-                (next_uid, f"{uid}_{fed_uid}", uid, fed_uid, int(perm_var.get()), int(act_var.get()))
+            self.db_job(
+                self._add_member, self.app.connection.uids, uid, fed_uid, int(perm_var.get()), int(act_var.get()),
+                on_done=self.member_added, title="Update Error",
             )
-            self.conn.commit()
             dialog.destroy()
-            self.load_alliance()
         ttk.Button(dialog, text="Add", command=add).pack(pady=5)
         ttk.Button(dialog, text="Cancel", command=dialog.destroy).pack(pady=2)
 
+    @staticmethod
+    def _add_member(conn, uids, uid, fed_uid, permanent, active):
+        # The UID is allocated in the job, as allocating may have to read the table's highest UID
+        next_uid = uids.allocate("tblUmbrellaMember")
+        run_statements(conn, [(
+            "INSERT INTO tblUmbrellaMember (UID, Recordname, UmbrellaUID, MemberUID, Permanent, Active) VALUES (?, ?, ?, ?, ?, ?)",
+            (next_uid, f"{uid}_{fed_uid}", uid, fed_uid, permanent, active),
+        )])
+
+    def member_added(self, _):
+        self.app.notify_table_written("tblUmbrellaMember")
+        self.load_alliance()
+
     def remove_member(self):
         """
         Remove the selected member from the alliance.
@@ -201,13 +243,10 @@ class Func3Tab(ttk.Frame):
         uid = self.get_selected_alliance_uid()
         if not uid:
             return
-        cursor = self.conn.cursor()
-        cursor.execute(
-            "DELETE FROM tblUmbrellaMember WHERE UmbrellaUID = ? AND UID = ?",
-            (uid, member_uid)
+        self.db_write(
+            [("DELETE FROM tblUmbrellaMember WHERE UmbrellaUID = ? AND UID = ?", (uid, member_uid))],
+            ["tblUmbrellaMember"], on_done=self.load_alliance,
         )
-        self.conn.commit()
-        self.load_alliance()
 
     def add_belt_dialog(self):
         """
@@ -216,14 +255,15 @@ class Func3Tab(ttk.Frame):
         uid = self.get_selected_alliance_uid()
         if not uid:
             return
-        cursor = self.conn.cursor()
-        cursor.execute("""
+        sql = """
             SELECT b.UID, b.Name, f.Initials
             FROM tblBelt AS b
             LEFT JOIN tblFed AS f ON b.Fed = f.UID
             WHERE b.AllianceUID IS NULL OR b.AllianceUID <> ?
-        """, (uid,))
-        options = cursor.fetchall()
+        """
+        self.db_job(self._read_options, sql, (uid,), on_done=lambda options: self.show_add_belt(uid, options))
+
+    def show_add_belt(self, uid, options):
         if not options:
             messagebox.showinfo("No Belts", "No belts available to add.")
             return
@@ -233,11 +273,11 @@ class Func3Tab(ttk.Frame):
         dialog.geometry("420x180")
         ttk.Label(dialog, text="Select Belt:").pack(padx=10, pady=5)
         belt_var = tk.StringVar()
-        belt_combo = ttk.Combobox(dialog, values=[f"{row.UID}: {row.Name} [{row[2]}]" if row[2] else f"{row.UID}: {row.Name}" for row in options], state="normal", width=40, textvariable=belt_var)
+        belt_combo = ttk.Combobox(dialog, values=[f"{row[0]}: {row[1]} [{row[2]}]" if row[2] else f"{row[0]}: {row[1]}" for row in options], state="normal", width=40, textvariable=belt_var)
         belt_combo.pack(padx=10, pady=5)
         def on_belt_keyrelease(event):
             val = belt_var.get().lower()
-            filtered = [f"{row.UID}: {row.Name} [{row[2]}]" if row[2] else f"{row.UID}: {row.Name}" for row in options if val in row.Name.lower() or val in str(row.UID) or (row[2] and val in row[2].lower())]
+            filtered = [f"{row[0]}: {row[1]} [{row[2]}]" if row[2] else f"{row[0]}: {row[1]}" for row in options if val in row[1].lower() or val in str(row[0]) or (row[2] and val in row[2].lower())]
             belt_combo['values'] = filtered
         belt_combo.bind('<KeyRelease>', on_belt_keyrelease)
         def add():
@@ -245,13 +285,11 @@ class Func3Tab(ttk.Frame):
             if not val:
                 return
             belt_uid = int(val.split(":")[0])
-            cursor.execute(
-                "UPDATE tblBelt SET AllianceUID = ? WHERE UID = ?",
-                (uid, belt_uid)
+            self.db_write(
+                [("UPDATE tblBelt SET AllianceUID = ? WHERE UID = ?", (uid, belt_uid))],
+                ["tblBelt"], on_done=self.load_alliance,
             )
-            self.conn.commit()
             dialog.destroy()
-            self.load_alliance()
         ttk.Button(dialog, text="Add", command=add).pack(pady=5)
         ttk.Button(dialog, text="Cancel", command=dialog.destroy).pack(pady=2)
 
@@ -263,40 +301,36 @@ class Func3Tab(ttk.Frame):
         if not sel:
             return
         belt_uid = self.belt_tree.item(sel[0], "values")[0]
-        cursor = self.conn.cursor()
 
         if messagebox.askyesno("Reassign Belt", "Do you want to reassign this belt to a federation?"):
-            dialog = tk.Toplevel(self)
-            dialog.title("Select Federation")
-            ttk.Label(dialog, text="Select Federation:").pack(padx=10, pady=5)
-            cursor.execute("SELECT UID, Name FROM tblFed")
-            feds = cursor.fetchall()
-            fed_combo = ttk.Combobox(dialog, values=[f"{row.UID}: {row.Name}" for row in feds], state="readonly")
-            fed_combo.pack(padx=10, pady=5)
-
-            def assign_and_remove():
-                val = fed_combo.get()
-                if not val:
-                    messagebox.showwarning("No selection", "Please select a federation.")
-                    return
-                fed_uid = int(val.split(":")[0])
-                cursor.execute(
-                    "UPDATE tblBelt SET AllianceUID = 0.0, Fed = ? WHERE UID = ?",
-                    (fed_uid, belt_uid)
-                )
-                self.conn.commit()
-                dialog.destroy()
-                self.load_alliance()
-
-            ttk.Button(dialog, text="Assign", command=assign_and_remove).pack(pady=5)
-            ttk.Button(dialog, text="Cancel", command=lambda: [dialog.destroy(), self.load_alliance()]).pack(pady=2)
+            self.db_job(self._read_options, "SELECT UID, Name FROM tblFed", on_done=lambda feds: self.show_reassign_belt(belt_uid, feds))
         else:
-            cursor.execute(
-                "UPDATE tblBelt SET AllianceUID = 0.0 WHERE UID = ?",
-                (belt_uid,)
+            self.db_write(
+                [("UPDATE tblBelt SET AllianceUID = 0.0 WHERE UID = ?", (belt_uid,))],
+                ["tblBelt"], on_done=self.load_alliance,
             )
-            self.conn.commit()
-            self.load_alliance()
+
+    def show_reassign_belt(self, belt_uid, feds):
+        dialog = tk.Toplevel(self)
+        dialog.title("Select Federation")
+        ttk.Label(dialog, text="Select Federation:").pack(padx=10, pady=5)
+        fed_combo = ttk.Combobox(dialog, values=[f"{fed_uid}: {name}" for fed_uid, name in feds], state="readonly")
+        fed_combo.pack(padx=10, pady=5)
+
+        def assign_and_remove():
+            val = fed_combo.get()
+            if not val:
+                messagebox.showwarning("No selection", "Please select a federation.")
+                return
+            fed_uid = int(val.split(":")[0])
+            self.db_write(
+                [("UPDATE tblBelt SET AllianceUID = 0.0, Fed = ? WHERE UID = ?", (fed_uid, belt_uid))],
+                ["tblBelt"], on_done=self.load_alliance,
+            )
+            dialog.destroy()
+
+        ttk.Button(dialog, text="Assign", command=assign_and_remove).pack(pady=5)
+        ttk.Button(dialog, text="Cancel", command=lambda: [dialog.destroy(), self.load_alliance()]).pack(pady=2)
 
     def reload_alliances(self, conn):
         """
@@ -305,6 +339,12 @@ class Func3Tab(ttk.Frame):
         self.conn = conn
         self.load_alliances()
 
+    def on_eject(self):
+        """
+        Clear the alliance of the closed save.
+        """
+        self.clear()
+
     def clear(self):
         """
         Clear the member and belt tables and reset the alliance dropdown.
@@ -1,23 +1,25 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import pyodbc
+from components.components import DatabaseTab
 import random
+from utils.table_cache import PREBOOKING_TABLES, USERBOOKING_TABLES
 
-class Func4Tab(ttk.Frame):
+class Func4Tab(DatabaseTab):
     """
     Tab for copying selected prebooked matches from a card to the user booked card in the savegame.
     Only user-controlled promotions are shown. User can select which matches to book.
     """
+    TABLES = PREBOOKING_TABLES + ("tblTonightsSchedule", "tblFed", "tblGameInfo")
+
     def __init__(self, parent, app):
-        super().__init__(parent)
-        self.app = app
-        self.conn = None
+        super().__init__(parent, app)
         self.current_date = None
         self.feds = {}
         self.selected_fed = tk.StringVar()
         self.show_uids = []
         self.prebookings = []
         self.match_vars = []
+        self.cards_request = None
 
         # Sidebar
         sidebar_frame = ttk.Frame(self)
@@ -55,28 +57,19 @@ class Func4Tab(ttk.Frame):
         ttk.Button(btns_frame, text="Book", command=self.book_prebooked).pack(side=tk.LEFT, padx=5)
         self.status_label = ttk.Label(self, text="")
         self.status_label.pack(pady=2)
-        self.after(500, self.try_load)
-
-       
 
-    def try_load(self):
-        self.conn = self.app.conn
-        if self.conn:
-            self.load_current_date()
-            self.load_feds()
+    def on_connect(self):
+        """
+        Load the date, promotions and tonight's cards of the connected save.
+        """
+        self.refresh_tab()
 
-    def load_current_date(self):
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT CurrentGameDate FROM tblGameInfo")
-        row = cursor.fetchone()
-        self.current_date = row[0] if row else None
+    def load_current_date(self, current_date):
+        self.current_date = current_date
         self.date_label.config(text=f"Current Date: {self.current_date}")
-        cursor.close()
 
-    def load_feds(self):
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT UID, Name FROM tblFed WHERE User_Controlled = 1")
-        self.feds = {str(row.UID): row.Name for row in cursor.fetchall()}
+    def load_feds(self, feds):
+        self.feds = feds
         self.fed_combo['values'] = list(self.feds.values())
         if self.feds:
             self.fed_combo.current(0)
@@ -85,7 +78,6 @@ class Func4Tab(ttk.Frame):
         else:
             self.selected_fed.set("")
             self.fed_combo.set("")
-        cursor.close()
 
     def get_selected_fed_uid(self):
         name = self.selected_fed.get()
@@ -106,10 +98,35 @@ class Func4Tab(ttk.Frame):
         fed_uid = self.get_selected_fed_uid()
         if not fed_uid or not self.conn:
             return
-        cursor = self.conn.cursor()
-        # Get CardUIDs for tonight's user booked shows
-        cursor.execute("SELECT CardUID FROM tblTonightsSchedule WHERE FedUID = ?", (fed_uid,))
-        card_uids = [row[0] for row in cursor.fetchall()]
+        # Only the cards of the latest request are shown
+        self.cards_request = request = object()
+        self.db_job(self._read_tonight_cards, fed_uid, on_done=lambda cards: self.show_tonight_cards(request, *cards))
+
+    @staticmethod
+    def _read_tonight_cards(conn, fed_uid):
+        """
+        Return tonight's CardUIDs of the promotion and their prebookings as [(pb, winner_options)].
+        """
+        cursor = conn.cursor()
+        try:
+            # Get CardUIDs for tonight's user booked shows
+            cursor.execute("SELECT CardUID FROM tblTonightsSchedule WHERE FedUID = ?", (fed_uid,))
+            card_uids = [row[0] for row in cursor.fetchall()]
+            prebookings = []
+            for card_uid in card_uids:
+                cursor.execute("SELECT * FROM tblPreBooking WHERE CardUID = ?", (card_uid,))
+                prebookings.extend(cursor.fetchall())
+            matches = []
+            for pb in prebookings:
+                cursor.execute("SELECT Involved FROM tblPreBookingInvolvedMatch WHERE PreBookingUID = ?", (pb.UID,))
+                matches.append((pb, [str(row[0]) for row in cursor.fetchall()]))
+            return card_uids, matches
+        finally:
+            cursor.close()
+
+    def show_tonight_cards(self, request, card_uids, matches):
+        if request is not self.cards_request:
+            return
         if not card_uids:
             ttk.Label(self.matches_frame, text="No user booked shows for this promotion tonight.").pack()
             return
@@ -136,22 +153,14 @@ class Func4Tab(ttk.Frame):
         self.match_tree.bind('<Double-1>', self._on_tree_double_click)
         self._tree_drag_data = {'item': None, 'y': 0}
         self.tree_match_vars = []  
-        # Query prebooked matches for all CardUIDs
-        for card_uid in card_uids:
-            cursor.execute("SELECT * FROM tblPreBooking WHERE CardUID = ?", (card_uid,))
-            for pb in cursor.fetchall():
-                self.prebookings.append(pb)
+        self.prebookings = [pb for pb, _ in matches]
         if not self.prebookings:
             ttk.Label(self.matches_frame, text="No prebooked matches found for tonight's shows.").pack()
             return
-        for idx, pb in enumerate(self.prebookings):
+        for idx, (pb, winner_options) in enumerate(matches):
             select_var = tk.BooleanVar(value=False)
             winner_var = tk.StringVar()
             length_var = tk.StringVar(value=str(getattr(pb, 'Length', 10)))
-            cursor2 = self.conn.cursor()
-            cursor2.execute("SELECT Involved FROM tblPreBookingInvolvedMatch WHERE PreBookingUID = ?", (pb.UID,))
-            winner_options = [str(row[0]) for row in cursor2.fetchall()]
-            cursor2.close()
             self.tree_match_vars.append((select_var, pb, winner_var, length_var, winner_options))
             self.match_tree.insert("", "end", iid=str(idx), values=("", getattr(pb, 'Booking_Name', ''), getattr(pb, 'CardUID', ''), '', length_var.get(), idx+1))
         self._update_tree_segment_orders()
@@ -233,6 +242,21 @@ class Func4Tab(ttk.Frame):
         if not fed_uid:
             messagebox.showerror("Error", "No promotion selected.")
             return
+        # 1. Only book checked matches (use current order and lengths)
+        selected = []
+        for idx, (select_var, pb, winner_var, length_var, _) in enumerate(self.tree_match_vars):
+            if select_var.get():
+                seg_order = int(self.match_tree.set(str(idx), "Segment Order"))
+                selected.append((pb, winner_var.get(), length_var.get(), seg_order))
+        if not selected:
+            messagebox.showinfo("No Selection", "No matches selected.")
+            return
+        self.app.run_db_job("Booking matches", self._book_prebooked_job, fed_uid, selected, on_done=self.on_prebooked_booked)
+
+    def _book_prebooked_job(self, job, fed_uid, selected):
+        """
+        Copy the selected prebooked matches to tblUserBooking, run on the database executor.
+        """
         cursor = self.conn.cursor()
         # Get announcers from tblFed
         cursor.execute("SELECT Announce1, Announce2, Announce3 FROM tblFed WHERE UID = ?", (fed_uid,))
@@ -245,25 +269,16 @@ class Func4Tab(ttk.Frame):
         referees = [row[0] for row in cursor.fetchall()]
         cursor.execute("SELECT WorkerUID FROM tblContract WHERE FedUID = ? AND Position_Roadagent = 1", (fed_uid,))
         roadagents = [row[0] for row in cursor.fetchall()]
-        # 1. Only book checked matches (use current order and lengths)
-        selected = []
-        for idx, (select_var, pb, winner_var, length_var, _) in enumerate(self.tree_match_vars):
-            if select_var.get():
-                seg_order = int(self.match_tree.set(str(idx), "Segment Order"))
-                selected.append((pb, winner_var.get(), length_var.get(), seg_order))
-        if not selected:
-            messagebox.showinfo("No Selection", "No matches selected.")
-            return
-        # 2. Get current max Segment_Order and UID in tblUserBooking
+        # 2. Get current max Segment_Order and reserve the new UIDs in tblUserBooking
         cursor.execute("SELECT MAX(Segment_Order) FROM tblUserBooking")
         max_order = cursor.fetchone()[0] or 0
-        cursor.execute("SELECT MAX(UID) FROM tblUserBooking")
-        max_uid = cursor.fetchone()[0] or 0
+        max_uid = self.app.connection.uids.allocate("tblUserBooking", len(selected)) - 1
         # 3. Get current max Position in tblUserBookingNote
         cursor.execute("SELECT MAX(Position) FROM tblUserBookingNote")
         max_note_pos = cursor.fetchone()[0] or 0
         # 4. Copy each selected prebooking to tblUserBooking and related tables
         for i, (pb, winner_uid, match_length, seg_order) in enumerate(selected):
+            job.progress(i, len(selected), f"Booking match {i + 1} of {len(selected)}...")
             new_uid = max_uid + i + 1
             referee = random.choice(referees) if referees else None
             roadagent = random.choice(roadagents) if roadagents else None
@@ -300,8 +315,12 @@ class Func4Tab(ttk.Frame):
                     new_uid, max_note_pos, 1, int(winner_uid), fed_uid
                 ))
         self.conn.commit()
-        self.status_label.config(text=f"Copied {len(selected)} prebooked matches to user booking.")
-        messagebox.showinfo("Done", f"Copied {len(selected)} prebooked matches to user booking.")
+        return len(selected)
+
+    def on_prebooked_booked(self, count):
+        self.app.notify_table_written(*USERBOOKING_TABLES)
+        self.status_label.config(text=f"Copied {count} prebooked matches to user booking.")
+        messagebox.showinfo("Done", f"Copied {count} prebooked matches to user booking.")
 
     def refresh_tab(self):
         """
@@ -309,14 +328,13 @@ class Func4Tab(ttk.Frame):
         """
         self.conn = self.app.conn
         if self.conn:
-            self.load_current_date()
-            self.load_feds()
-            if self.feds:
-                self.fed_combo.current(0)
-                self.selected_fed.set(self.fed_combo.get())
-                self.load_tonight_cards()
-            else:
-                self.selected_fed.set("")
-                self.fed_combo.set("")
-                for widget in self.matches_frame.winfo_children():
-                    widget.destroy()
+            connection = self.app.connection
+            self.db_job(lambda conn: (connection.current_date(), connection.user_feds()), on_done=self.show_lookups)
+
+    def show_lookups(self, lookups):
+        current_date, feds = lookups
+        self.load_current_date(current_date)
+        self.load_feds(feds)
+        if not self.feds:
+            for widget in self.matches_frame.winfo_children():
+                widget.destroy()
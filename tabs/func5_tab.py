@@ -1,30 +1,30 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
+from components.components import DatabaseTab
 import random
-import pyodbc
 from utils.round_robin import (
     clear_pre_booking,
 )
+from utils.table_cache import PREBOOKING_TABLES, USERBOOKING_TABLES
 
-class Func5Tab(ttk.Frame):
+class Func5Tab(DatabaseTab):
     """
     Auto Booker tab for booking a card with user-defined parameters.
     Provides UI for selecting promotion, match types, options, and times.
     Handles the logic for auto-booking matches and updating the database.
     """
+    TABLES = ("tblMatch", "tblFed", "tblGameInfo")
+
     def __init__(self, parent, app):
         """
         Initialize the Auto Booker tab UI and variables.
         """
-        super().__init__(parent)
-        self.app = app
-        self.conn = None
+        super().__init__(parent, app)
         self.feds = {}
         self.selected_fed = tk.StringVar()
         self.match_types_dict = {1: [], 2: [], 3: [], 4: [], 5: []}
         self.match_type_vars = {1: tk.StringVar(), 2: tk.StringVar(), 3: tk.StringVar(), 4: tk.StringVar(), 5: tk.StringVar()}
         self._build_ui()
-        self.after(500, self.refresh)
 
     def _build_ui(self):
         """
@@ -102,33 +102,49 @@ class Func5Tab(ttk.Frame):
         self.status_label = ttk.Label(self, text="")
         self.status_label.pack(pady=2)
 
+    def on_connect(self):
+        """
+        Load the date, promotions and match types of the connected save.
+        """
+        self.refresh()
+
     def refresh(self):
         """
         Refresh the tab by reloading the current date, promotions, and match types from the database.
         """
         self.conn = self.app.conn
         if self.conn:
-            self.load_current_date()
-            self.load_feds()
-            self.load_match_types()
+            self.db_job(self._read_refresh, self.app.connection, on_done=self.show_refresh)
+
+    @staticmethod
+    def _read_refresh(conn, connection):
+        cursor = conn.cursor()
+        try:
+            match_types = {}
+            for size in range(1, 6):
+                cursor.execute("SELECT UID, Name FROM tblMatch WHERE Match_Type = ?", (size,))
+                match_types[size] = [(row.UID, row.Name) for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+        return connection.current_date(), connection.user_feds(), match_types
 
-    def load_current_date(self):
+    def show_refresh(self, result):
+        current_date, feds, match_types = result
+        self.load_current_date(current_date)
+        self.load_feds(feds)
+        self.load_match_types(match_types)
+
+    def load_current_date(self, current_date):
         """
-        Load the current game date from the database.
+        Show the current game date, read once per connection by the app.
         """
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT CurrentGameDate FROM tblGameInfo")
-        row = cursor.fetchone()
-        self.current_date = row[0] if row else None
-        cursor.close()
+        self.current_date = current_date
 
-    def load_feds(self):
+    def load_feds(self, feds):
         """
-        Load user-controlled promotions from the database and update the combobox.
+        Show the user-controlled promotions (read once per connection by the app) in the combobox.
         """
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT UID, Name FROM tblFed WHERE User_Controlled = 1")
-        self.feds = {str(row.UID): row.Name for row in cursor.fetchall()}
+        self.feds = feds
         values = list(self.feds.values())
         current = self.selected_fed.get()
         self.fed_combo['values'] = values
@@ -140,59 +156,20 @@ class Func5Tab(ttk.Frame):
             self.selected_fed.set("")
             self.fed_combo.set("")
         self.fed_combo.update_idletasks()
-        cursor.close()
 
-    def load_match_types(self):
+    def load_match_types(self, match_types):
         """
-        Load available match types for each kind (1v1, 2v2, etc.) from the database and update dropdowns.
+        Show the match types of each kind (1v1, 2v2, etc.), as {kind: [(UID, Name)]}, in their dropdowns.
         """
-        cursor = self.conn.cursor()
-        # 1v1
-        cursor.execute("SELECT UID, Name FROM tblMatch WHERE Match_Type = 1")
-        self.match_types_dict[1] = [(row.UID, row.Name) for row in cursor.fetchall()]
-        singles_names = [name for _, name in self.match_types_dict[1]]
-        self.singles_combo['values'] = singles_names
-        if singles_names:
-            if self.match_type_vars[1].get() not in singles_names:
-                self.match_type_vars[1].set(singles_names[0])
-            self.singles_combo.set(self.match_type_vars[1].get())
-        # 2v2
-        cursor.execute("SELECT UID, Name FROM tblMatch WHERE Match_Type = 2")
-        self.match_types_dict[2] = [(row.UID, row.Name) for row in cursor.fetchall()]
-        tag_names = [name for _, name in self.match_types_dict[2]]
-        self.tag_combo['values'] = tag_names
-        if tag_names:
-            if self.match_type_vars[2].get() not in tag_names:
-                self.match_type_vars[2].set(tag_names[0])
-            self.tag_combo.set(self.match_type_vars[2].get())
-        # 3v3
-        cursor.execute("SELECT UID, Name FROM tblMatch WHERE Match_Type = 3")
-        self.match_types_dict[3] = [(row.UID, row.Name) for row in cursor.fetchall()]
-        three_names = [name for _, name in self.match_types_dict[3]]
-        self.three_combo['values'] = three_names
-        if three_names:
-            if self.match_type_vars[3].get() not in three_names:
-                self.match_type_vars[3].set(three_names[0])
-            self.three_combo.set(self.match_type_vars[3].get())
-        # 4v4
-        cursor.execute("SELECT UID, Name FROM tblMatch WHERE Match_Type = 4")
-        self.match_types_dict[4] = [(row.UID, row.Name) for row in cursor.fetchall()]
-        four_names = [name for _, name in self.match_types_dict[4]]
-        self.four_combo['values'] = four_names
-        if four_names:
-            if self.match_type_vars[4].get() not in four_names:
-                self.match_type_vars[4].set(four_names[0])
-            self.four_combo.set(self.match_type_vars[4].get())
-        # 5v5
-        cursor.execute("SELECT UID, Name FROM tblMatch WHERE Match_Type = 5")
-        self.match_types_dict[5] = [(row.UID, row.Name) for row in cursor.fetchall()]
-        five_names = [name for _, name in self.match_types_dict[5]]
-        self.five_combo['values'] = five_names
-        if five_names:
-            if self.match_type_vars[5].get() not in five_names:
-                self.match_type_vars[5].set(five_names[0])
-            self.five_combo.set(self.match_type_vars[5].get())
-        cursor.close()
+        combos = {1: self.singles_combo, 2: self.tag_combo, 3: self.three_combo, 4: self.four_combo, 5: self.five_combo}
+        for size, combo in combos.items():
+            self.match_types_dict[size] = match_types[size]
+            names = [name for _, name in match_types[size]]
+            combo['values'] = names
+            if names:
+                if self.match_type_vars[size].get() not in names:
+                    self.match_type_vars[size].set(names[0])
+                combo.set(self.match_type_vars[size].get())
 
     def get_selected_fed_uid(self):
         """
@@ -217,12 +194,43 @@ class Func5Tab(ttk.Frame):
         if not fed_uid:
             messagebox.showerror("Error", "No promotion selected.")
             return
+        if self.singles_var.get() + self.tag_var.get() + self.three_var.get() + self.four_var.get() + self.five_var.get() != 100:
+            messagebox.showerror("Error", "Percentages must sum to 100%.")
+            return
+        # Read every setting here: the booking itself runs on the database thread
+        options = {
+            "num_matches": self.num_matches_var.get(),
+            "singles": self.singles_var.get(),
+            "tag": self.tag_var.get(),
+            "three": self.three_var.get(),
+            "four": self.four_var.get(),
+            "five": self.five_var.get(),
+            "use_stables": self.use_stables_var.get(),
+            "use_weight": self.use_weight_var.get(),
+            "use_faceheel": self.use_faceheel_var.get(),
+            "allow_intergender": self.allow_intergender_var.get(),
+            "main_time": self.main_time_var.get(),
+            "comain_time": self.comain_time_var.get(),
+            "other_min": self.other_min_var.get(),
+            "other_max": self.other_max_var.get(),
+            # MatchUID picked in the dropdown for each match type
+            "match_uids": {
+                mtype: next((uid for uid, name in self.match_types_dict[size] if name == self.match_type_vars[size].get()), None)
+                for size, mtype in enumerate(["singles", "tag", "3v3", "4v4", "5v5"], start=1)
+            },
+        }
+        self.app.run_db_job("Auto booking", self._auto_book_job, fed_uid, options, on_done=self.on_auto_booked)
+
+    def _auto_book_job(self, job, fed_uid, options):
+        """
+        Pick and book the matches, run on the database executor.
+        Returns the number of matches booked, or None when the promotion has no show tonight.
+        """
         cursor = self.conn.cursor()
         cursor.execute("SELECT CardUID FROM tblTonightsSchedule WHERE FedUID = ?", (fed_uid,))
         card_uids = [row[0] for row in cursor.fetchall()]
         if not card_uids:
-            messagebox.showinfo("No Show", "No user booked shows for this promotion tonight.")
-            return
+            return None
         cursor.execute("SELECT tblContract.WorkerUID, tblContract.Face, tblWorker.Gender FROM tblContract INNER JOIN tblWorker ON tblContract.WorkerUID = tblWorker.UID WHERE tblContract.FedUID = ? AND tblContract.Position_Wrestler = 1", (fed_uid,))
         wrestlers = [(row[0], row[1], row[2]) for row in cursor.fetchall()]
         wrestler_ids = [w[0] for w in wrestlers]
@@ -255,23 +263,20 @@ class Func5Tab(ttk.Frame):
         cursor.execute("SELECT WorkerUID FROM tblContract WHERE FedUID = ? AND Position_Roadagent = 1", (fed_uid,))
         roadagents = [row[0] for row in cursor.fetchall()]
         # Booking logic
-        num_matches = self.num_matches_var.get()
-        singles = self.singles_var.get()
-        tag = self.tag_var.get()
-        three = self.three_var.get()
-        four = self.four_var.get()
-        five = self.five_var.get()
-        if singles + tag + three + four + five != 100:
-            messagebox.showerror("Error", "Percentages must sum to 100%.")
-            return
-        use_stables = self.use_stables_var.get()
-        use_weight = self.use_weight_var.get()
-        use_faceheel = self.use_faceheel_var.get()
-        allow_intergender = self.allow_intergender_var.get()
-        main_time = self.main_time_var.get()
-        comain_time = self.comain_time_var.get()
-        other_min = self.other_min_var.get()
-        other_max = self.other_max_var.get()
+        num_matches = options["num_matches"]
+        singles = options["singles"]
+        tag = options["tag"]
+        three = options["three"]
+        four = options["four"]
+        five = options["five"]
+        use_stables = options["use_stables"]
+        use_weight = options["use_weight"]
+        use_faceheel = options["use_faceheel"]
+        allow_intergender = options["allow_intergender"]
+        main_time = options["main_time"]
+        comain_time = options["comain_time"]
+        other_min = options["other_min"]
+        other_max = options["other_max"]
         # Build match types list
         match_types = (["singles"] * (singles * num_matches // 100) +
                        ["tag"] * (tag * num_matches // 100) +
@@ -286,7 +291,8 @@ class Func5Tab(ttk.Frame):
         matches = []
         # Build face/heel and weight maps
         face_map = {w[0]: w[1] for w in wrestlers}
-        for mtype in match_types:
+        for picked, mtype in enumerate(match_types):
+            job.progress(picked, len(match_types), "Picking matches...")
             pool = [w for w in wrestlers if w[0] not in booked_workers]
             # Enforce gender if not intergender
             if not allow_intergender:
@@ -538,138 +544,124 @@ class Func5Tab(ttk.Frame):
         matches.sort(key=avg_perception, reverse=True)
         #matches = matches[::-1]  # Invert order: least important first
         # Pre-book all matches
-        def get_worker_names(uids):
-            if not uids:
-                return []
-            batch_size = 50
-            names = {}
-            for i in range(0, len(uids), batch_size):
-                batch = tuple(uids[i:i+batch_size])
-                qmarks = ','.join(['?'] * len(batch))
-                cursor.execute(f"SELECT UID, Name FROM tblWorker WHERE UID IN ({qmarks})", batch)
-                for row in cursor.fetchall():
-                    names[row[0]] = row[1]
-            return names
-        worker_names = get_worker_names(wrestler_ids)
-        # Clear pre-booking
-        cursor.execute('DELETE FROM tblPreBooking')
-        cursor.execute('DELETE FROM tblPreBookingInvolvedMatch')
-        cursor.execute('DELETE FROM tblPreBookingNote')
-        self.conn.commit()
-        # Insert pre-bookings
-        cursor.execute('SELECT MAX(UID) FROM tblPreBooking')
-        last_prebooking_id = cursor.fetchone()[0] or 0
-        for i, (side1, side2, mtype) in enumerate(matches):
-            pb_uid = last_prebooking_id + i + 1
-            card_uid = card_uids[i % len(card_uids)]
-            # Build match name
-            def get_names(uids):
-                return [worker_names.get(uid, str(uid)) for uid in uids]
-            if mtype == "singles":
-                match_name = f"{get_names(side1)[0]} vs {get_names(side2)[0]}"
-            else:
-                match_name = f"{'/'.join(get_names(side1))} vs {'/'.join(get_names(side2))}"
-            # Pick match_uid from dropdown
-            if mtype == "singles":
-                match_uid = next((uid for uid, name in self.match_types_dict[1] if name == self.match_type_vars[1].get()), None)
-            elif mtype == "tag":
-                match_uid = next((uid for uid, name in self.match_types_dict[2] if name == self.match_type_vars[2].get()), None)
-            elif mtype == "3v3":
-                match_uid = next((uid for uid, name in self.match_types_dict[3] if name == self.match_type_vars[3].get()), None)
-            elif mtype == "4v4":
-                match_uid = next((uid for uid, name in self.match_types_dict[4] if name == self.match_type_vars[4].get()), None)
-            elif mtype == "5v5":
-                match_uid = next((uid for uid, name in self.match_types_dict[5] if name == self.match_type_vars[5].get()), None)
-            else:
-                match_uid = None
-            # Set match length: last match is main, second to last is co-main
-            if i == len(matches) - 1:
-                length = self.main_time_var.get()
-            elif i == len(matches) - 2:
-                length = self.comain_time_var.get()
-            else:
-                length = random.randint(self.other_min_var.get(), self.other_max_var.get())
-            # Insert into tblPreBooking
-            cursor.execute("""
-                INSERT INTO tblPreBooking (UID, Booking_Name, FedUID, CardUID, TVUID, Match, MatchUID, Length, Major, Belt1, Belt2, Belt3, Booked, AngleOutput, Scripted)
-                VALUES (?, ?, ?, ?, 0, 1, ?, ?, 1, 0, 0, 0, 0, 0, NULL)
-            """, (pb_uid, match_name, fed_uid, card_uid, match_uid, length))
-            # Insert involved
-            pos = 1
-            for w in side1:
-                cursor.execute("INSERT INTO tblPreBookingInvolvedMatch (PreBookingUID, FedUID, Position, Involved, Complain) VALUES (?, ?, ?, ?, 0)", (pb_uid, fed_uid, pos, w))
-                pos += 1
-            for w in side2:
-                cursor.execute("INSERT INTO tblPreBookingInvolvedMatch (PreBookingUID, FedUID, Position, Involved, Complain) VALUES (?, ?, ?, ?, 0)", (pb_uid, fed_uid, pos, w))
-                pos += 1
-            # Insert note (winner random)
-            all_participants = side1 + side2
-            if all_participants:
-                winner_uid = random.choice(all_participants)
+        worker_names = self.app.connection.worker_names.resolve(wrestler_ids)
+        # Clear, pre-book and move to the card in one transaction, so a failure or Cancel
+        # leaves the previous bookings untouched
+        try:
+            # Clear pre-booking
+            cursor.execute('DELETE FROM tblPreBooking')
+            cursor.execute('DELETE FROM tblPreBookingInvolvedMatch')
+            cursor.execute('DELETE FROM tblPreBookingNote')
+            # Insert pre-bookings
+            last_prebooking_id = self.app.connection.uids.allocate("tblPreBooking", len(matches)) - 1
+            for i, (side1, side2, mtype) in enumerate(matches):
+                job.progress(i, len(matches), "Pre-booking matches...")
+                pb_uid = last_prebooking_id + i + 1
+                card_uid = card_uids[i % len(card_uids)]
+                # Build match name
+                def get_names(uids):
+                    return [worker_names.get(uid, str(uid)) for uid in uids]
+                if mtype == "singles":
+                    match_name = f"{get_names(side1)[0]} vs {get_names(side2)[0]}"
+                else:
+                    match_name = f"{'/'.join(get_names(side1))} vs {'/'.join(get_names(side2))}"
+                # Pick match_uid from dropdown
+                match_uid = options["match_uids"].get(mtype)
+                # Set match length: last match is main, second to last is co-main
+                if i == len(matches) - 1:
+                    length = main_time
+                elif i == len(matches) - 2:
+                    length = comain_time
+                else:
+                    length = random.randint(other_min, other_max)
+                # Insert into tblPreBooking
                 cursor.execute("""
-                    INSERT INTO tblPreBookingNote (
-                        UserBookingUID, Position, RoadAgent_Type, RoadAgent_Worker, RoadAgent_Attack, Used, BeltUID, Champion1, Champion2, Champion3, Match, FedUID, StoryUID, IdeaUID, IdeaName
-                    ) VALUES (?, 1, 200, 0, 0, 0, 0, 0, 0, 0, 1, ?, 0, 0, NULL)
-                """, (pb_uid, fed_uid))
-        self.conn.commit()
-        # Transfer pre-booked to booked (as in func4_tab.py)
-        cursor.execute("SELECT Announce1, Announce2, Announce3 FROM tblFed WHERE UID = ?", (fed_uid,))
-        ann = cursor.fetchone()
-        announcer1 = ann[0] if ann else None
-        announcer2 = ann[1] if ann else None
-        announcer3 = ann[2] if ann else None
-        cursor.execute("SELECT WorkerUID FROM tblContract WHERE FedUID = ? AND Position_Referee = 1", (fed_uid,))
-        referees = [row[0] for row in cursor.fetchall()]
-        cursor.execute("SELECT WorkerUID FROM tblContract WHERE FedUID = ? AND Position_Roadagent = 1", (fed_uid,))
-        roadagents = [row[0] for row in cursor.fetchall()]
-        cursor.execute("SELECT MAX(Segment_Order) FROM tblUserBooking")
-        max_order = cursor.fetchone()[0] or 0
-        cursor.execute("SELECT MAX(UID) FROM tblUserBooking")
-        max_uid = cursor.fetchone()[0] or 0
-        cursor.execute("SELECT MAX(Position) FROM tblUserBookingNote")
-        max_note_pos = cursor.fetchone()[0] or 0
-        cursor.execute("SELECT * FROM tblPreBooking WHERE FedUID = ?", (fed_uid,))
-        prebookings = cursor.fetchall()
-        for i, pb in enumerate(prebookings):
-            new_uid = max_uid + i + 1
-            new_order = i + 1  # Main event is position 1
-            referee = random.choice(referees) if referees else None
-            roadagent = random.choice(roadagents) if roadagents else None
-            cursor.execute("""
-                INSERT INTO tblUserBooking (
-                    UID, Segment_Name, MainShow, PostShow, Segment_Order, Match, MatchUID, OverallRating, Referee, RoadAgent, Belt1, Belt2, Belt3, Announcer1, Announcer2, Announcer3, Length, Major, PreBookingUID, Completed, Problematic, ABFlag, ABRating, ABMin, ABMax, AngleOutput, Scripted
-                )
-                SELECT ?, Booking_Name, 1, 0, ?, Match, MatchUID, -1, ?, ?, Belt1, Belt2, Belt3, ?, ?, ?, Length, Major, 0, 0, 0, 0, NULL, NULL, NULL, AngleOutput, Scripted
-                FROM tblPreBooking WHERE UID = ?
-            """, (new_uid, new_order, referee, roadagent, announcer1, announcer2, announcer3, pb.UID))
-            # Copy involved
-            cursor.execute("SELECT * FROM tblPreBookingInvolvedMatch WHERE PreBookingUID = ?", (pb.UID,))
-            for inv in cursor.fetchall():
+                    INSERT INTO tblPreBooking (UID, Booking_Name, FedUID, CardUID, TVUID, Match, MatchUID, Length, Major, Belt1, Belt2, Belt3, Booked, AngleOutput, Scripted)
+                    VALUES (?, ?, ?, ?, 0, 1, ?, ?, 1, 0, 0, 0, 0, 0, NULL)
+                """, (pb_uid, match_name, fed_uid, card_uid, match_uid, length))
+                # Insert involved
+                pos = 1
+                for w in side1:
+                    cursor.execute("INSERT INTO tblPreBookingInvolvedMatch (PreBookingUID, FedUID, Position, Involved, Complain) VALUES (?, ?, ?, ?, 0)", (pb_uid, fed_uid, pos, w))
+                    pos += 1
+                for w in side2:
+                    cursor.execute("INSERT INTO tblPreBookingInvolvedMatch (PreBookingUID, FedUID, Position, Involved, Complain) VALUES (?, ?, ?, ?, 0)", (pb_uid, fed_uid, pos, w))
+                    pos += 1
+                # Insert note (winner random)
+                all_participants = side1 + side2
+                if all_participants:
+                    winner_uid = random.choice(all_participants)
+                    cursor.execute("""
+                        INSERT INTO tblPreBookingNote (
+                            UserBookingUID, Position, RoadAgent_Type, RoadAgent_Worker, RoadAgent_Attack, Used, BeltUID, Champion1, Champion2, Champion3, Match, FedUID, StoryUID, IdeaUID, IdeaName
+                        ) VALUES (?, 1, 200, 0, 0, 0, 0, 0, 0, 0, 1, ?, 0, 0, NULL)
+                    """, (pb_uid, fed_uid))
+            # Transfer pre-booked to booked (as in func4_tab.py)
+            cursor.execute("SELECT Announce1, Announce2, Announce3 FROM tblFed WHERE UID = ?", (fed_uid,))
+            ann = cursor.fetchone()
+            announcer1 = ann[0] if ann else None
+            announcer2 = ann[1] if ann else None
+            announcer3 = ann[2] if ann else None
+            cursor.execute("SELECT WorkerUID FROM tblContract WHERE FedUID = ? AND Position_Referee = 1", (fed_uid,))
+            referees = [row[0] for row in cursor.fetchall()]
+            cursor.execute("SELECT WorkerUID FROM tblContract WHERE FedUID = ? AND Position_Roadagent = 1", (fed_uid,))
+            roadagents = [row[0] for row in cursor.fetchall()]
+            cursor.execute("SELECT MAX(Segment_Order) FROM tblUserBooking")
+            max_order = cursor.fetchone()[0] or 0
+            cursor.execute("SELECT MAX(Position) FROM tblUserBookingNote")
+            max_note_pos = cursor.fetchone()[0] or 0
+            cursor.execute("SELECT * FROM tblPreBooking WHERE FedUID = ?", (fed_uid,))
+            prebookings = cursor.fetchall()
+            max_uid = self.app.connection.uids.allocate("tblUserBooking", len(prebookings)) - 1
+            for i, pb in enumerate(prebookings):
+                job.progress(i, len(prebookings), "Moving matches to the card...")
+                new_uid = max_uid + i + 1
+                new_order = i + 1  # Main event is position 1
+                referee = random.choice(referees) if referees else None
+                roadagent = random.choice(roadagents) if roadagents else None
                 cursor.execute("""
-                    INSERT INTO tblUserBookingInvolvedMatch (UserBookingUID, FedUID, Position, Involved, Complain)
-                    VALUES (?, ?, ?, ?, ?)
-                """, (new_uid, inv.FedUID, inv.Position, inv.Involved, inv.Complain))
-            # Copy notes
-            cursor.execute("SELECT * FROM tblPreBookingNote WHERE UserBookingUID = ?", (pb.UID,))
-            for note in cursor.fetchall():
-                cursor.execute("""
-                    INSERT INTO tblUserBookingNote (
-                        UserBookingUID, Position, RoadAgent_Type, RoadAgent_Worker, RoadAgent_Attack, Used, BeltUID, Champion1, Champion2, Champion3, Match, FedUID, StoryUID, IdeaUID, IdeaName
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    new_uid, note.Position, note.RoadAgent_Type, note.RoadAgent_Worker, note.RoadAgent_Attack, note.Used, note.BeltUID, note.Champion1, note.Champion2, note.Champion3, note.Match, note.FedUID, note.StoryUID, getattr(note, 'IdeaUID', None), getattr(note, 'IdeaName', None)
-                ))
+                    INSERT INTO tblUserBooking (
+                        UID, Segment_Name, MainShow, PostShow, Segment_Order, Match, MatchUID, OverallRating, Referee, RoadAgent, Belt1, Belt2, Belt3, Announcer1, Announcer2, Announcer3, Length, Major, PreBookingUID, Completed, Problematic, ABFlag, ABRating, ABMin, ABMax, AngleOutput, Scripted
+                    )
+                    SELECT ?, Booking_Name, 1, 0, ?, Match, MatchUID, -1, ?, ?, Belt1, Belt2, Belt3, ?, ?, ?, Length, Major, 0, 0, 0, 0, NULL, NULL, NULL, AngleOutput, Scripted
+                    FROM tblPreBooking WHERE UID = ?
+                """, (new_uid, new_order, referee, roadagent, announcer1, announcer2, announcer3, pb.UID))
+                # Copy involved
+                cursor.execute("SELECT * FROM tblPreBookingInvolvedMatch WHERE PreBookingUID = ?", (pb.UID,))
+                for inv in cursor.fetchall():
+                    cursor.execute("""
+                        INSERT INTO tblUserBookingInvolvedMatch (UserBookingUID, FedUID, Position, Involved, Complain)
+                        VALUES (?, ?, ?, ?, ?)
+                    """, (new_uid, inv.FedUID, inv.Position, inv.Involved, inv.Complain))
+                # Copy notes
+                cursor.execute("SELECT * FROM tblPreBookingNote WHERE UserBookingUID = ?", (pb.UID,))
+                for note in cursor.fetchall():
+                    cursor.execute("""
+                        INSERT INTO tblUserBookingNote (
+                            UserBookingUID, Position, RoadAgent_Type, RoadAgent_Worker, RoadAgent_Attack, Used, BeltUID, Champion1, Champion2, Champion3, Match, FedUID, StoryUID, IdeaUID, IdeaName
+                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """, (
+                        new_uid, note.Position, note.RoadAgent_Type, note.RoadAgent_Worker, note.RoadAgent_Attack, note.Used, note.BeltUID, note.Champion1, note.Champion2, note.Champion3, note.Match, note.FedUID, note.StoryUID, getattr(note, 'IdeaUID', None), getattr(note, 'IdeaName', None)
+                    ))
            
-        # After copying, delete the pre-booked matches and related involved/note entries
-        if prebookings:
-            prebooking_uids = [pb.UID for pb in prebookings]
-            # Build qmarks for parameterized IN clause
-            qmarks = ','.join(['?'] * len(prebooking_uids))
-            cursor.execute(f"DELETE FROM tblPreBookingInvolvedMatch WHERE PreBookingUID IN ({qmarks})", prebooking_uids)
-            cursor.execute(f"DELETE FROM tblPreBookingNote WHERE UserBookingUID IN ({qmarks})", prebooking_uids)
-            cursor.execute(f"DELETE FROM tblPreBooking WHERE UID IN ({qmarks})", prebooking_uids)
+            # After copying, delete the pre-booked matches and related involved/note entries
+            if prebookings:
+                prebooking_uids = [pb.UID for pb in prebookings]
+                # Build qmarks for parameterized IN clause
+                qmarks = ','.join(['?'] * len(prebooking_uids))
+                cursor.execute(f"DELETE FROM tblPreBookingInvolvedMatch WHERE PreBookingUID IN ({qmarks})", prebooking_uids)
+                cursor.execute(f"DELETE FROM tblPreBookingNote WHERE UserBookingUID IN ({qmarks})", prebooking_uids)
+                cursor.execute(f"DELETE FROM tblPreBooking WHERE UID IN ({qmarks})", prebooking_uids)
             self.conn.commit()
-        self.conn.commit()
-        
-        self.status_label.config(text=f"Auto booked {len(matches)} matches for tonight's show(s).")
-        messagebox.showinfo("Done", f"Auto booked {len(matches)} matches for tonight's show(s).")
+        except BaseException:
+            self.conn.rollback()
+            raise
+        return len(matches)
+
+    def on_auto_booked(self, count):
+        if count is None:
+            messagebox.showinfo("No Show", "No user booked shows for this promotion tonight.")
+            return
+        self.app.notify_table_written(*PREBOOKING_TABLES, *USERBOOKING_TABLES)
+        self.status_label.config(text=f"Auto booked {count} matches for tonight's show(s).")
+        messagebox.showinfo("Done", f"Auto booked {count} matches for tonight's show(s).")
@@ -1,28 +1,31 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
+from components.components import DatabaseTab
 import random
-import pyodbc
 from utils.round_robin import (
     clear_pre_booking,
 )
+from utils.table_cache import PREBOOKING_TABLES, USERBOOKING_TABLES
 
-class Func6Tab(ttk.Frame):
+# The promotion's contracted wrestlers as (UID, Name)
+WRESTLERS_SQL = "SELECT tblWorker.UID, tblWorker.Name FROM tblContract INNER JOIN tblWorker ON tblContract.WorkerUID = tblWorker.UID WHERE tblContract.FedUID = ? AND tblContract.Position_Wrestler = 1"
+
+class Func6Tab(DatabaseTab):
     """
     Wrestling Card Builder for creating a custom card with matches and participants.
     Provides UI for building a card, managing matches, and booking them into the database.
     """
+    TABLES = ("tblFed",)
+
     def __init__(self, parent, app):
         """
         Initialize the Wrestling Card Builder tab UI and variables.
         """
-        super().__init__(parent)
-        self.app = app
-        self.conn = None
+        super().__init__(parent, app)
         self.feds = {}
         self.selected_fed = tk.StringVar()
         self.matches = []  # List of dicts: {type, side1, side2, winner, length, checked}
         self._build_ui()
-        self.after(500, self.refresh)
 
     def _build_ui(self):
         """
@@ -56,21 +59,26 @@ class Func6Tab(ttk.Frame):
         self.status_label = ttk.Label(self, text="")
         self.status_label.pack(pady=2)
 
+    def on_connect(self):
+        """
+        Load the promotions of the connected save.
+        """
+        self.refresh()
+
     def refresh(self):
         """
         Refresh the tab by reloading promotions from the database.
         """
         self.conn = self.app.conn
         if self.conn:
-            self.load_feds()
+            connection = self.app.connection
+            self.db_job(lambda conn: connection.user_feds(), on_done=self.load_feds)
 
-    def load_feds(self):
+    def load_feds(self, feds):
         """
-        Load user-controlled promotions from the database and update the combobox.
+        Show the user-controlled promotions (read once per connection by the app) in the combobox.
         """
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT UID, Name FROM tblFed WHERE User_Controlled = 1")
-        self.feds = {str(row.UID): row.Name for row in cursor.fetchall()}
+        self.feds = feds
         values = list(self.feds.values())
         current = self.selected_fed.get()
         self.fed_combo['values'] = values
@@ -82,7 +90,6 @@ class Func6Tab(ttk.Frame):
             self.selected_fed.set("")
             self.fed_combo.set("")
         self.fed_combo.update_idletasks()
-        cursor.close()
 
     def get_selected_fed_uid(self):
         """
@@ -122,11 +129,12 @@ class Func6Tab(ttk.Frame):
             if not fed_uid:
                 match_combo['values'] = []
                 return
-            cursor = self.conn.cursor()
             mtype_map = {"1v1": 1, "2v2": 2, "3v3": 3, "4v4": 4, "5v5": 5}
             mtype_val = mtype_map.get(type_var.get(), 1)
-            cursor.execute("SELECT UID, Name FROM tblMatch WHERE Match_Type = ?", (mtype_val,))
-            matches = [(row.UID, row.Name) for row in cursor.fetchall()]
+            self.db_job(self._read_rows, "SELECT UID, Name FROM tblMatch WHERE Match_Type = ?", (mtype_val,), on_done=show_match_combo)
+        def show_match_combo(matches):
+            if not dialog.winfo_exists():
+                return
             match_uid_map.clear()
             match_combo['values'] = [name for uid, name in matches]
             for uid, name in matches:
@@ -225,11 +233,19 @@ class Func6Tab(ttk.Frame):
             # Determine required number for each side
             mtype_map = {"1v1": 1, "2v2": 2, "3v3": 3, "4v4": 4, "5v5": 5}
             req_num = mtype_map.get(mtype, 1)
+            winner = winner_var.get()
+            try:
+                length = int(length_var.get())
+            except Exception:
+                messagebox.showerror("Error", "Invalid match length.")
+                return
             # Fill missing spots with random workers
             fed_uid = self.get_selected_fed_uid()
-            cursor = self.conn.cursor()
-            cursor.execute("SELECT tblWorker.UID, tblWorker.Name FROM tblContract INNER JOIN tblWorker ON tblContract.WorkerUID = tblWorker.UID WHERE tblContract.FedUID = ? AND tblContract.Position_Wrestler = 1", (fed_uid,))
-            all_workers = [(str(row[0]), row[1]) for row in cursor.fetchall()]
+            self.db_job(self._read_rows, WRESTLERS_SQL, (fed_uid,), on_done=lambda rows: finish(mtype, match_uid, side1, side2, req_num, winner, length, rows))
+        def finish(mtype, match_uid, side1, side2, req_num, winner, length, rows):
+            if not dialog.winfo_exists():
+                return
+            all_workers = [(str(wid), wname) for wid, wname in rows]
             def fill_side(side):
                 existing_ids = set(id_ for t, n, id_ in side)
                 available = [(wid, wname) for wid, wname in all_workers if wid not in existing_ids]
@@ -240,12 +256,6 @@ class Func6Tab(ttk.Frame):
                 return side[:req_num]
             side1 = fill_side(side1)
             side2 = fill_side(side2)
-            winner = winner_var.get()
-            try:
-                length = int(length_var.get())
-            except Exception:
-                messagebox.showerror("Error", "Invalid match length.")
-                return
             new_data = {
                 "type": mtype,
                 "side1": side1,
@@ -290,33 +300,12 @@ class Func6Tab(ttk.Frame):
         def update_select():
             t = type_var.get()
             fed_uid = self.get_selected_fed_uid()
-            cursor = self.conn.cursor()
-            if t == "Worker":
-                cursor.execute("SELECT tblWorker.UID, tblWorker.Name FROM tblContract INNER JOIN tblWorker ON tblContract.WorkerUID = tblWorker.UID WHERE tblContract.FedUID = ? AND tblContract.Position_Wrestler = 1", (fed_uid,))
-                wrestlers = [(row[0], row[1]) for row in cursor.fetchall()]
-                select_combo['values'] = [f"{wid}: {name}" for wid, name in wrestlers]
-                self._side_entry_cache['workers'] = wrestlers
-            elif t == "Stable":
-                cursor.execute("SELECT UID, Name FROM tblStable WHERE Fed = ? AND Active = 1", (fed_uid,))
-                stables = [(row[0], row[1]) for row in cursor.fetchall()]
-                select_combo['values'] = [f"{sid}: {name}" for sid, name in stables]
-                self._side_entry_cache['stables'] = stables
-            elif t == "Team":
-                cursor.execute("SELECT UID, Name, Worker1, Worker2 FROM tblTeam WHERE Fed = ? AND Active = 1", (fed_uid,))
-                teams = []
-                for row in cursor.fetchall():
-                    tid, tname, w1, w2 = row
-                    valid = True
-                    for wid in [w1, w2]:
-                        if wid and wid != 0:
-                            cursor.execute("SELECT 1 FROM tblContract WHERE WorkerUID = ? AND FedUID = ? AND Position_Wrestler = 1", (wid, fed_uid))
-                            if not cursor.fetchone():
-                                valid = False
-                                break
-                    if valid:
-                        teams.append((tid, tname))
-                select_combo['values'] = [f"{tid}: {tname}" for tid, tname in teams]
-                self._side_entry_cache['teams'] = teams
+            self.db_job(self._read_side_options, t, fed_uid, on_done=lambda options: show_select(t, options))
+        def show_select(t, options):
+            if not dialog.winfo_exists():
+                return
+            select_combo['values'] = [f"{uid}: {name}" for uid, name in options]
+            self._side_entry_cache[{"Worker": "workers", "Stable": "stables", "Team": "teams"}[t]] = options
         type_combo.bind('<<ComboboxSelected>>', lambda e: update_select())
         update_select()
         # Add filtering to the combobox
@@ -334,30 +323,72 @@ class Func6Tab(ttk.Frame):
                 return
             id_ = val.split(":")[0]
             name = val.split(":", 1)[1].strip()
-            fed_uid = self.get_selected_fed_uid()
-            cursor = self.conn.cursor()
             if t == "Worker":
                 tree.insert("", tk.END, values=(t, name, id_))
-            elif t == "Team":
-                cursor.execute("SELECT Worker1, Worker2 FROM tblTeam WHERE UID = ? AND Active = 1", (int(id_),))
+            else:
+                self.db_job(self._read_members, t, int(id_), self.app.connection.worker_names, on_done=add_members)
+            dialog.destroy()
+        def add_members(members):
+            if not tree.winfo_exists():
+                return
+            for wid, wname in members:
+                tree.insert("", tk.END, values=("Worker", wname, wid))
+        ttk.Button(dialog, text="Add", command=add).pack(pady=5)
+        ttk.Button(dialog, text="Cancel", command=dialog.destroy).pack(pady=2)
+
+    @staticmethod
+    def _read_rows(conn, sql, params):
+        cursor = conn.cursor()
+        try:
+            cursor.execute(sql, params)
+            return [(row[0], row[1]) for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+
+    @staticmethod
+    def _read_side_options(conn, t, fed_uid):
+        """
+        Return the (UID, Name) choices of a side entry type: the promotion's wrestlers, its active
+        stables or its active teams whose members are all under contract.
+        """
+        if t == "Worker":
+            return Func6Tab._read_rows(conn, WRESTLERS_SQL, (fed_uid,))
+        if t == "Stable":
+            return Func6Tab._read_rows(conn, "SELECT UID, Name FROM tblStable WHERE Fed = ? AND Active = 1", (fed_uid,))
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT WorkerUID FROM tblContract WHERE FedUID = ? AND Position_Wrestler = 1", (fed_uid,))
+            contracted = {row[0] for row in cursor.fetchall()}
+            cursor.execute("SELECT UID, Name, Worker1, Worker2 FROM tblTeam WHERE Fed = ? AND Active = 1", (fed_uid,))
+            teams = []
+            for row in cursor.fetchall():
+                tid, tname, w1, w2 = row
+                if all(wid in contracted for wid in [w1, w2] if wid and wid != 0):
+                    teams.append((tid, tname))
+            return teams
+        finally:
+            cursor.close()
+
+    @staticmethod
+    def _read_members(conn, t, uid, names):
+        """
+        Return the members of a team, or of a stable in random order, as [(worker UID, name)].
+        """
+        cursor = conn.cursor()
+        try:
+            if t == "Team":
+                cursor.execute("SELECT Worker1, Worker2 FROM tblTeam WHERE UID = ? AND Active = 1", (uid,))
                 row = cursor.fetchone()
                 member_ids = [wid for wid in row if wid and wid != 0]
-                for wid in member_ids:
-                    cursor.execute("SELECT Name FROM tblWorker WHERE UID = ?", (wid,))
-                    wname = cursor.fetchone()[0]
-                    tree.insert("", tk.END, values=("Worker", wname, wid))
-            elif t == "Stable":
-                cursor.execute("SELECT " + ", ".join([f"Member{i}" for i in range(1, 11)]) + " FROM tblStable WHERE UID = ? AND Active = 1", (int(id_),))
+            else:
+                cursor.execute("SELECT " + ", ".join([f"Member{i}" for i in range(1, 11)]) + " FROM tblStable WHERE UID = ? AND Active = 1", (uid,))
                 row = cursor.fetchone()
                 member_ids = [wid for wid in row if wid]
                 random.shuffle(member_ids)
-                for wid in member_ids:
-                    cursor.execute("SELECT Name FROM tblWorker WHERE UID = ?", (wid,))
-                    wname = cursor.fetchone()[0]
-                    tree.insert("", tk.END, values=("Worker", wname, wid))
-            dialog.destroy()
-        ttk.Button(dialog, text="Add", command=add).pack(pady=5)
-        ttk.Button(dialog, text="Cancel", command=dialog.destroy).pack(pady=2)
+        finally:
+            cursor.close()
+        resolved = names.resolve(member_ids)
+        return [(wid, resolved[wid]) for wid in member_ids]
 
     def remove_selected_match(self):
         """
@@ -432,12 +463,18 @@ class Func6Tab(ttk.Frame):
         if not fed_uid:
             messagebox.showerror("Error", "No promotion selected.")
             return
+        self.app.run_db_job("Booking matches", self._auto_book_job, fed_uid, matches, on_done=self.on_auto_booked)
+
+    def _auto_book_job(self, job, fed_uid, matches):
+        """
+        Write the matches to the pre-booking tables and move them onto tonight's card.
+        Runs on the database executor; returns the number of matches, or None without a show tonight.
+        """
         cursor = self.conn.cursor()
         cursor.execute("SELECT CardUID FROM tblTonightsSchedule WHERE FedUID = ?", (fed_uid,))
         card_uids = [row[0] for row in cursor.fetchall()]
         if not card_uids:
-            messagebox.showinfo("No Show", "No user booked shows for this promotion tonight.")
-            return
+            return None
         # If matches are not provided, use the old logic (for legacy/auto)
         if matches is None:
             # Get wrestlers
@@ -479,8 +516,7 @@ class Func6Tab(ttk.Frame):
             four = self.four_var.get()
             five = self.five_var.get()
             if singles + tag + three + four + five != 100:
-                messagebox.showerror("Error", "Percentages must sum to 100%.")
-                return
+                raise ValueError("Percentages must sum to 100%.")
             use_stables = self.use_stables_var.get()
             use_weight = self.use_weight_var.get()
             use_faceheel = self.use_faceheel_var.get()
@@ -700,123 +736,133 @@ class Func6Tab(ttk.Frame):
                     matches.append(([x[0] for x in t1], [x[0] for x in t2], mtype))
                     booked_workers.update([x[0] for x in t1 + t2])
         # Otherwise, use the provided matches (from the table)
-        # Clear pre-booking
-        cursor.execute('DELETE FROM tblPreBooking')
-        cursor.execute('DELETE FROM tblPreBookingInvolvedMatch')
-        cursor.execute('DELETE FROM tblPreBookingNote')
-        self.conn.commit()
-        # Insert pre-bookings for provided matches
-        cursor.execute('SELECT MAX(UID) FROM tblPreBooking')
-        last_prebooking_id = cursor.fetchone()[0] or 0
-        for i, m in enumerate(matches):
-            pb_uid = last_prebooking_id + i + 1
-            card_uid = card_uids[i % len(card_uids)]
-            mtype = m.get("type", "1v1")
-            side1 = m.get("side1", [])
-            side2 = m.get("side2", [])
-            winner = m.get("winner", "")
-            length = m.get("length", 10)
-            match_uid = m.get("match_uid")
-            # Build match name
-            def side_display(side):
-                return ", ".join([n for t, n, id_ in side])
-            match_name = f"{side_display(side1)} vs {side_display(side2)}"
-            # Insert into tblPreBooking
-            cursor.execute("""
-                INSERT INTO tblPreBooking (UID, Booking_Name, FedUID, CardUID, TVUID, Match, MatchUID, Length, Major, Belt1, Belt2, Belt3, Booked, AngleOutput, Scripted)
-                VALUES (?, ?, ?, ?, 0, 1, ?, ?, 1, 0, 0, 0, 0, 0, NULL)
-            """, (pb_uid, match_name, fed_uid, card_uid, match_uid, length))
-            # Insert involved (just names, as IDs are not available in this UI)
-            pos = 1
-            for t, n, id_ in side1:
-                cursor.execute("INSERT INTO tblPreBookingInvolvedMatch (PreBookingUID, FedUID, Position, Involved, Complain) VALUES (?, ?, ?, ?, 0)", (pb_uid, fed_uid, pos, int(id_)))
-                pos += 1
-            for t, n, id_ in side2:
-                cursor.execute("INSERT INTO tblPreBookingInvolvedMatch (PreBookingUID, FedUID, Position, Involved, Complain) VALUES (?, ?, ?, ?, 0)", (pb_uid, fed_uid, pos, int(id_)))
-                pos += 1
-            
-            all_participants = side1 + side2
-            if all_participants:
-                winner_uid = random.choice(all_participants)
-                cursor.execute("""
-                    INSERT INTO tblPreBookingNote (
-                        UserBookingUID, Position, RoadAgent_Type, RoadAgent_Worker, RoadAgent_Attack, Used, BeltUID, Champion1, Champion2, Champion3, Match, FedUID, StoryUID, IdeaUID, IdeaName
-                    ) VALUES (?, 1, 200, 0, 0, 0, 0, 0, 0, 0, 1, ?, 0, 0, NULL)
-                """, (pb_uid, fed_uid))
-            print(winner)
-            if winner == "Side 1" and side1:
-                winner_uid = random.choice(side1)
-                cursor.execute("""
-                    INSERT INTO tblPreBookingNote (
-                        UserBookingUID, Position, RoadAgent_Type, RoadAgent_Worker, RoadAgent_Attack, Used, BeltUID, Champion1, Champion2, Champion3, Match, FedUID, StoryUID, IdeaUID, IdeaName
-                    ) VALUES (?, 1, 1, ?, 0, 0, 0, 0, 0, 0, 1, ?, 0, 0, NULL)
-                """, (pb_uid, int(winner_uid[2]), fed_uid))
-            elif winner == "Side 2" and side2:
-                winner_uid = random.choice(side2)
-                cursor.execute("""
-                    INSERT INTO tblPreBookingNote (
-                        UserBookingUID, Position, RoadAgent_Type, RoadAgent_Worker, RoadAgent_Attack, Used, BeltUID, Champion1, Champion2, Champion3, Match, FedUID, StoryUID, IdeaUID, IdeaName
-                    ) VALUES (?, 1, 1, ?, 0, 0, 0, 0, 0, 0, 1, ?, 0, 0, NULL)
-                """, (pb_uid, int(winner_uid[2]), fed_uid))
-        self.conn.commit()
-        # Transfer pre-booked to booked (as in func4_tab.py)
-        cursor.execute("SELECT Announce1, Announce2, Announce3 FROM tblFed WHERE UID = ?", (fed_uid,))
-        ann = cursor.fetchone()
-        announcer1 = ann[0] if ann else None
-        announcer2 = ann[1] if ann else None
-        announcer3 = ann[2] if ann else None
-        cursor.execute("SELECT WorkerUID FROM tblContract WHERE FedUID = ? AND Position_Referee = 1", (fed_uid,))
-        referees = [row[0] for row in cursor.fetchall()]
-        cursor.execute("SELECT WorkerUID FROM tblContract WHERE FedUID = ? AND Position_Roadagent = 1", (fed_uid,))
-        roadagents = [row[0] for row in cursor.fetchall()]
-        cursor.execute("SELECT MAX(Segment_Order) FROM tblUserBooking")
-        max_order = cursor.fetchone()[0] or 0
-        cursor.execute("SELECT MAX(UID) FROM tblUserBooking")
-        max_uid = cursor.fetchone()[0] or 0
-        cursor.execute("SELECT MAX(Position) FROM tblUserBookingNote")
-        max_note_pos = cursor.fetchone()[0] or 0
-        cursor.execute("SELECT * FROM tblPreBooking WHERE FedUID = ?", (fed_uid,))
-        prebookings = cursor.fetchall()
-        for i, pb in enumerate(prebookings):
-            new_uid = max_uid + i + 1
-            new_order = i + 1
-            referee = random.choice(referees) if referees else None
-            roadagent = random.choice(roadagents) if roadagents else None
-            cursor.execute("""
-                INSERT INTO tblUserBooking (
-                    UID, Segment_Name, MainShow, PostShow, Segment_Order, Match, MatchUID, OverallRating, Referee, RoadAgent, Belt1, Belt2, Belt3, Announcer1, Announcer2, Announcer3, Length, Major, PreBookingUID, Completed, Problematic, ABFlag, ABRating, ABMin, ABMax, AngleOutput, Scripted
-                )
-                SELECT ?, Booking_Name, 1, 0, ?, Match, MatchUID, -1, ?, ?, Belt1, Belt2, Belt3, ?, ?, ?, Length, Major, 0, 0, 0, 0, NULL, NULL, NULL, AngleOutput, Scripted
-                FROM tblPreBooking WHERE UID = ?
-            """, (new_uid, new_order, referee, roadagent, announcer1, announcer2, announcer3, pb.UID))
-            # Copy involved
-            cursor.execute("SELECT * FROM tblPreBookingInvolvedMatch WHERE PreBookingUID = ?", (pb.UID,))
-            for inv in cursor.fetchall():
+        # Clear, pre-book and move to the card in one transaction, so a failure or Cancel
+        # leaves the previous bookings untouched
+        try:
+            # Clear pre-booking
+            cursor.execute('DELETE FROM tblPreBooking')
+            cursor.execute('DELETE FROM tblPreBookingInvolvedMatch')
+            cursor.execute('DELETE FROM tblPreBookingNote')
+            # Insert pre-bookings for provided matches
+            last_prebooking_id = self.app.connection.uids.allocate("tblPreBooking", len(matches)) - 1
+            for i, m in enumerate(matches):
+                job.progress(i, len(matches), "Pre-booking matches...")
+                pb_uid = last_prebooking_id + i + 1
+                card_uid = card_uids[i % len(card_uids)]
+                mtype = m.get("type", "1v1")
+                side1 = m.get("side1", [])
+                side2 = m.get("side2", [])
+                winner = m.get("winner", "")
+                length = m.get("length", 10)
+                match_uid = m.get("match_uid")
+                # Build match name
+                def side_display(side):
+                    return ", ".join([n for t, n, id_ in side])
+                match_name = f"{side_display(side1)} vs {side_display(side2)}"
+                # Insert into tblPreBooking
                 cursor.execute("""
-                    INSERT INTO tblUserBookingInvolvedMatch (UserBookingUID, FedUID, Position, Involved, Complain)
-                    VALUES (?, ?, ?, ?, ?)
-                """, (new_uid, inv.FedUID, inv.Position, inv.Involved, inv.Complain))
-            # Copy notes
-            cursor.execute("SELECT * FROM tblPreBookingNote WHERE UserBookingUID = ?", (pb.UID,))
-            for note in cursor.fetchall():
+                    INSERT INTO tblPreBooking (UID, Booking_Name, FedUID, CardUID, TVUID, Match, MatchUID, Length, Major, Belt1, Belt2, Belt3, Booked, AngleOutput, Scripted)
+                    VALUES (?, ?, ?, ?, 0, 1, ?, ?, 1, 0, 0, 0, 0, 0, NULL)
+                """, (pb_uid, match_name, fed_uid, card_uid, match_uid, length))
+                # Insert involved (just names, as IDs are not available in this UI)
+                pos = 1
+                for t, n, id_ in side1:
+                    cursor.execute("INSERT INTO tblPreBookingInvolvedMatch (PreBookingUID, FedUID, Position, Involved, Complain) VALUES (?, ?, ?, ?, 0)", (pb_uid, fed_uid, pos, int(id_)))
+                    pos += 1
+                for t, n, id_ in side2:
+                    cursor.execute("INSERT INTO tblPreBookingInvolvedMatch (PreBookingUID, FedUID, Position, Involved, Complain) VALUES (?, ?, ?, ?, 0)", (pb_uid, fed_uid, pos, int(id_)))
+                    pos += 1
+            
+                all_participants = side1 + side2
+                if all_participants:
+                    winner_uid = random.choice(all_participants)
+                    cursor.execute("""
+                        INSERT INTO tblPreBookingNote (
+                            UserBookingUID, Position, RoadAgent_Type, RoadAgent_Worker, RoadAgent_Attack, Used, BeltUID, Champion1, Champion2, Champion3, Match, FedUID, StoryUID, IdeaUID, IdeaName
+                        ) VALUES (?, 1, 200, 0, 0, 0, 0, 0, 0, 0, 1, ?, 0, 0, NULL)
+                    """, (pb_uid, fed_uid))
+                print(winner)
+                if winner == "Side 1" and side1:
+                    winner_uid = random.choice(side1)
+                    cursor.execute("""
+                        INSERT INTO tblPreBookingNote (
+                            UserBookingUID, Position, RoadAgent_Type, RoadAgent_Worker, RoadAgent_Attack, Used, BeltUID, Champion1, Champion2, Champion3, Match, FedUID, StoryUID, IdeaUID, IdeaName
+                        ) VALUES (?, 1, 1, ?, 0, 0, 0, 0, 0, 0, 1, ?, 0, 0, NULL)
+                    """, (pb_uid, int(winner_uid[2]), fed_uid))
+                elif winner == "Side 2" and side2:
+                    winner_uid = random.choice(side2)
+                    cursor.execute("""
+                        INSERT INTO tblPreBookingNote (
+                            UserBookingUID, Position, RoadAgent_Type, RoadAgent_Worker, RoadAgent_Attack, Used, BeltUID, Champion1, Champion2, Champion3, Match, FedUID, StoryUID, IdeaUID, IdeaName
+                        ) VALUES (?, 1, 1, ?, 0, 0, 0, 0, 0, 0, 1, ?, 0, 0, NULL)
+                    """, (pb_uid, int(winner_uid[2]), fed_uid))
+            # Transfer pre-booked to booked (as in func4_tab.py)
+            cursor.execute("SELECT Announce1, Announce2, Announce3 FROM tblFed WHERE UID = ?", (fed_uid,))
+            ann = cursor.fetchone()
+            announcer1 = ann[0] if ann else None
+            announcer2 = ann[1] if ann else None
+            announcer3 = ann[2] if ann else None
+            cursor.execute("SELECT WorkerUID FROM tblContract WHERE FedUID = ? AND Position_Referee = 1", (fed_uid,))
+            referees = [row[0] for row in cursor.fetchall()]
+            cursor.execute("SELECT WorkerUID FROM tblContract WHERE FedUID = ? AND Position_Roadagent = 1", (fed_uid,))
+            roadagents = [row[0] for row in cursor.fetchall()]
+            cursor.execute("SELECT MAX(Segment_Order) FROM tblUserBooking")
+            max_order = cursor.fetchone()[0] or 0
+            cursor.execute("SELECT MAX(Position) FROM tblUserBookingNote")
+            max_note_pos = cursor.fetchone()[0] or 0
+            cursor.execute("SELECT * FROM tblPreBooking WHERE FedUID = ?", (fed_uid,))
+            prebookings = cursor.fetchall()
+            max_uid = self.app.connection.uids.allocate("tblUserBooking", len(prebookings)) - 1
+            for i, pb in enumerate(prebookings):
+                job.progress(i, len(prebookings), "Moving matches to the card...")
+                new_uid = max_uid + i + 1
+                new_order = i + 1
+                referee = random.choice(referees) if referees else None
+                roadagent = random.choice(roadagents) if roadagents else None
                 cursor.execute("""
-                    INSERT INTO tblUserBookingNote (
-                        UserBookingUID, Position, RoadAgent_Type, RoadAgent_Worker, RoadAgent_Attack, Used, BeltUID, Champion1, Champion2, Champion3, Match, FedUID, StoryUID, IdeaUID, IdeaName
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    new_uid, note.Position, note.RoadAgent_Type, note.RoadAgent_Worker, note.RoadAgent_Attack, note.Used, note.BeltUID, note.Champion1, note.Champion2, note.Champion3, note.Match, note.FedUID, note.StoryUID, getattr(note, 'IdeaUID', None), getattr(note, 'IdeaName', None)
-                ))
-        # After copying, delete the pre-booked matches and related involved/note entries
-        if prebookings:
-            prebooking_uids = [pb.UID for pb in prebookings]
-            qmarks = ','.join(['?'] * len(prebooking_uids))
-            cursor.execute(f"DELETE FROM tblPreBookingInvolvedMatch WHERE PreBookingUID IN ({qmarks})", prebooking_uids)
-            cursor.execute(f"DELETE FROM tblPreBookingNote WHERE UserBookingUID IN ({qmarks})", prebooking_uids)
-            cursor.execute(f"DELETE FROM tblPreBooking WHERE UID IN ({qmarks})", prebooking_uids)
+                    INSERT INTO tblUserBooking (
+                        UID, Segment_Name, MainShow, PostShow, Segment_Order, Match, MatchUID, OverallRating, Referee, RoadAgent, Belt1, Belt2, Belt3, Announcer1, Announcer2, Announcer3, Length, Major, PreBookingUID, Completed, Problematic, ABFlag, ABRating, ABMin, ABMax, AngleOutput, Scripted
+                    )
+                    SELECT ?, Booking_Name, 1, 0, ?, Match, MatchUID, -1, ?, ?, Belt1, Belt2, Belt3, ?, ?, ?, Length, Major, 0, 0, 0, 0, NULL, NULL, NULL, AngleOutput, Scripted
+                    FROM tblPreBooking WHERE UID = ?
+                """, (new_uid, new_order, referee, roadagent, announcer1, announcer2, announcer3, pb.UID))
+                # Copy involved
+                cursor.execute("SELECT * FROM tblPreBookingInvolvedMatch WHERE PreBookingUID = ?", (pb.UID,))
+                for inv in cursor.fetchall():
+                    cursor.execute("""
+                        INSERT INTO tblUserBookingInvolvedMatch (UserBookingUID, FedUID, Position, Involved, Complain)
+                        VALUES (?, ?, ?, ?, ?)
+                    """, (new_uid, inv.FedUID, inv.Position, inv.Involved, inv.Complain))
+                # Copy notes
+                cursor.execute("SELECT * FROM tblPreBookingNote WHERE UserBookingUID = ?", (pb.UID,))
+                for note in cursor.fetchall():
+                    cursor.execute("""
+                        INSERT INTO tblUserBookingNote (
+                            UserBookingUID, Position, RoadAgent_Type, RoadAgent_Worker, RoadAgent_Attack, Used, BeltUID, Champion1, Champion2, Champion3, Match, FedUID, StoryUID, IdeaUID, IdeaName
+                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """, (
+                        new_uid, note.Position, note.RoadAgent_Type, note.RoadAgent_Worker, note.RoadAgent_Attack, note.Used, note.BeltUID, note.Champion1, note.Champion2, note.Champion3, note.Match, note.FedUID, note.StoryUID, getattr(note, 'IdeaUID', None), getattr(note, 'IdeaName', None)
+                    ))
+            # After copying, delete the pre-booked matches and related involved/note entries
+            if prebookings:
+                prebooking_uids = [pb.UID for pb in prebookings]
+                qmarks = ','.join(['?'] * len(prebooking_uids))
+                cursor.execute(f"DELETE FROM tblPreBookingInvolvedMatch WHERE PreBookingUID IN ({qmarks})", prebooking_uids)
+                cursor.execute(f"DELETE FROM tblPreBookingNote WHERE UserBookingUID IN ({qmarks})", prebooking_uids)
+                cursor.execute(f"DELETE FROM tblPreBooking WHERE UID IN ({qmarks})", prebooking_uids)
             self.conn.commit()
-        self.conn.commit()
-        self.status_label.config(text=f"Booked {len(matches)} matches.")
-        messagebox.showinfo("Done", f"Booked {len(matches)} matches.")
+        except BaseException:
+            self.conn.rollback()
+            raise
+        return len(matches)
+
+    def on_auto_booked(self, count):
+        if count is None:
+            messagebox.showinfo("No Show", "No user booked shows for this promotion tonight.")
+            return
+        self.app.notify_table_written(*PREBOOKING_TABLES, *USERBOOKING_TABLES)
+        self.status_label.config(text=f"Booked {count} matches.")
+        messagebox.showinfo("Done", f"Booked {count} matches.")
 
     def move_match_up(self):
         """
@@ -0,0 +1,92 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.compact import compact_frame
+from utils.search_query import parse, compile_where, evaluate
+from utils.table_search import TableSearch, ScanSearch
+
+COLUMN_TYPES = {
+    "UID": "COUNTER",
+    "Name": "VARCHAR",
+    "Weight": "INTEGER",
+    "Active": "BIT",
+    "Born": "DATETIME",
+}
+
+ROWS = [
+    (1, "Alpha", 220, True, "2020-01-05"),
+    (2, "Bravo", None, False, "1999-12-31"),
+    (3, None, 185, True, "2020-06-01"),
+    (4, "Charlie 2020", 250, False, None),
+    (5, "delta", 120, True, "1985-03-20"),
+]
+
+QUERIES = [
+    "alpha",
+    "20",
+    "2020",
+    "ar",
+    "Name = 'Bravo'",
+    "Name <> 'Bravo'",
+    "Weight <> 220",
+    "Weight > 150",
+    "Weight <= 220 OR Name = 'delta'",
+    "Weight BETWEEN 180 AND 230",
+    "Name LIKE 'c%'",
+    "Weight IN (120, 250)",
+    "(Name <> 'Alpha' AND Weight < 240) OR UID = 3",
+]
+
+
+def cstr(value):
+    """
+    Access's CStr for the SQLite stand-in of the connection.
+    """
+    return None if value is None else str(value)
+
+
+@pytest.fixture(scope="module")
+def conn():
+    conn = sqlite3.connect(":memory:")
+    conn.create_function("CStr", 1, cstr)
+    conn.execute("CREATE TABLE tblTest (UID INTEGER, Name TEXT, Weight INTEGER, Active INTEGER, Born TEXT)")
+    conn.executemany("INSERT INTO tblTest VALUES (?, ?, ?, ?, ?)", ROWS)
+    yield conn
+    conn.close()
+
+
+@pytest.fixture(scope="module")
+def frame():
+    df = pd.DataFrame(ROWS, columns=list(COLUMN_TYPES))
+    df["Born"] = pd.to_datetime(df["Born"])
+    df, _, _ = compact_frame(df, COLUMN_TYPES)
+    return df
+
+
+@pytest.mark.parametrize("engine_class", [TableSearch, ScanSearch])
+@pytest.mark.parametrize("query", QUERIES)
+def test_sql_and_pandas_agree(conn, frame, engine_class, query):
+    node = parse(query, list(COLUMN_TYPES))
+    where, params = compile_where(node, COLUMN_TYPES)
+    sql_uids = sorted(uid for (uid,) in conn.execute(f"SELECT UID FROM tblTest WHERE {where}", params))
+    mask = evaluate(node, engine_class(frame), COLUMN_TYPES)
+    pandas_uids = sorted(int(uid) for uid in frame["UID"][mask])
+    assert sql_uids == pandas_uids
+
+
+def test_not_equal_matches_missing_values(frame):
+    node = parse("Weight <> 220", list(COLUMN_TYPES))
+    mask = evaluate(node, TableSearch(frame), COLUMN_TYPES)
+    assert list(np.flatnonzero(mask)) == [1, 2, 3, 4]
+    where, _ = compile_where(node, COLUMN_TYPES)
+    assert "IS NULL" in where
+
+
+def test_keywords_skip_dates_and_flags(frame):
+    # "2020" is in two birth dates, but only text and number columns are searched
+    node = parse("2020", list(COLUMN_TYPES))
+    mask = evaluate(node, TableSearch(frame), COLUMN_TYPES)
+    assert list(frame["UID"][mask]) == [4]
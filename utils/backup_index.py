@@ -0,0 +1,232 @@
+import json
+import os
+import sqlite3
+from datetime import datetime, timedelta
+
+# Legacy full-copy backups live in backups/<save>/<timestamp>/[temp/]<file>
+LEGACY_EXTENSIONS = (".mdb", ".accdb")
+
+class BackupIndex:
+    """
+    SQLite index of every backup, so listing and pruning never walk the backups folder.
+    Chunked backups (manifests of the BackupStore) and legacy full copies are both indexed with
+    their size, hash, source path and timestamp; chunk reference counts tell which chunk files
+    a deleted backup frees.
+    """
+    def __init__(self, backups_root="backups"):
+        self.backups_root = backups_root
+        self.path = os.path.join(backups_root, "store", "index.sqlite")
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        is_new = not os.path.exists(self.path)
+        self.db = sqlite3.connect(self.path)
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS backups (
+                path TEXT PRIMARY KEY, kind TEXT, name TEXT, source TEXT,
+                size INTEGER, sha256 TEXT, created TEXT, stored INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS backups_source ON backups (source, created);
+            CREATE TABLE IF NOT EXISTS chunks (digest TEXT PRIMARY KEY, refs INTEGER, stored INTEGER);
+        """)
+        if is_new:
+            self.rebuild()
+
+    def close(self):
+        self.db.close()
+
+    # ------------------ Registration ------------------
+
+    def add_manifest(self, manifest_path, manifest, name, new_chunks):
+        """
+        Index a chunked backup. new_chunks maps the digests of chunks written by this backup
+        to their compressed size.
+        """
+        refs = {}
+        for digest, _ in manifest["chunks"]:
+            refs[digest] = refs.get(digest, 0) + 1
+        with self.db:
+            self.db.executemany(
+                "INSERT OR IGNORE INTO chunks (digest, refs, stored) VALUES (?, 0, ?)",
+                [(d, new_chunks.get(d, 0)) for d in refs],
+            )
+            self.db.executemany("UPDATE chunks SET refs = refs + ? WHERE digest = ?", [(n, d) for d, n in refs.items()])
+            self.db.execute(
+                "INSERT OR REPLACE INTO backups VALUES (?, 'chunked', ?, ?, ?, ?, ?, ?)",
+                (os.path.abspath(manifest_path), name, manifest["source"], manifest["size"],
+                 manifest["sha256"], manifest["created"], sum(new_chunks.values())),
+            )
+
+    def rebuild(self):
+        """
+        Build the index from the files on disk: the manifests of the chunk store and legacy copies.
+        Only needed when the index is missing.
+        """
+        with self.db:
+            self.db.execute("DELETE FROM backups")
+            self.db.execute("DELETE FROM chunks")
+        store = os.path.join(self.backups_root, "store")
+        chunk_sizes = {}
+        chunk_dir = os.path.join(store, "chunks")
+        for folder, _, files in os.walk(chunk_dir):
+            for f in files:
+                chunk_sizes[f] = os.path.getsize(os.path.join(folder, f))
+        manifest_dir = os.path.join(store, "manifests")
+        for folder, _, files in os.walk(manifest_dir):
+            for f in files:
+                if not f.endswith(".json"):
+                    continue
+                path = os.path.join(folder, f)
+                with open(path, "r", encoding="utf-8") as fh:
+                    manifest = json.load(fh)
+                name = os.path.relpath(folder, manifest_dir)
+                new = {d: chunk_sizes.pop(d) for d, _ in manifest["chunks"] if d in chunk_sizes}
+                self.add_manifest(path, manifest, name, new)
+        rows = []
+        for folder, _, files in os.walk(self.backups_root):
+            if os.path.commonpath([os.path.abspath(folder), os.path.abspath(store)]) == os.path.abspath(store):
+                continue
+            for f in files:
+                if f.lower().endswith(LEGACY_EXTENSIONS):
+                    path = os.path.abspath(os.path.join(folder, f))
+                    rel = os.path.relpath(folder, self.backups_root).split(os.sep)
+                    stamp = rel[1] if len(rel) > 1 else ""
+                    try:
+                        created = datetime.strptime(stamp, "%Y-%m-%d-%H%M%S").isoformat()
+                    except ValueError:
+                        created = datetime.fromtimestamp(os.path.getmtime(path)).isoformat(timespec="seconds")
+                    size = os.path.getsize(path)
+                    name = os.path.join(rel[0], "temp") if rel[-1].lower() == "temp" else rel[0]
+                    # Legacy copies don't record their source, group them by save and file name
+                    rows.append((path, name, f"legacy:{name}/{f}", size, created, size))
+        with self.db:
+            self.db.executemany("INSERT OR REPLACE INTO backups VALUES (?, 'copy', ?, ?, ?, NULL, ?, ?)", rows)
+
+    # ------------------ Queries ------------------
+
+    def backups(self, source=None):
+        """
+        Return the indexed backups as dicts, oldest first, optionally only those of one source.
+        """
+        sql = "SELECT path, kind, name, source, size, sha256, created, stored FROM backups"
+        params = ()
+        if source is not None:
+            sql += " WHERE source = ?"
+            params = (os.path.abspath(source),)
+        cursor = self.db.execute(sql + " ORDER BY created", params)
+        keys = [d[0] for d in cursor.description]
+        return [dict(zip(keys, row)) for row in cursor]
+
+    def latest(self, source):
+        """
+        Return the newest backup of a source file, or None.
+        """
+        found = self.backups(source)
+        return found[-1] if found else None
+
+    def total_stored(self):
+        """
+        Return the bytes used on disk by all backups (unique chunks plus legacy copies).
+        """
+        chunks = self.db.execute("SELECT COALESCE(SUM(stored), 0) FROM chunks").fetchone()[0]
+        copies = self.db.execute("SELECT COALESCE(SUM(stored), 0) FROM backups WHERE kind = 'copy'").fetchone()[0]
+        return chunks + copies
+
+    # ------------------ Retention ------------------
+
+    def select_kept(self, keep_last=None, daily_days=None, now=None):
+        """
+        Return the paths of backups kept by the count and age policies, per source:
+        the newest keep_last backups, and the newest backup of each of the last daily_days days.
+        The newest backup of every source is always kept.
+        """
+        now = now or datetime.now()
+        by_source = {}
+        for b in self.backups():
+            by_source.setdefault(b["source"], []).append(b)
+        kept = set()
+        for items in by_source.values():
+            kept.add(items[-1]["path"])
+            if keep_last is None and daily_days is None:
+                kept.update(b["path"] for b in items)
+                continue
+            if keep_last:
+                kept.update(b["path"] for b in items[-keep_last:])
+            if daily_days:
+                cutoff = (now - timedelta(days=daily_days)).date()
+                newest_per_day = {}
+                for b in items:
+                    day = datetime.fromisoformat(b["created"]).date()
+                    if day > cutoff:
+                        newest_per_day[day] = b["path"]
+                kept.update(newest_per_day.values())
+        return kept
+
+    def prune(self, keep_last=None, daily_days=None, max_bytes=None, now=None):
+        """
+        Apply the retention policies and delete the backups they don't keep. If max_bytes is given,
+        the oldest remaining backups are deleted too until the store fits (the newest backup of each
+        source is never deleted). Returns (number of backups deleted, bytes reclaimed).
+        """
+        all_backups = self.backups()
+        kept = self.select_kept(keep_last, daily_days, now)
+        newest = {b["source"]: b["path"] for b in all_backups}
+        deleted = 0
+        reclaimed = 0
+        for b in all_backups:
+            if b["path"] not in kept:
+                reclaimed += self.delete(b)
+                deleted += 1
+        if max_bytes is not None:
+            for b in all_backups:
+                if self.total_stored() <= max_bytes:
+                    break
+                if b["path"] in kept and b["path"] not in newest.values():
+                    reclaimed += self.delete(b)
+                    deleted += 1
+        return deleted, reclaimed
+
+    def delete(self, backup):
+        """
+        Delete one backup and the chunks no other backup references. Returns the bytes reclaimed.
+        """
+        reclaimed = 0
+        if backup["kind"] == "copy":
+            reclaimed = backup["stored"]
+            _remove(backup["path"], self.backups_root)
+        else:
+            try:
+                with open(backup["path"], "r", encoding="utf-8") as f:
+                    chunks = json.load(f)["chunks"]
+            except (OSError, ValueError):
+                chunks = []
+            refs = {}
+            for digest, _ in chunks:
+                refs[digest] = refs.get(digest, 0) + 1
+            with self.db:
+                self.db.executemany("UPDATE chunks SET refs = refs - ? WHERE digest = ?", [(n, d) for d, n in refs.items()])
+                freed = self.db.execute("SELECT digest, stored FROM chunks WHERE refs <= 0").fetchall()
+                self.db.execute("DELETE FROM chunks WHERE refs <= 0")
+            chunk_dir = os.path.join(self.backups_root, "store", "chunks")
+            for digest, stored in freed:
+                _remove(os.path.join(chunk_dir, digest[:2], digest), chunk_dir)
+                reclaimed += stored
+            _remove(backup["path"], self.backups_root)
+        with self.db:
+            self.db.execute("DELETE FROM backups WHERE path = ?", (backup["path"],))
+        return reclaimed
+
+def _remove(path, root):
+    """
+    Delete a file and the folders above it that became empty, up to root.
+    """
+    try:
+        os.remove(path)
+    except OSError:
+        return
+    folder = os.path.dirname(os.path.abspath(path))
+    root = os.path.abspath(root)
+    while folder != root and folder.startswith(root):
+        try:
+            os.rmdir(folder)
+        except OSError:
+            break
+        folder = os.path.dirname(folder)
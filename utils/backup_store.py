@@ -0,0 +1,264 @@
+import hashlib
+import json
+import mmap
+import os
+import zlib
+from datetime import datetime
+
+from utils.backup_index import BackupIndex
+from utils.lazy_import import LazyModule
+
+np = LazyModule("numpy")
+
+# Content-defined chunking: a rolling sum of random per-byte values over WINDOW bytes marks a
+# chunk boundary where its low bits are zero, so boundaries move with the content when bytes
+# are inserted or removed and unchanged regions produce the same chunks across backups.
+WINDOW = 64
+BOUNDARY_MASK = (1 << 16) - 1  # ~64 KB average chunks
+MIN_CHUNK = 16 * 1024
+MAX_CHUNK = 256 * 1024
+BLOCK = 8 * 1024 * 1024  # bytes scanned per NumPy pass
+COMPRESS_LEVEL = 6
+STORE_ROOT = os.path.join("backups", "store")
+MANIFEST_DIR = os.path.join(STORE_ROOT, "manifests")
+COPY_BUFFER = 16 * 1024 * 1024
+FICLONE = 0x40049409  # Linux ioctl for copy-on-write clones (btrfs, XFS)
+BYTE_SEED = 0x7E9
+_byte_values = None
+
+class BackupCancelled(Exception):
+    """Raised from a progress callback to stop a backup."""
+
+# ------------------ Copying ------------------
+
+def _clone(src, dst):
+    """
+    Try a copy-on-write clone of src into the open file dst. Returns True on success.
+    """
+    try:
+        import fcntl
+        fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        return True
+    except (ImportError, OSError):
+        return False
+
+def copy_file(source, destination, progress=None):
+    """
+    Copy a file, trying the fastest method first: a copy-on-write clone (FICLONE), then
+    os.copy_file_range, then a streaming copy with a large buffer.
+    progress(done, total) is called during the copy and may raise BackupCancelled.
+    Returns the method used: "reflink", "copy_file_range" or "stream".
+    """
+    total = os.path.getsize(source)
+    with open(source, "rb") as src, open(destination, "wb") as dst:
+        if _clone(src, dst):
+            if progress:
+                progress(total, total)
+            return "reflink"
+        if hasattr(os, "copy_file_range"):
+            done = 0
+            try:
+                while done < total:
+                    copied = os.copy_file_range(src.fileno(), dst.fileno(), COPY_BUFFER)
+                    if not copied:
+                        break
+                    done += copied
+                    if progress:
+                        progress(done, total)
+                if done == total:
+                    return "copy_file_range"
+            except OSError:
+                pass  # not supported between these filesystems, start over with a plain copy
+            src.seek(0)
+            dst.seek(0)
+            dst.truncate()
+        done = 0
+        while True:
+            block = src.read(COPY_BUFFER)
+            if not block:
+                break
+            dst.write(block)
+            done += len(block)
+            if progress:
+                progress(done, total)
+    return "stream"
+
+# ------------------ Chunking ------------------
+
+def byte_values():
+    """
+    Return the random value of each byte for the rolling sum, fixed by BYTE_SEED.
+    """
+    global _byte_values
+    if _byte_values is None:
+        _byte_values = np.random.default_rng(BYTE_SEED).integers(0, 2 ** 63, 256, dtype=np.uint64)
+    return _byte_values
+
+def chunk_boundaries(data):
+    """
+    Return the end offsets of the content-defined chunks of a bytes-like object.
+    """
+    n = len(data)
+    values = byte_values()
+    buf = np.frombuffer(data, dtype=np.uint8)
+    candidates = []
+    for start in range(0, n, BLOCK):
+        end = min(start + BLOCK, n)
+        lead = max(0, start - WINDOW)
+        sums = np.cumsum(values[buf[lead:end]])  # wraps mod 2**64, only the low bits matter
+        window = sums[WINDOW:] - sums[:-WINDOW] if len(sums) > WINDOW else np.empty(0, dtype=np.uint64)
+        hits = np.flatnonzero((window & np.uint64(BOUNDARY_MASK)) == 0) + lead + WINDOW + 1
+        candidates.extend(hits[hits > start].tolist())
+    ends = []
+    last = 0
+    for end in candidates:
+        if end - last < MIN_CHUNK:
+            continue
+        while end - last > MAX_CHUNK:
+            last += MAX_CHUNK
+            ends.append(last)
+        ends.append(end)
+        last = end
+    while n - last > MAX_CHUNK:
+        last += MAX_CHUNK
+        ends.append(last)
+    if n > last:
+        ends.append(n)
+    return ends
+
+# ------------------ Store ------------------
+
+class BackupStore:
+    """
+    Deduplicated, compressed backup store.
+    Save files are split into content-defined chunks; every unique chunk is stored once, zlib
+    compressed, under its SHA-256. Each backup is a small JSON manifest listing its chunks.
+    A backup of a file whose hash equals the previous backup of the same source writes nothing.
+    Every backup is registered in the BackupIndex of the backups folder.
+    """
+    def __init__(self, root=STORE_ROOT):
+        self.root = root
+        self.chunk_dir = os.path.join(root, "chunks")
+        self.manifest_dir = os.path.join(root, "manifests")
+        self.index = BackupIndex(os.path.dirname(root) or ".")
+
+    def close(self):
+        self.index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _chunk_path(self, digest):
+        return os.path.join(self.chunk_dir, digest[:2], digest)
+
+    def backup(self, path, name, progress=None, source=None):
+        """
+        Back up a file under manifests/<name>/. Returns (manifest path, bytes written), where the
+        manifest is the previous one and 0 bytes are written if the file is unchanged.
+        source is the save file recorded in the manifest when path is a copy of it.
+        progress(done, total) is called with the bytes processed so far and may raise BackupCancelled.
+        Chunks written by a backup that is cancelled or fails are deleted again, as no manifest
+        refers to them.
+        """
+        source = os.path.abspath(source or path)
+        size = os.path.getsize(path)
+        with open(path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+            try:
+                file_digest = hashlib.sha256(data).hexdigest()
+                previous = self.index.latest(source)
+                if previous and previous["sha256"] == file_digest and os.path.exists(previous["path"]):
+                    return previous["path"], 0
+                chunks = []
+                new_chunks = {}
+                manifest_path = None
+                try:
+                    start = 0
+                    for end in chunk_boundaries(data):
+                        piece = data[start:end]
+                        digest = hashlib.sha256(piece).hexdigest()
+                        chunk_path = self._chunk_path(digest)
+                        if not os.path.exists(chunk_path):
+                            os.makedirs(os.path.dirname(chunk_path), exist_ok=True)
+                            packed = zlib.compress(piece, COMPRESS_LEVEL)
+                            with open(chunk_path + ".tmp", "wb") as out:
+                                out.write(packed)
+                            os.replace(chunk_path + ".tmp", chunk_path)
+                            new_chunks[digest] = len(packed)
+                        chunks.append([digest, end - start])
+                        start = end
+                        if progress:
+                            progress(end, size)
+                    now = datetime.now()
+                    manifest = {
+                        "source": source,
+                        "filename": os.path.basename(source),
+                        "size": size,
+                        "sha256": file_digest,
+                        "created": now.isoformat(timespec="seconds"),
+                        "chunks": chunks,
+                    }
+                    folder = os.path.join(self.manifest_dir, name)
+                    os.makedirs(folder, exist_ok=True)
+                    manifest_path = os.path.join(folder, f"{now.strftime('%Y-%m-%d-%H%M%S')}.json")
+                    with open(manifest_path, "w", encoding="utf-8") as f:
+                        json.dump(manifest, f)
+                    self.index.add_manifest(manifest_path, manifest, name, new_chunks)
+                except BaseException:
+                    if manifest_path and os.path.exists(manifest_path):
+                        os.remove(manifest_path)
+                    self._discard_chunks(new_chunks)
+                    raise
+            finally:
+                if size:
+                    data.close()
+        return manifest_path, sum(new_chunks.values())
+
+    def _discard_chunks(self, digests):
+        """
+        Delete chunk files that no manifest refers to.
+        """
+        for digest in digests:
+            for path in (self._chunk_path(digest), self._chunk_path(digest) + ".tmp"):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def restore(self, manifest_path, destination):
+        """
+        Rebuild the file of a backup at destination, verifying every chunk and the whole file
+        against their SHA-256. The destination is only replaced once the checksum matches.
+        Raises ValueError if a chunk is missing or corrupt.
+        """
+        manifest = read_manifest(manifest_path)
+        file_digest = hashlib.sha256()
+        tmp = destination + ".restore"
+        try:
+            with open(tmp, "wb") as out:
+                for digest, length in manifest["chunks"]:
+                    try:
+                        with open(self._chunk_path(digest), "rb") as f:
+                            piece = zlib.decompress(f.read())
+                    except (OSError, zlib.error) as e:
+                        raise ValueError(f"Chunk {digest[:12]} is missing or unreadable: {e}")
+                    if len(piece) != length or hashlib.sha256(piece).hexdigest() != digest:
+                        raise ValueError(f"Chunk {digest[:12]} is corrupt")
+                    file_digest.update(piece)
+                    out.write(piece)
+            if file_digest.hexdigest() != manifest["sha256"]:
+                raise ValueError("Restored file does not match the backup checksum")
+            os.replace(tmp, destination)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+def read_manifest(path):
+    """
+    Load a backup manifest.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
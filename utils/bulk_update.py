@@ -0,0 +1,48 @@
+from utils.lazy_import import LazyModule
+
+np = LazyModule("numpy")
+pd = LazyModule("pandas")
+
+def evaluate_expression(df, expression):
+    """
+    Evaluate a constant or a simple expression over the columns of df, vectorized with DataFrame.eval.
+    Examples: 0, 'Tokyo', Popularity + 5, Salary * 1.1. Returns a Series aligned with df.
+    Raises ValueError if the expression can't be evaluated.
+    """
+    expression = expression.strip()
+    if not expression:
+        raise ValueError("Enter a value or an expression.")
+    try:
+        result = df.eval(expression, engine="python")
+    except Exception as e:
+        raise ValueError(f"Could not evaluate {expression}: {e}\nText values need quotes, e.g. 'Tokyo'.")
+    if isinstance(result, pd.DataFrame):
+        raise ValueError("Assignments are not supported, enter only the new value.")
+    if isinstance(result, pd.Series):
+        return result
+    return pd.Series([result] * len(df), index=df.index, dtype=object)
+
+def _comparable(series):
+    """
+    Object array of the values with every kind of missing value as None, so == compares them.
+    """
+    values = series.astype(object)
+    return values.where(values.notna(), None).to_numpy()
+
+def bulk_update_diff(df, rows, col, expression):
+    """
+    Evaluate expression on the given positional rows and compare it to the current values of col.
+    Returns a DataFrame of the rows whose value changes, with columns row, pk, old and new.
+    The primary key is the first column of df.
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    subset = df.iloc[rows]
+    old = _comparable(subset[col])
+    new = _comparable(evaluate_expression(subset, expression))
+    changed = ~(old == new)
+    return pd.DataFrame({
+        "row": rows[changed],
+        "pk": subset.iloc[:, 0].to_numpy()[changed],
+        "old": old[changed],
+        "new": new[changed],
+    })
@@ -0,0 +1,75 @@
+def _plain(value):
+    """
+    Convert NumPy scalars to Python values for pyodbc.
+    """
+    return value.item() if hasattr(value, "item") else value
+
+class ChangeSet:
+    """
+    Staged cell edits of one table, written to the database in a single transaction.
+    Each changed cell keeps its original value, so the edits can be discarded without a query.
+    Cells are keyed by (positional row, column index) in the DataFrame being edited.
+    """
+    def __init__(self):
+        self.changes = {}  # (row, col_index) -> [col name, pk value, original, new]
+
+    def __len__(self):
+        return len(self.changes)
+
+    def stage(self, row, col_index, col, pk, original, new):
+        """
+        Record an edit. Editing a cell back to its original value unstages it.
+        """
+        key = (row, col_index)
+        if key in self.changes:
+            original = self.changes[key][2]
+        try:
+            unchanged = bool(new == original)
+        except (TypeError, ValueError):  # pd.NA and arrays don't compare to a bool
+            unchanged = False
+        if unchanged:
+            self.changes.pop(key, None)
+        else:
+            self.changes[key] = [col, _plain(pk), original, new]
+
+    def rows(self):
+        """
+        Return the positional rows with staged edits.
+        """
+        return {row for row, _ in self.changes}
+
+    def grouped(self):
+        """
+        Return {column: [(new value, pk value), ...]} for the UPDATE statements.
+        """
+        by_col = {}
+        for col, pk, _, new in self.changes.values():
+            by_col.setdefault(col, []).append((_plain(new), pk))
+        return by_col
+
+    def apply(self, conn, table, pk_col):
+        """
+        Write all staged edits with one executemany per column in a single transaction.
+        Rolls back and re-raises if any statement fails. Returns the number of cells written.
+        """
+        cursor = conn.cursor()
+        try:
+            for col, params in self.grouped().items():
+                cursor.executemany(f"UPDATE [{table}] SET [{col}] = ? WHERE [{pk_col}] = ?", params)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+        count = len(self.changes)
+        self.changes = {}
+        return count
+
+    def discard(self):
+        """
+        Drop all staged edits. Returns [(row, col_index, original value), ...] to restore.
+        """
+        restore = [(row, col_index, change[2]) for (row, col_index), change in self.changes.items()]
+        self.changes = {}
+        return restore
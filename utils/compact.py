@@ -0,0 +1,187 @@
+import importlib.util
+
+from utils.search_query import column_kind
+from utils.lazy_import import LazyModule
+
+np = LazyModule("numpy")
+pd = LazyModule("pandas")
+pyodbc = LazyModule("pyodbc")
+
+# Text columns with at most this share of distinct values are stored as categoricals
+CATEGORY_RATIO = 0.5
+# Arrow-backed strings are only used when pyarrow is installed
+HAS_ARROW = importlib.util.find_spec("pyarrow") is not None
+INT_DTYPES = ["uint8", "int8", "uint16", "int16", "uint32", "int32", "int64"]
+
+def query_column_types(conn, table):
+    """
+    Return {column name: ODBC type name} for a table, in column order.
+    """
+    cursor = conn.cursor()
+    try:
+        return {row.column_name: row.type_name for row in cursor.columns(table=table)}
+    finally:
+        cursor.close()
+
+def unique_columns(conn, table):
+    """
+    Return the columns of a table whose values are unique by themselves, the primary key first.
+    Only the primary key or a unique index on that column alone makes a column unique; a
+    composite unique index says nothing about its columns by themselves.
+    """
+    cursor = conn.cursor()
+    try:
+        index_cols = {}
+        try:
+            for row in cursor.statistics(table=table, unique=True):
+                if row.index_name and row.column_name:
+                    index_cols.setdefault(row.index_name, set()).add(row.column_name)
+        except pyodbc.Error:
+            pass
+        try:
+            pk_cols = [row.column_name for row in cursor.primaryKeys(table=table)]
+        except pyodbc.Error:
+            pk_cols = []
+    finally:
+        cursor.close()
+    columns = pk_cols if len(pk_cols) == 1 else []
+    for cols in index_cols.values():
+        if len(cols) == 1 and next(iter(cols)) not in columns:
+            columns.append(next(iter(cols)))
+    return columns
+
+def smallest_int_dtype(low, high):
+    """
+    Return the smallest NumPy integer dtype holding every value between low and high.
+    """
+    for dtype in INT_DTYPES:
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return np.dtype(dtype)
+    return np.dtype("int64")
+
+def _nullable(dtype):
+    """
+    Return the name of the nullable pandas integer dtype matching a NumPy one (uint8 -> UInt8).
+    """
+    return dtype.name.capitalize().replace("Uint", "UInt")
+
+# ------------------ Compaction ------------------
+
+def _compact_int(series):
+    values = series.dropna()
+    if values.empty or not np.all(np.mod(values.to_numpy(dtype=float), 1) == 0):
+        return series
+    dtype = smallest_int_dtype(int(values.min()), int(values.max()))
+    if len(values) == len(series):
+        return series.astype(dtype)
+    # Missing values need the nullable variant
+    return series.astype(_nullable(dtype))
+
+def _compact_text(series):
+    values = series.dropna()
+    if values.empty or not all(isinstance(v, str) for v in values):
+        return series
+    if series.nunique() <= len(series) * CATEGORY_RATIO:
+        return series.astype("category")
+    if HAS_ARROW:
+        return series.astype("string[pyarrow]")
+    return series
+
+def compact_series(series, type_name=None):
+    """
+    Return the series in the most compact dtype that keeps its values.
+    type_name is the ODBC type of the column; without it the kind is taken from the pandas dtype.
+    Flags become bool, integer columns the smallest integer type, repeated text a categorical
+    and other text Arrow-backed strings. Floats and dates are left alone.
+    """
+    if type_name:
+        kind = column_kind(type_name)
+    elif pd.api.types.is_bool_dtype(series.dtype):
+        kind = "bool"
+    elif pd.api.types.is_integer_dtype(series.dtype):
+        kind = "int"
+    elif series.dtype == object:
+        kind = "text"
+    else:
+        kind = "other"
+    if kind == "bool":
+        return series.astype(bool if series.notna().all() else "boolean")
+    if kind == "int":
+        return _compact_int(series)
+    if kind == "text":
+        return _compact_text(series)
+    return series
+
+def compact_frame(df, column_types=None):
+    """
+    Downcast every column of a freshly loaded table, see compact_series.
+    Returns (compacted df, bytes before, bytes after).
+    """
+    column_types = column_types or {}
+    before = int(df.memory_usage(deep=True).sum())
+    compacted = pd.DataFrame(
+        {col: compact_series(df[col], column_types.get(col)) for col in df.columns},
+        index=df.index,
+    )
+    after = int(compacted.memory_usage(deep=True).sum())
+    return compacted, before, after
+
+def format_bytes(n):
+    """
+    Format a byte count as MB or KB for status messages.
+    """
+    return f"{n / (1024 * 1024):.1f} MB" if n >= 1024 * 1024 else f"{n / 1024:.0f} KB"
+
+# ------------------ Edits ------------------
+
+def _widen(df, col, dtype):
+    df[col] = df[col].astype(dtype)
+
+def set_cell(df, row, col_index, value):
+    """
+    Set a cell of a compacted DataFrame by position, like df.iat.
+    The value is converted to the column's dtype; if it does not fit, the column is widened
+    (new category, larger integer type or object) instead of failing. Returns the stored value.
+    """
+    col = df.columns[col_index]
+    dtype = df[col].dtype
+    if value is None or (pd.api.types.is_scalar(value) and pd.isna(value)):
+        # NumPy ints and bools can't hold missing values, switch to the nullable variants
+        if isinstance(dtype, np.dtype) and dtype.kind in "iu":
+            _widen(df, col, _nullable(dtype))
+        elif isinstance(dtype, np.dtype) and dtype.kind == "b":
+            _widen(df, col, "boolean")
+        df.iat[row, col_index] = None
+        return None
+    if isinstance(dtype, pd.CategoricalDtype):
+        if value not in dtype.categories:
+            df[col] = df[col].cat.add_categories([value])
+    elif pd.api.types.is_bool_dtype(dtype):
+        text = str(value).strip().lower()
+        if text in ("true", "1", "-1", "yes"):
+            value = True
+        elif text in ("false", "0", "no"):
+            value = False
+        else:
+            _widen(df, col, object)
+    elif pd.api.types.is_integer_dtype(dtype):
+        try:
+            number = int(str(value).strip())
+        except ValueError:
+            _widen(df, col, object)
+        else:
+            value = number
+            info = np.iinfo(dtype.numpy_dtype if hasattr(dtype, "numpy_dtype") else dtype)
+            if not info.min <= number <= info.max:
+                wider = smallest_int_dtype(min(number, info.min), max(number, info.max))
+                _widen(df, col, wider if isinstance(dtype, np.dtype) else _nullable(wider))
+    elif pd.api.types.is_float_dtype(dtype):
+        try:
+            value = float(str(value).strip())
+        except ValueError:
+            _widen(df, col, object)
+    elif pd.api.types.is_string_dtype(dtype) and dtype != object:
+        value = str(value)
+    df.iat[row, col_index] = value
+    return value
@@ -0,0 +1,129 @@
+import time
+from utils.lazy_import import LazyModule
+from utils.save_diff import connection_string
+from utils.db_executor import BoundConnection
+from utils.uid_allocator import UidAllocator
+from utils.worker_names import WorkerNames
+
+pyodbc = LazyModule("pyodbc")
+
+class ConnectionManager:
+    """
+    Owns the connection to the open save. Opening a file connects, lists its tables and runs the
+    lookups several tabs need (user-controlled promotions, current game date) once, so the tabs
+    read them from here instead of querying the file each. Every phase is timed.
+    worker_names resolves worker names and uids hands out new UIDs; both belong to the open
+    connection and are replaced on every open.
+    The connection is opened on the executor's thread and handed out as a BoundConnection, so
+    it is only ever used from that thread.
+    """
+    def __init__(self, executor):
+        self.executor = executor
+        self.conn = None
+        self.conn_str = None
+        self.db_file = None
+        self.tables = []
+        self.lookups = {}
+        self.worker_names = None
+        self.uids = None
+        self.timings = []  # (phase, seconds) of the last open
+
+    def open(self, db_file, driver, password):
+        """
+        Connect to db_file, closing the current connection first, and prefetch the shared lookups.
+        Returns the connection.
+        """
+        self.close()
+        self.timings = []
+        start = time.perf_counter()
+        conn_str = connection_string(driver, db_file, password)
+        self.conn = BoundConnection(self.executor, self.executor.call(pyodbc.connect, conn_str))
+        self.conn_str = conn_str
+        self.db_file = db_file
+        self.worker_names = WorkerNames(self.conn)
+        self.uids = UidAllocator(self.conn, db_file)
+        self.timing("connect", start)
+        start = time.perf_counter()
+        cursor = self.conn.cursor()
+        try:
+            self.tables = [row.table_name for row in cursor.tables(tableType="TABLE")]
+        finally:
+            cursor.close()
+        self.timing("list tables", start)
+        start = time.perf_counter()
+        self.user_feds()
+        self.current_date()
+        self.timing("shared lookups", start)
+        return self.conn
+
+    def close(self):
+        """
+        Close the connection and forget everything read through it.
+        """
+        if self.conn is not None:
+            try:
+                self.conn.close()
+            except Exception:
+                pass
+        self.conn = None
+        self.conn_str = None
+        self.db_file = None
+        self.tables = []
+        self.lookups = {}
+        self.worker_names = None
+        self.uids = None
+
+    def written(self, *tables):
+        """
+        Forget the lookups and worker names read from tables the app just wrote.
+        """
+        if "tblFed" in tables:
+            self.lookups.pop("user_feds", None)
+        if "tblGameInfo" in tables:
+            self.lookups.pop("current_date", None)
+        if "tblWorker" in tables and self.worker_names is not None:
+            self.worker_names.clear()
+
+    def timing(self, phase, start):
+        """
+        Record the time since start for a phase of opening the file.
+        """
+        self.timings.append((phase, time.perf_counter() - start))
+
+    def report(self):
+        """
+        Return the phase timings of the last open as one line.
+        """
+        return ", ".join(f"{phase} {seconds * 1000:.0f} ms" for phase, seconds in self.timings)
+
+    # ------------------ Shared Lookups ------------------
+
+    def _lookup(self, name, sql, build):
+        if name not in self.lookups:
+            cursor = self.conn.cursor()
+            try:
+                cursor.execute(sql)
+                self.lookups[name] = build(cursor.fetchall())
+            finally:
+                cursor.close()
+        return self.lookups[name]
+
+    def user_feds(self):
+        """
+        Return the user-controlled promotions as {str(UID): Name}.
+        """
+        return dict(self._lookup(
+            "user_feds",
+            "SELECT UID, Name FROM tblFed WHERE User_Controlled = 1",
+            lambda rows: {str(row.UID): row.Name for row in rows},
+        ))
+
+    def current_date(self):
+        """
+        Return the current game date from tblGameInfo, or None.
+        """
+        return self._lookup(
+            "current_date",
+            "SELECT CurrentGameDate FROM tblGameInfo",
+            lambda rows: rows[0][0] if rows else None,
+        )
@@ -0,0 +1,206 @@
+import queue
+import threading
+from tkinter import messagebox
+
+# How often the Tk thread looks for finished jobs, in ms
+POLL_MS = 30
+
+class JobCancelled(Exception):
+    """Raised inside a job by Job.progress() or Job.check() once the job was cancelled."""
+
+class Job:
+    """
+    A unit of work for the DbExecutor. The job function receives the Job as its first argument
+    and calls job.progress() now and then, which reports to the Tk thread and stops the job
+    with JobCancelled after cancel().
+    """
+    def __init__(self, executor, on_progress=None):
+        self.executor = executor
+        self.on_progress = on_progress
+        self.cancelled = threading.Event()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def check(self):
+        if self.cancelled.is_set():
+            raise JobCancelled()
+
+    def progress(self, done, total=None, text=""):
+        """
+        Report progress to the Tk thread, or raise JobCancelled if the job was cancelled.
+        """
+        self.check()
+        self.executor.post(self.on_progress, done, total, text)
+
+class DbExecutor:
+    """
+    One worker thread that owns the database connection: the Access ODBC driver must not be used
+    from two threads at once, so every call on the connection runs on this thread.
+    Database work is submitted as jobs, whose results are handed back to Tk through after() callbacks.
+    A blocking call() from the Tk thread while a job runs would freeze the window until the job is
+    done, so it raises instead.
+    """
+    def __init__(self, root):
+        self.root = root
+        self.jobs = queue.Queue()
+        self.results = queue.Queue()
+        self.thread = None
+        self.pending = 0
+        self.running = None  # the Job on the worker right now
+        self._polling = False
+
+    def _start(self):
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(target=self._run, name="db-executor", daemon=True)
+            self.thread.start()
+
+    def _run(self):
+        while True:
+            task = self.jobs.get()
+            if task is None:
+                return
+            task()
+
+    def in_worker(self):
+        return threading.current_thread() is self.thread
+
+    def call(self, fn, *args, **kwargs):
+        """
+        Run fn on the worker thread and return its result, blocking the caller until it is done.
+        Runs fn directly when called from the worker itself; raises RuntimeError when called from
+        the Tk thread while a job is running.
+        """
+        if self.in_worker():
+            return fn(*args, **kwargs)
+        if self.running is not None and threading.current_thread() is threading.main_thread():
+            raise RuntimeError("Blocking database call from the Tk thread while a job is running, submit it as a job instead")
+        self._start()
+        done = threading.Event()
+        outcome = {}
+
+        def task():
+            try:
+                outcome["value"] = fn(*args, **kwargs)
+            except BaseException as e:
+                outcome["error"] = e
+            finally:
+                done.set()
+
+        self.jobs.put(task)
+        done.wait()
+        if "error" in outcome:
+            raise outcome["error"]
+        return outcome["value"]
+
+    def submit(self, fn, *args, on_done=None, on_error=None, on_progress=None, on_cancel=None):
+        """
+        Queue fn(job, *args) on the worker thread and return the Job. Exactly one of on_done(result),
+        on_error(exception) or on_cancel() is then called on the Tk thread, on_error defaulting to an
+        error message box; on_progress(done, total, text) is called for the job's progress reports.
+        Must be called from the Tk thread.
+        """
+        job = Job(self, on_progress)
+
+        def task():
+            self.running = job
+            try:
+                job.check()
+                result = fn(job, *args)
+            except JobCancelled:
+                self.post(on_cancel)
+            except Exception as e:
+                self.post(on_error if on_error else _report, e)
+            else:
+                self.post(on_done, result)
+            finally:
+                self.running = None
+                self.post(self._finished)
+
+        self.pending += 1
+        self._start()
+        self.jobs.put(task)
+        if not self._polling:
+            self._polling = True
+            self.root.after(POLL_MS, self._poll)
+        return job
+
+    def post(self, callback, *args):
+        """
+        Have callback(*args) called on the Tk thread.
+        """
+        if callback is not None:
+            self.results.put((callback, args))
+
+    def _finished(self):
+        self.pending -= 1
+
+    def _poll(self):
+        while True:
+            try:
+                callback, args = self.results.get_nowait()
+            except queue.Empty:
+                break
+            callback(*args)
+        if self.pending > 0 or not self.results.empty():
+            self.root.after(POLL_MS, self._poll)
+        else:
+            self._polling = False
+
+    def shutdown(self):
+        if self.thread is not None and self.thread.is_alive():
+            self.jobs.put(None)
+
+def _report(error):
+    """
+    Default on_error of submitted jobs: show the error, so no failure goes unnoticed.
+    """
+    messagebox.showerror("Database Error", f"A database job failed:\n{error}")
+
+# ------------------ Thread-bound Connection ------------------
+
+class BoundCursor:
+    """
+    Cursor wrapper that runs every cursor call on the executor thread.
+    Methods that return the cursor itself (execute, tables, columns...) return the wrapper.
+    """
+    def __init__(self, executor, cursor):
+        object.__setattr__(self, "_executor", executor)
+        object.__setattr__(self, "_cursor", cursor)
+
+    def __getattr__(self, name):
+        value = self._executor.call(getattr, self._cursor, name)
+        if not callable(value):
+            return value
+
+        def method(*args, **kwargs):
+            result = self._executor.call(value, *args, **kwargs)
+            return self if result is self._cursor else result
+        return method
+
+    def __setattr__(self, name, value):
+        self._executor.call(setattr, self._cursor, name, value)
+
+    def __iter__(self):
+        return iter(self._executor.call(self._cursor.fetchall))
+
+class BoundConnection:
+    """
+    pyodbc connection wrapper that runs every call on the executor thread, so code handed the
+    connection can use conn.cursor(), pd.read_sql(conn) and conn.commit() from any thread.
+    """
+    def __init__(self, executor, conn):
+        object.__setattr__(self, "_executor", executor)
+        object.__setattr__(self, "_conn", conn)
+
+    def cursor(self):
+        return BoundCursor(self._executor, self._executor.call(self._conn.cursor))
+
+    def __getattr__(self, name):
+        value = self._executor.call(getattr, self._conn, name)
+        if not callable(value):
+            return value
+        return lambda *args, **kwargs: self._executor.call(value, *args, **kwargs)
+
+    def __setattr__(self, name, value):
+        self._executor.call(setattr, self._conn, name, value)
@@ -0,0 +1,35 @@
+# Events published by the app:
+#   "connect"        a save was opened (also after a reconnect)
+#   "reload"         the open save was reconnected
+#   "eject"          the save was closed
+#   "table-written"  the app committed writes, with tables=(table names)
+CONNECT = "connect"
+RELOAD = "reload"
+EJECT = "eject"
+TABLE_WRITTEN = "table-written"
+
+class EventBus:
+    """
+    Minimal publish/subscribe hub so the tabs hear about connection and data changes
+    without the app calling into each of them.
+    """
+    def __init__(self):
+        self.subscribers = {}
+
+    def subscribe(self, event, callback):
+        """
+        Call callback(**data) every time event is published.
+        """
+        self.subscribers.setdefault(event, []).append(callback)
+
+    def unsubscribe(self, event, callback):
+        handlers = self.subscribers.get(event, [])
+        if callback in handlers:
+            handlers.remove(callback)
+
+    def publish(self, event, **data):
+        """
+        Call every subscriber of event, in subscription order.
+        """
+        for callback in list(self.subscribers.get(event, [])):
+            callback(**data)
@@ -1,5 +1,10 @@
-import pyodbc
 import random
+import time
+from itertools import zip_longest
+from utils.lazy_import import LazyModule
+from utils.worker_names import WorkerNames
+
+pyodbc = LazyModule("pyodbc")
 
 # ------------------ Helper Functions ------------------
 
@@ -32,21 +37,6 @@ def query_show_name_by_id(conn, show_id):
     cursor.close()
     return row[0] if row else f"Unknown Show ({show_id})"
 
-def query_worker_name_by_id(conn, worker_id):
-    """
-    Query the name of a worker by their UID from tblWorker.
-    Returns 'Unknown' if not found or None.
-    """
-    if worker_id is None:
-        return "Unknown"
-    cursor = conn.cursor()
-    try:
-        cursor.execute('SELECT Name FROM tblWorker WHERE UID = ?', (int(worker_id),))
-        row = cursor.fetchone()
-        return row[0] if row else "Unknown"
-    finally:
-        cursor.close()
-
 def query_tournaments(conn):
     """
     Query all incomplete round robin tournaments from tblTournament.
@@ -94,30 +84,87 @@ def query_shows_of_fed(conn, fed_id):
     cursor.close()
     return result_list
 
-def generate_round_robin_tournament(participant_ids):
+# Filler participant paired with whoever sits out a round when the count is odd
+BYE = "bye"
+
+def round_robin_rounds(participant_ids, seed=None, rng=None, double=False, shuffle=True):
+    """
+    Yield the rounds of a round-robin schedule one at a time (circle method), each a list of
+    (home, away) tuples. An odd field gets a BYE opponent each round; participant_ids is not changed.
+    Positions are rotated by index arithmetic, so no list is copied per round.
+    seed or rng (a random.Random) make the schedule reproducible; shuffle randomizes home/away
+    and the match order within a round, otherwise the fixed participant alternates sides.
+    double=True adds a second leg with the same rounds and home/away swapped.
+    """
+    players = list(participant_ids)
+    if len(players) % 2 != 0:
+        players.append(BYE)
+    n = len(players)
+    if n < 2:
+        return
+    if rng is None:
+        rng = random.Random(seed)
+    legs = [(rng, False)]
+    if double:
+        # Replay the first leg's random choices with the sides swapped
+        replay = random.Random()
+        replay.setstate(rng.getstate())
+        legs.append((replay, True))
+    for leg_rng, swap in legs:
+        for r in range(n - 1):
+            round_matches = []
+            for j in range(n // 2):
+                # Slot 0 stays put, slots 1..n-1 move one place to the right each round
+                a = players[0 if j == 0 else 1 + (j - 1 - r) % (n - 1)]
+                b = players[1 + (n - 2 - j - r) % (n - 1)]
+                if shuffle:
+                    home_first = leg_rng.random() < 0.5
+                else:
+                    home_first = j != 0 or r % 2 == 0
+                if home_first == swap:
+                    a, b = b, a
+                round_matches.append((a, b))
+            if shuffle:
+                leg_rng.shuffle(round_matches)
+            yield round_matches
+
+def split_blocks(participant_ids, blocks, method="snake"):
+    """
+    Deal the participants, best seed first, into the given number of blocks.
+    "seeded" deals block 1, 2, ... N and starts over at block 1; "snake" turns around at
+    the end of every pass (1..N, N..1), which evens out the blocks' total seeding.
+    """
+    result = [[] for _ in range(blocks)]
+    for i, pid in enumerate(participant_ids):
+        pass_no, slot = divmod(i, blocks)
+        if method == "snake" and pass_no % 2:
+            slot = blocks - 1 - slot
+        result[slot].append(pid)
+    return result
+
+def block_rounds(blocks, seed=None, double=False):
+    """
+    Yield the days of a multi-block tournament: day d holds round d of every block's round robin,
+    generated side by side in one pass. A day's matches alternate between the blocks, so when
+    they are split over several shows each show gets a similar number from every block.
+    Byes are left out. Each day is a list of (block index, match).
+    """
+    rng = random.Random(seed)
+    schedules = [round_robin_rounds(block, rng=random.Random(rng.getrandbits(64)), double=double) for block in blocks]
+    for rounds in zip_longest(*schedules, fillvalue=[]):
+        per_block = [[(b, match) for match in matches if BYE not in match] for b, matches in enumerate(rounds)]
+        yield [entry for turn in zip_longest(*per_block) for entry in turn if entry is not None]
+
+def generate_round_robin_tournament(participant_ids, seed=None, double=False):
     """
     Generate a round-robin schedule for the given participant IDs.
     Returns a list of rounds, each with match tuples.
     """
-    if len(participant_ids) % 2 != 0:
-        participant_ids.append("bye")
-    schedule = []
-    rounds = participant_ids + participant_ids
-    for i in range(1, len(participant_ids)):
-        round_matches = []
-        for j in range(len(participant_ids)//2):
-            match = (rounds[j], rounds[len(participant_ids)-1-j])
-            match_list = list(match)
-            random.shuffle(match_list)
-            round_matches.append(tuple(match_list))
-        random.shuffle(round_matches)
-        schedule.append(round_matches)
-        rounds = [rounds[0]] + [rounds[-1]] + rounds[1:-1]
-    return schedule
+    return list(round_robin_rounds(participant_ids, seed=seed, double=double))
 
 def clear_pre_booking(conn):
     """
-    Clear all pre-booking data from the relevant tables.
+    Clear all pre-booking data from the relevant tables in one transaction.
     """
     cursor = conn.cursor()
     try:
@@ -125,15 +172,15 @@ def clear_pre_booking(conn):
         cursor.execute('DELETE FROM tblPreBookingInvolvedMatch')
         cursor.execute('DELETE FROM tblPreBookingNote')
         conn.commit()
-        print("CLEARED Pre Booking")
-    except pyodbc.Error as e:
-        print(f"Error clearing pre-booking: {e}")
+    except Exception:
+        conn.rollback()
+        raise
     finally:
         cursor.close()
 
 def get_last_prebooking_id(conn):
     """
-    Get the highest UID from tblPreBooking.
+    Get the highest UID from tblPreBooking, for booking without a UidAllocator.
     """
     cursor = conn.cursor()
     try:
@@ -143,77 +190,109 @@ def get_last_prebooking_id(conn):
     finally:
         cursor.close()
 
-def add_data_to_tblPreBooking(conn, cursor, uid, booking_name, fed_id, card_uid, match_or_angle_id, match_length, match_uid):
-    """
-    Insert a new pre-booking entry into tblPreBooking.
-    """
-    query = "INSERT INTO tblPreBooking (UID, Booking_Name, FedUID, CardUID, TVUID, Match, MatchUID, Length, Major, Belt1, Belt2, Belt3, Booked, AngleOutput, Scripted) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
-    values = (uid, booking_name, fed_id, card_uid, 0, True, match_uid, match_length, True, 0, 0, 0, 0, 0, None)
-    cursor.execute(query, values)
-    conn.commit()
+PREBOOKING_INSERTS = {
+    "tblPreBooking": "INSERT INTO tblPreBooking (UID, Booking_Name, FedUID, CardUID, TVUID, Match, MatchUID, Length, Major, Belt1, Belt2, Belt3, Booked, AngleOutput, Scripted) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+    "tblPreBookingInvolvedMatch": "INSERT INTO tblPreBookingInvolvedMatch (PreBookingUID, FedUID, Position, Involved, Complain) VALUES (?, ?, ?, ?, ?)",
+    "tblPreBookingNote": "INSERT INTO tblPreBookingNote (UserBookingUID, Position, RoadAgent_Type, RoadAgent_Worker, RoadAgent_Attack, Used, BeltUID, Champion1, Champion2, Champion3, Match, FedUID, StoryUID) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+}
 
-def add_data_to_tblPreBookingInvolved(conn, cursor, prebooking_uid, fed_uid, position, involved):
+def day_rows(rows, uid, prefix, show_list, match_list, tournament_type, fed_id, match_length_list, match_uid, names, labels=None):
     """
-    Insert a new involved entry into tblPreBookingInvolvedMatch.
+    Append the pre-booking rows for one day's matches to rows ({table: [row tuples]}),
+    numbering them from uid. labels (e.g. the block of each match) are added to the prefix.
+    Returns the next free UID.
     """
-    query = "INSERT INTO tblPreBookingInvolvedMatch (PreBookingUID, FedUID, Position, Involved, Complain) VALUES (?, ?, ?, ?, ?)"
-    values = (prebooking_uid, fed_uid, position, involved, 0)
-    cursor.execute(query, values)
-    conn.commit()
+    for idx, match in enumerate(match_list):
+        match_prefix = f"{prefix} {labels[idx]}" if labels and labels[idx] else prefix
+        if tournament_type == 1:
+            booking_name = f"{match_prefix}: {names.name(match[0])} vs {names.name(match[1])}"
+            involved = list(match)
+        else:
+            team_names = [names.team(team) for team in match]
+            booking_name = f"{match_prefix}: {team_names[0]} vs {team_names[1]}"
+            involved = [pid for team in match for pid in team]
+        rows["tblPreBooking"].append((uid, booking_name, fed_id, show_list[idx], 0, True, match_uid, match_length_list[idx], True, 0, 0, 0, 0, 0, None))
+        for pos, pid in enumerate(involved, start=1):
+            rows["tblPreBookingInvolvedMatch"].append((uid, fed_id, pos, pid, 0))
+        rows["tblPreBookingNote"].append((uid, 1, 200, 0, 0, False, 0, 0, 0, 0, True, fed_id, 0))
+        uid += 1
+    return uid
 
-def add_data_to_tblPreBookingNote(conn, cursor, userbooking_uid, fed_uid):
+def write_prebooking_rows(conn, rows, progress=None):
     """
-    Insert a new note entry into tblPreBookingNote.
+    Insert the rows built by day_rows with one executemany per table, in a single transaction:
+    everything is rolled back if any insert fails.
+    Returns {table: (rows, seconds)}.
     """
-    query = "INSERT INTO tblPreBookingNote (UserBookingUID, Position, RoadAgent_Type, RoadAgent_Worker, RoadAgent_Attack, Used, BeltUID, Champion1, Champion2, Champion3, Match, FedUID, StoryUID) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
-    values = (userbooking_uid, 1, 200, 0, 0, False, 0, 0, 0, 0, True, fed_uid, 0)
-    cursor.execute(query, values)
-    conn.commit()
+    report = {}
+    cursor = conn.cursor()
+    try:
+        for done, table in enumerate(PREBOOKING_INSERTS):
+            if progress:
+                progress(done, len(PREBOOKING_INSERTS), f"Writing {table}...")
+            start = time.perf_counter()
+            if rows[table]:
+                cursor.executemany(PREBOOKING_INSERTS[table], rows[table])
+            report[table] = (len(rows[table]), time.perf_counter() - start)
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    return report
 
-def book_tournament_day(conn, prefix, day, show_list, match_list, tournament_type, fed_id, match_length_list, match_uid):
+def book_tournament_day(conn, prefix, day, show_list, match_list, tournament_type, fed_id, match_length_list, match_uid, names=None, uids=None):
     """
     Book all matches for a single day of a tournament.
     show_list: list of show IDs for each match on this day
     match_uid: UID from tblMatch selected in GUI
     match_list: list of matches (singles/teams)
     match_length_list: list of match lengths per match
-    """
-    last_prebooking_id = get_last_prebooking_id(conn) + 1
-    cursor = conn.cursor()
-    for idx, match in enumerate(match_list):
-        match_length = match_length_list[idx]
-        if tournament_type == 1:
-            booking_name = f"{prefix}: {query_worker_name_by_id(conn, match[0])} vs {query_worker_name_by_id(conn, match[1])}"
-        else:
-            team_names = ["|".join(query_worker_name_by_id(conn, pid) for pid in team) for team in match]
-            booking_name = f"{prefix}: {team_names[0]} vs {team_names[1]}"
-        card_uid = show_list[idx]
-        add_data_to_tblPreBooking(conn, cursor, last_prebooking_id, booking_name, fed_id, card_uid, match_uid, match_length, match_uid)
-        if tournament_type == 1:
-            for pos, pid in enumerate(match):
-                add_data_to_tblPreBookingInvolved(conn, cursor, last_prebooking_id, fed_id, pos+1, pid)
-        else:
-            pos = 1
-            for team in match:
-                for pid in team:
-                    add_data_to_tblPreBookingInvolved(conn, cursor, last_prebooking_id, fed_id, pos, pid)
-                    pos += 1
-        add_data_to_tblPreBookingNote(conn, cursor, last_prebooking_id, fed_id)
-        last_prebooking_id += 1
-    cursor.close()
+    names: WorkerNames of the connection; a throwaway one is made if not given
+    uids: UidAllocator of the connection; without it the next UID is read from tblPreBooking
+    """
+    if names is None:
+        names = WorkerNames(conn)
+    if tournament_type == 1:
+        names.resolve(pid for match in match_list for pid in match)
+    else:
+        names.resolve(pid for match in match_list for team in match for pid in team)
+    rows = {table: [] for table in PREBOOKING_INSERTS}
+    uid = uids.allocate("tblPreBooking", len(match_list)) if uids else get_last_prebooking_id(conn) + 1
+    day_rows(rows, uid, prefix, show_list, match_list, tournament_type, fed_id, match_length_list, match_uid, names)
+    return write_prebooking_rows(conn, rows)
 
-def book_tournament(conn, prefix, tournament_dict, show_list, match_lengths_dict, tournament_type, fed_id, match_uid):
+def book_tournament(conn, prefix, tournament_dict, show_list, match_lengths_dict, tournament_type, fed_id, match_uid, progress=None, names=None, uids=None, labels_dict=None):
     """
     GUI-driven booking for singles, tag, and trios tournaments.
     show_list: list of show IDs for each match (not just per day)
-    """
+    labels_dict: optional {day: [label per match]}, e.g. the blocks of a multi-block tournament
+    The rows for every day are built first and then written in one transaction, so a failure
+    leaves no part of the tournament booked. progress(done, total, text) is called between
+    tables and may raise to stop (and roll back) the booking.
+    Returns {table: (rows, seconds)}.
+    """
+    if names is None:
+        names = WorkerNames(conn)
+    days = sorted(tournament_dict.keys())
+    if tournament_type == 1:
+        names.resolve(pid for day in days for match in tournament_dict[day] for pid in match)
+    else:
+        names.resolve(pid for day in days for match in tournament_dict[day] for team in match for pid in team)
+    rows = {table: [] for table in PREBOOKING_INSERTS}
+    if uids:
+        uid = uids.allocate("tblPreBooking", sum(len(tournament_dict[day]) for day in days))
+    else:
+        uid = get_last_prebooking_id(conn) + 1
     match_idx = 0
-    for day in sorted(tournament_dict.keys()):
+    for day in days:
         matches = tournament_dict[day]
         lengths = match_lengths_dict.get(day, [0]*len(matches))
         shows_for_matches = show_list[match_idx:match_idx+len(matches)]
         if len(matches) != len(lengths) or len(matches) != len(shows_for_matches):
             raise ValueError(f"Day {day} has {len(matches)} matches, {len(lengths)} lengths, {len(shows_for_matches)} shows!")
-        book_tournament_day(conn, prefix, day, shows_for_matches, matches, tournament_type, fed_id, lengths, match_uid)
+        labels = labels_dict.get(day) if labels_dict else None
+        uid = day_rows(rows, uid, prefix, shows_for_matches, matches, tournament_type, fed_id, lengths, match_uid, names, labels)
         match_idx += len(matches)
-
+    return write_prebooking_rows(conn, rows, progress)
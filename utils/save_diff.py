@@ -0,0 +1,147 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from utils.lazy_import import LazyModule
+from utils.compact import unique_columns
+
+np = LazyModule("numpy")
+pd = LazyModule("pandas")
+
+# splitmix64 constants, used to combine two hashes into their Merkle parent
+MIX_1 = 0x9E3779B97F4A7C15
+MIX_2 = 0xBF58476D1CE4E5B9
+MIX_3 = 0x94D049BB133111EB
+
+def connection_string(driver, db_file, password):
+    """
+    Build the ODBC connection string used for Access saves.
+    """
+    return f'DRIVER={driver};DBQ={db_file};UID={""};PWD={password};'
+
+# ------------------ Hashing ------------------
+
+def row_hashes(df):
+    """
+    Return one 64-bit hash per row of df, computed vectorized over all columns.
+    """
+    if df.empty:
+        return np.empty(0, dtype=np.uint64)
+    return pd.util.hash_pandas_object(df.astype(object), index=False).to_numpy(dtype=np.uint64)
+
+def _combine(left, right):
+    with np.errstate(over="ignore"):
+        x = (left * np.uint64(MIX_1)) ^ right
+        x ^= x >> np.uint64(30)
+        x *= np.uint64(MIX_2)
+        x ^= x >> np.uint64(27)
+        x *= np.uint64(MIX_3)
+        x ^= x >> np.uint64(31)
+    return x
+
+def merkle_root(hashes):
+    """
+    Return the Merkle root of row hashes (in primary key order) as a hex string.
+    Each level combines neighbouring pairs in one vectorized step; an odd last node moves up as is.
+    """
+    level = np.asarray(hashes, dtype=np.uint64)
+    if len(level) == 0:
+        return "0" * 16
+    while len(level) > 1:
+        odd = level[-1:] if len(level) % 2 else level[:0]
+        even = level[:len(level) - len(odd)]
+        level = np.concatenate([_combine(even[0::2], even[1::2]), odd])
+    return f"{int(level[0]):016x}"
+
+# ------------------ Diff ------------------
+
+def _plain(value):
+    if value is None or (pd.api.types.is_scalar(value) and pd.isna(value)):
+        return None
+    return value.item() if hasattr(value, "item") else value
+
+def diff_frames(live, backup, pk):
+    """
+    Compare two versions of a table by primary key.
+    Returns {"added": [pk], "removed": [pk], "modified": [(pk, [(col, backup value, live value)])]}
+    where added rows only exist in live and removed rows only in the backup.
+    Raises ValueError if pk is not unique in either version, since rows sharing a key can't be
+    told apart (and restoring by that key would touch rows the diff never showed).
+    """
+    for name, df in (("live save", live), ("backup", backup)):
+        duplicates = df[pk].duplicated()
+        if duplicates.any():
+            raise ValueError(f"{pk} is not unique in the {name} ({int(duplicates.sum())} duplicate keys), can't diff by it")
+    live = live.set_index(pk)
+    backup = backup.set_index(pk)
+    added = live.index.difference(backup.index)
+    removed = backup.index.difference(live.index)
+    common = live.index.intersection(backup.index)
+    columns = [c for c in live.columns if c in backup.columns]
+    a = live.loc[common, columns].astype(object)
+    b = backup.loc[common, columns].astype(object)
+    differs = (row_hashes(a.reset_index(drop=True)) != row_hashes(b.reset_index(drop=True)))
+    a, b = a[differs], b[differs]
+    cell_changed = (a != b).to_numpy() & ~(a.isna().to_numpy() & b.isna().to_numpy())
+    modified = []
+    for i, key in enumerate(a.index):
+        cells = [(columns[j], _plain(b.iat[i, j]), _plain(a.iat[i, j])) for j in np.flatnonzero(cell_changed[i])]
+        if cells:
+            modified.append((_plain(key), cells))
+    return {
+        "added": [_plain(k) for k in added],
+        "removed": [_plain(k) for k in removed],
+        "modified": modified,
+    }
+
+def diff_table(live_conn_str, backup_conn_str, table):
+    """
+    Diff one table between two saves, run in a worker process.
+    Rows are matched by the live table's primary key, or else a column with a unique index of its
+    own (see unique_columns); a table without either is reported as an error and not compared.
+    The Merkle roots of the rows (ordered by that key) are compared first; the row diff is
+    only computed when they differ.
+    """
+    import pyodbc
+    result = {"table": table}
+    try:
+        frames = []
+        for conn_str in (live_conn_str, backup_conn_str):
+            conn = pyodbc.connect(conn_str)
+            try:
+                if not frames:
+                    keys = unique_columns(conn, table)
+                    if not keys:
+                        raise ValueError("No primary key or unique column to match its rows by, not compared")
+                frames.append(pd.read_sql(f"SELECT * FROM [{table}]", conn))
+            finally:
+                conn.close()
+        live, backup = frames
+        pk = keys[0]
+        live = live.sort_values(pk, kind="mergesort").reset_index(drop=True)
+        backup = backup.sort_values(pk, kind="mergesort").reset_index(drop=True)
+        result["rows_live"], result["rows_backup"] = len(live), len(backup)
+        if list(live.columns) == list(backup.columns) and merkle_root(row_hashes(live)) == merkle_root(row_hashes(backup)):
+            result["status"] = "same"
+            return result
+        result["status"] = "changed"
+        result["pk"] = pk
+        result.update(diff_frames(live, backup, pk))
+    except Exception as e:
+        result["status"] = "error"
+        result["error"] = str(e)
+    return result
+
+def diff_saves(live_conn_str, backup_conn_str, tables, workers=None, progress=None):
+    """
+    Diff the given tables between a live save and a backup, one table per task in a process pool.
+    progress(done, total) is called as tables finish. Returns {table: result of diff_table}.
+    """
+    results = {}
+    workers = workers or max(1, min(len(tables), (os.cpu_count() or 2) - 1))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(diff_table, live_conn_str, backup_conn_str, t) for t in tables]
+        for done, future in enumerate(as_completed(futures), start=1):
+            result = future.result()
+            results[result["table"]] = result
+            if progress:
+                progress(done, len(tables))
+    return results
@@ -0,0 +1,78 @@
+from utils.lazy_import import LazyModule
+from utils.save_diff import _plain
+
+pd = LazyModule("pandas")
+
+def restore_plan(result, keys=None):
+    """
+    Turn the diff of one table (a result of diff_table) into the statements that bring the live
+    rows back to the backup: rows added since the backup are deleted, removed rows are inserted
+    again and modified rows are updated. keys limits the plan to some primary key values.
+    Returns {"pk": pk, "delete": [pk], "insert": [pk], "update": [pk]}.
+    """
+    if result.get("status") != "changed":
+        raise ValueError(f"{result['table']} has no row diff to restore from ({result.get('error', result.get('status'))})")
+    keep = (lambda k: True) if keys is None else (lambda k: k in keys)
+    return {
+        "pk": result["pk"],
+        "delete": [k for k in result["added"] if keep(k)],
+        "insert": [k for k in result["removed"] if keep(k)],
+        "update": [k for k, _ in result["modified"] if keep(k)],
+    }
+
+def _rows(df, pk, keys, columns):
+    """
+    Return the rows of df with the given primary keys as tuples of Python values, in columns order.
+    """
+    rows = df[df[pk].isin(keys)]
+    return [tuple(_plain(v) for v in row) for row in rows[columns].astype(object).itertuples(index=False)]
+
+def restore_rows(conn, backup_conn_str, plans):
+    """
+    Write the rows of a backup back into the live save for the given plans ({table: restore_plan}).
+    Backup rows are read over a separate connection; all DELETE, INSERT and UPDATE statements run
+    with executemany on conn in one transaction, which is rolled back if any of them fails.
+    Returns {table: (deleted, inserted, updated)}.
+    """
+    import pyodbc
+    backup_conn = pyodbc.connect(backup_conn_str)
+    try:
+        frames = {t: pd.read_sql(f"SELECT * FROM [{t}]", backup_conn) for t, p in plans.items() if p["insert"] or p["update"]}
+    finally:
+        backup_conn.close()
+    live_columns = {}
+    cursor = conn.cursor()
+    try:
+        for table in plans:
+            cursor.execute(f"SELECT * FROM [{table}] WHERE 1 = 0")
+            live_columns[table] = [d[0] for d in cursor.description]
+        counts = {}
+        for table, plan in plans.items():
+            pk = plan["pk"]
+            if plan["delete"]:
+                cursor.executemany(f"DELETE FROM [{table}] WHERE [{pk}] = ?", [(_plain(k),) for k in plan["delete"]])
+            if table in frames:
+                backup = frames[table]
+                columns = [c for c in backup.columns if c in live_columns[table]]
+                if plan["insert"]:
+                    names = ", ".join(f"[{c}]" for c in columns)
+                    marks = ", ".join("?" for _ in columns)
+                    cursor.executemany(
+                        f"INSERT INTO [{table}] ({names}) VALUES ({marks})",
+                        _rows(backup, pk, plan["insert"], columns),
+                    )
+                if plan["update"]:
+                    others = [c for c in columns if c != pk]
+                    assignments = ", ".join(f"[{c}] = ?" for c in others)
+                    cursor.executemany(
+                        f"UPDATE [{table}] SET {assignments} WHERE [{pk}] = ?",
+                        _rows(backup, pk, plan["update"], others + [pk]),
+                    )
+            counts[table] = (len(plan["delete"]), len(plan["insert"]), len(plan["update"]))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    return counts
@@ -0,0 +1,348 @@
+import re
+from datetime import datetime
+from utils.lazy_import import LazyModule
+
+np = LazyModule("numpy")
+pd = LazyModule("pandas")
+
+# Search grammar of the table browser:
+#   expr       := and_expr (OR and_expr)*
+#   and_expr   := atom (AND atom)*
+#   atom       := '(' expr ')' | comparison | keyword
+#   comparison := column (= | <> | != | < | > | <= | >=) value
+#               | column BETWEEN value AND value
+#               | column LIKE value
+#               | column IN '(' value (',' value)* ')'
+#   keyword    := word+
+# Values are 'quoted strings' or bare words. Words that are not column names are keywords.
+
+TOKEN_RE = re.compile(r"\s*(?:(?P<string>'(?:[^']|'')*')|(?P<op><>|!=|<=|>=|=|<|>)|(?P<punct>[(),])|(?P<word>[^\s()',=<>!]+))")
+OPERATORS = ("BETWEEN", "LIKE", "IN")
+
+# ODBC type names reported by the Access driver, grouped by how values are compared
+INT_TYPES = {"COUNTER", "INTEGER", "SMALLINT", "BYTE", "LONG", "BIGINT", "TINYINT"}
+FLOAT_TYPES = {"DOUBLE", "REAL", "FLOAT", "CURRENCY", "DECIMAL", "NUMERIC", "MONEY"}
+BOOL_TYPES = {"BIT", "YESNO"}
+DATE_TYPES = {"DATETIME", "DATE", "TIME", "TIMESTAMP"}
+TEXT_TYPES = {"VARCHAR", "LONGCHAR", "CHAR", "TEXT", "MEMO", "WCHAR", "WVARCHAR", "WLONGVARCHAR"}
+# Keywords made of these characters are also searched in number columns
+NUMERIC_TERM_RE = re.compile(r"[0-9.\-]+")
+
+class QueryError(ValueError):
+    """Raised when a search query does not follow the grammar."""
+
+class CannotPushDown(Exception):
+    """Raised when a parsed query cannot be expressed as a SQL WHERE clause."""
+
+# ------------------ Parsing ------------------
+
+def tokenize(query):
+    """
+    Split a search query into (kind, text) tokens.
+    """
+    tokens = []
+    pos = 0
+    query = query.rstrip()
+    while pos < len(query):
+        m = TOKEN_RE.match(query, pos)
+        if not m:
+            raise QueryError(f"Unexpected character at position {pos}: {query[pos:pos + 10]!r}")
+        kind = m.lastgroup
+        text = m.group(kind)
+        if kind == "string":
+            text = text[1:-1].replace("''", "'")
+        tokens.append((kind, text))
+        pos = m.end()
+    return tokens
+
+class _Parser:
+    """
+    Recursive descent parser producing tuple nodes:
+    ("or", [nodes]), ("and", [nodes]), ("kw", term), ("cmp", col, op, value),
+    ("between", col, low, high), ("like", col, pattern), ("in", col, [values]).
+    """
+    def __init__(self, tokens, columns):
+        self.tokens = tokens
+        self.pos = 0
+        self.columns = {c.lower(): c for c in columns}
+
+    def peek(self, offset=0):
+        i = self.pos + offset
+        return self.tokens[i] if i < len(self.tokens) else (None, None)
+
+    def next(self):
+        tok = self.peek()
+        if tok[0] is None:
+            raise QueryError("Unexpected end of query")
+        self.pos += 1
+        return tok
+
+    def is_word(self, word, offset=0):
+        kind, text = self.peek(offset)
+        return kind == "word" and text.upper() == word
+
+    def expect(self, kind, text):
+        tok = self.next()
+        if tok != (kind, text):
+            raise QueryError(f"Expected {text!r} but found {tok[1]!r}")
+
+    def parse(self):
+        node = self.parse_or()
+        if self.peek()[0] is not None:
+            raise QueryError(f"Unexpected {self.peek()[1]!r}")
+        return node
+
+    def parse_or(self):
+        nodes = [self.parse_and()]
+        while self.is_word("OR"):
+            self.next()
+            nodes.append(self.parse_and())
+        return nodes[0] if len(nodes) == 1 else ("or", nodes)
+
+    def parse_and(self):
+        nodes = [self.parse_atom()]
+        while self.is_word("AND"):
+            self.next()
+            nodes.append(self.parse_atom())
+        return nodes[0] if len(nodes) == 1 else ("and", nodes)
+
+    def parse_value(self):
+        kind, text = self.next()
+        if kind not in ("string", "word"):
+            raise QueryError(f"Expected a value but found {text!r}")
+        return text
+
+    def parse_atom(self):
+        kind, text = self.peek()
+        if (kind, text) == ("punct", "("):
+            self.next()
+            node = self.parse_or()
+            self.expect("punct", ")")
+            return node
+        if kind == "word" and text.lower() in self.columns:
+            next_kind, next_text = self.peek(1)
+            col = self.columns[text.lower()]
+            if next_kind == "op":
+                self.pos += 2
+                return ("cmp", col, "<>" if next_text == "!=" else next_text, self.parse_value())
+            if next_kind == "word" and next_text.upper() in OPERATORS:
+                self.pos += 2
+                op = next_text.upper()
+                if op == "BETWEEN":
+                    low = self.parse_value()
+                    if not self.is_word("AND"):
+                        raise QueryError("BETWEEN needs AND")
+                    self.next()
+                    return ("between", col, low, self.parse_value())
+                if op == "LIKE":
+                    return ("like", col, self.parse_value())
+                self.expect("punct", "(")
+                values = [self.parse_value()]
+                while self.peek() == ("punct", ","):
+                    self.next()
+                    values.append(self.parse_value())
+                self.expect("punct", ")")
+                return ("in", col, values)
+        words = []
+        while self.peek()[0] == "word" and not (self.is_word("AND") or self.is_word("OR")):
+            words.append(self.next()[1])
+        if not words:
+            raise QueryError(f"Unexpected {text!r}" if text else "Empty condition")
+        return ("kw", " ".join(words).lower())
+
+def parse(query, columns):
+    """
+    Parse a search query into a node tree. Raises QueryError on invalid syntax.
+    """
+    tokens = tokenize(query)
+    if not tokens:
+        raise QueryError("Empty query")
+    return _Parser(tokens, columns).parse()
+
+def is_plain(query, columns):
+    """
+    True if the query only uses the original syntax (keywords and col='value' joined by AND/OR),
+    which TableSearch.mask evaluates with as-you-type refinement.
+    """
+    for or_part in re.split(r'\s+OR\s+', query.strip(), flags=re.IGNORECASE):
+        for cond in re.split(r'\s+AND\s+', or_part, flags=re.IGNORECASE):
+            cond = cond.strip()
+            m = re.fullmatch(r"(\w+)\s*=\s*'([^']*)'", cond)
+            if m and m.group(1) in columns:
+                continue
+            if any(ch in cond for ch in "()<>=!',"):
+                return False
+            words = cond.split()
+            if len(words) > 1 and words[0].lower() in {c.lower() for c in columns} and words[1].upper() in OPERATORS:
+                return False
+    return True
+
+# ------------------ SQL Compilation ------------------
+
+def column_kind(type_name):
+    """
+    Map an ODBC type name to the kind of comparison used for it.
+    """
+    type_name = (type_name or "").upper()
+    if type_name in INT_TYPES:
+        return "int"
+    if type_name in FLOAT_TYPES:
+        return "float"
+    if type_name in BOOL_TYPES:
+        return "bool"
+    if type_name in DATE_TYPES:
+        return "date"
+    if type_name in TEXT_TYPES:
+        return "text"
+    return "other"
+
+def convert_value(value, kind):
+    """
+    Convert a literal from the query to the Python type of a column kind.
+    Raises ValueError if it does not fit.
+    """
+    if kind == "int":
+        return int(value)
+    if kind == "float":
+        return float(value)
+    if kind == "bool":
+        lowered = value.lower()
+        if lowered in ("true", "yes", "1", "-1"):
+            return True
+        if lowered in ("false", "no", "0"):
+            return False
+        raise ValueError(f"Not a boolean: {value}")
+    if kind == "date":
+        return datetime.fromisoformat(value)
+    return value
+
+def keyword_columns(term, column_types):
+    """
+    Return the columns a keyword term is searched in: text columns, and number columns when the
+    term looks like a number. compile_where and evaluate both search only these columns.
+    """
+    numeric = NUMERIC_TERM_RE.fullmatch(term) is not None
+    return [
+        col for col, type_name in column_types.items()
+        if column_kind(type_name) == "text" or (numeric and column_kind(type_name) in ("int", "float"))
+    ]
+
+def _like_escape(text):
+    """
+    Escape the Access LIKE wildcards in text.
+    """
+    return re.sub(r"([\[%_])", r"[\1]", text)
+
+def compile_where(node, column_types):
+    """
+    Compile a node tree into a parameterized WHERE clause for the Access ODBC driver.
+    column_types maps column names to ODBC type names. Returns (sql, params).
+    NULL never matches a condition, except for <>, which matches it like evaluate does.
+    Raises CannotPushDown if a value does not fit its column type.
+    """
+    kind = node[0]
+    if kind in ("or", "and"):
+        parts, params = [], []
+        for child in node[1]:
+            sql, child_params = compile_where(child, column_types)
+            parts.append(sql)
+            params.extend(child_params)
+        return "(" + f" {kind.upper()} ".join(parts) + ")", params
+    if kind == "kw":
+        term = node[1]
+        pattern = f"%{_like_escape(term)}%"
+        parts, params = [], []
+        for col in keyword_columns(term, column_types):
+            if column_kind(column_types[col]) == "text":
+                parts.append(f"[{col}] LIKE ?")
+            else:
+                parts.append(f"CStr([{col}]) LIKE ?")
+            params.append(pattern)
+        return ("(" + " OR ".join(parts) + ")", params) if parts else ("(1 = 0)", [])
+    col = node[1]
+    if col not in column_types:
+        raise CannotPushDown(f"Unknown column {col}")
+    col_kind = column_kind(column_types[col])
+    try:
+        if kind == "cmp":
+            if node[2] == "<>":
+                return f"([{col}] <> ? OR [{col}] IS NULL)", [convert_value(node[3], col_kind)]
+            return f"([{col}] {node[2]} ?)", [convert_value(node[3], col_kind)]
+        if kind == "between":
+            return f"([{col}] BETWEEN ? AND ?)", [convert_value(node[2], col_kind), convert_value(node[3], col_kind)]
+        if kind == "like":
+            if col_kind in ("text", "other"):
+                return f"([{col}] LIKE ?)", [node[2]]
+            return f"(CStr([{col}]) LIKE ?)", [node[2]]
+        if kind == "in":
+            values = [convert_value(v, col_kind) for v in node[2]]
+            return f"([{col}] IN ({', '.join('?' * len(values))}))", values
+    except ValueError as e:
+        raise CannotPushDown(str(e))
+    raise CannotPushDown(f"Unsupported node {kind}")
+
+# ------------------ Pandas Evaluation ------------------
+
+def _typed(series, value):
+    """
+    Convert a literal to the type of a DataFrame column for comparisons.
+    Returns (series, value), falling back to comparing strings.
+    """
+    try:
+        if pd.api.types.is_bool_dtype(series.dtype):
+            return series, convert_value(value, "bool")
+        if pd.api.types.is_numeric_dtype(series.dtype):
+            return series, float(value)
+        if pd.api.types.is_datetime64_any_dtype(series.dtype):
+            return series, pd.Timestamp(value)
+    except ValueError:
+        pass
+    return series.astype(str), value
+
+def _to_mask(values):
+    return np.asarray(pd.Series(values).to_numpy(dtype=bool, na_value=False))
+
+def evaluate(node, engine, column_types=None):
+    """
+    Evaluate a node tree against the DataFrame of a TableSearch engine in pandas.
+    Keyword and text equality terms use the engine's index. With column_types, keywords are only
+    searched in keyword_columns, like compile_where does; missing values only match <>.
+    Returns a NumPy boolean mask.
+    """
+    df = engine.df
+    kind = node[0]
+    if kind == "or":
+        mask = np.zeros(len(df), dtype=bool)
+        for child in node[1]:
+            mask |= evaluate(child, engine, column_types)
+        return mask
+    if kind == "and":
+        mask = np.ones(len(df), dtype=bool)
+        for child in node[1]:
+            mask &= evaluate(child, engine, column_types)
+        return mask
+    if kind == "kw":
+        return engine.keyword_mask(node[1], keyword_columns(node[1], column_types) if column_types else None)
+    col = node[1]
+    present = df[col].notna().to_numpy()
+    if kind == "cmp":
+        op, value = node[2], node[3]
+        series, typed = _typed(df[col], value)
+        if op in ("=", "<>") and isinstance(typed, str):
+            mask = engine.equals_mask(col, value)
+            return mask & present if op == "=" else ~mask | ~present
+        ops = {"=": series.eq, "<>": series.ne, "<": series.lt, ">": series.gt, "<=": series.le, ">=": series.ge}
+        mask = _to_mask(ops[op](typed))
+        return mask | ~present if op == "<>" else mask & present
+    if kind == "between":
+        series, low = _typed(df[col], node[2])
+        series, high = _typed(df[col], node[3])
+        return _to_mask((series >= low) & (series <= high)) & present
+    if kind == "like":
+        regex = "".join(".*" if ch == "%" else "." if ch == "_" else re.escape(ch) for ch in node[2])
+        return _to_mask(df[col].astype(str).str.fullmatch(regex, case=False)) & present
+    if kind == "in":
+        values = [_typed(df[col], v)[1] for v in node[2]]
+        series = _typed(df[col], node[2][0])[0]
+        return _to_mask(series.isin(values)) & present
+    raise QueryError(f"Unsupported node {kind}")
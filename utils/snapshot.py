@@ -0,0 +1,126 @@
+import hashlib
+import importlib.util
+import json
+import os
+import re
+from utils.lazy_import import LazyModule
+
+pd = LazyModule("pandas")
+
+# Feather files are memory-mapped when pyarrow is installed, otherwise tables are pickled
+HAS_ARROW = importlib.util.find_spec("pyarrow") is not None
+
+class SnapshotStore:
+    """
+    Columnar on-disk snapshot of the tables of one save file, for fast read-only browsing.
+    The manifest keys the snapshot on the file's path, size and mtime. If the file changed on
+    disk other than through the app, every table snapshot is dropped and tables are exported
+    again when next loaded; tables written by the app are dropped one by one.
+    Only a stat is done on the Tk thread, the file's content is never hashed.
+    """
+    def __init__(self, db_file, root="snapshots"):
+        self.db_file = os.path.abspath(db_file)
+        name = os.path.splitext(os.path.basename(self.db_file))[0]
+        key = hashlib.sha1(self.db_file.encode("utf-8")).hexdigest()[:12]
+        self.folder = os.path.join(root, f"{name}-{key}")
+        self.manifest_path = os.path.join(self.folder, "manifest.json")
+        os.makedirs(self.folder, exist_ok=True)
+        self.manifest = self._read_manifest()
+        self.version = 0  # bumped by written(), an export started before a write is not put
+        self.validate()
+
+    def _read_manifest(self):
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"path": self.db_file, "size": None, "mtime_ns": None, "tables": {}}
+
+    def _write_manifest(self):
+        tmp = self.manifest_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp, self.manifest_path)
+
+    def _stat(self):
+        st = os.stat(self.db_file)
+        return st.st_size, st.st_mtime_ns
+
+    def validate(self):
+        """
+        Check the snapshot against the save file: unless its size and mtime are the ones recorded,
+        the table snapshots are dropped.
+        """
+        size, mtime_ns = self._stat()
+        if (size, mtime_ns) == (self.manifest["size"], self.manifest["mtime_ns"]):
+            return
+        for table in list(self.manifest["tables"]):
+            self._drop(table)
+        self.manifest.update(size=size, mtime_ns=mtime_ns)
+        self._write_manifest()
+
+    def _file_for(self, table):
+        safe = re.sub(r"[^\w.-]", "_", table)
+        suffix = hashlib.sha1(table.encode("utf-8")).hexdigest()[:6]
+        return f"{safe}-{suffix}.{'feather' if HAS_ARROW else 'pkl'}"
+
+    def _drop(self, table):
+        entry = self.manifest["tables"].pop(table, None)
+        if entry:
+            try:
+                os.remove(os.path.join(self.folder, entry["file"]))
+            except OSError:
+                pass
+
+    def __contains__(self, table):
+        return table in self.manifest["tables"]
+
+    def get(self, table):
+        """
+        Return (df, column_types) of a table from the snapshot, or None if it isn't there.
+        """
+        self.validate()
+        entry = self.manifest["tables"].get(table)
+        if entry is None:
+            return None
+        path = os.path.join(self.folder, entry["file"])
+        try:
+            if path.endswith(".feather"):
+                import pyarrow.feather as feather
+                df = feather.read_table(path, memory_map=True).to_pandas()
+            else:
+                df = pd.read_pickle(path)
+        except Exception:
+            self._drop(table)
+            self._write_manifest()
+            return None
+        return df, entry["column_types"]
+
+    def put(self, table, df, column_types):
+        """
+        Write a fully loaded table to the snapshot.
+        """
+        self.validate()
+        self._drop(table)
+        name = self._file_for(table)
+        path = os.path.join(self.folder, name)
+        df = df.reset_index(drop=True)
+        if HAS_ARROW:
+            # Uncompressed so the file can be memory-mapped
+            df.to_feather(path, compression="uncompressed")
+        else:
+            df.to_pickle(path)
+        self.manifest["tables"][table] = {"file": name, "rows": len(df), "column_types": column_types}
+        self._write_manifest()
+
+    def written(self, *tables):
+        """
+        Record a write by the app: drop the written tables and re-key the snapshot on the file's
+        new size and mtime, so the other tables stay valid.
+        """
+        self.version += 1
+        for table in tables:
+            self._drop(table)
+        size, mtime_ns = self._stat()
+        self.manifest.update(size=size, mtime_ns=mtime_ns)
+        self._write_manifest()
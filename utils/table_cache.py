@@ -0,0 +1,114 @@
+import os
+from collections import OrderedDict
+
+# Tables written by the booking tabs, used when notifying the app about writes
+PREBOOKING_TABLES = ("tblPreBooking", "tblPreBookingInvolvedMatch", "tblPreBookingNote")
+USERBOOKING_TABLES = ("tblUserBooking", "tblUserBookingInvolvedMatch", "tblUserBookingNote")
+
+def frame_memory(df):
+    """
+    Return the memory used by a DataFrame in bytes, including object contents.
+    """
+    return int(df.memory_usage(deep=True).sum())
+
+class TableCache:
+    """
+    Bounded LRU cache of loaded tables keyed by table name.
+    Entries hold the DataFrame, its search index and column types, and are sized in bytes
+    against a cap in MB. The cache drops everything when the database file changes on disk
+    (mtime or size), and single tables when the app writes to them.
+    It also counts table switches so the tables usually opened next can be prefetched.
+    """
+    def __init__(self, db_file, max_mb=256):
+        self.db_file = db_file
+        self.max_bytes = max_mb * 1024 * 1024
+        self.entries = OrderedDict()  # table -> (df, engine, column_types, nbytes)
+        self.total_bytes = 0
+        self.transitions = {}  # table -> {next table: count}
+        self.version = 0  # bumped on every write or flush, so stale prefetches can be dropped
+        self._stamp = self._file_stamp()
+
+    def _file_stamp(self):
+        try:
+            st = os.stat(self.db_file)
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+
+    def _check_file(self):
+        """
+        Drop all entries if the database file changed since the last check or write.
+        """
+        stamp = self._file_stamp()
+        if stamp != self._stamp:
+            self.clear()
+            self._stamp = stamp
+
+    def get(self, table):
+        """
+        Return (df, engine, column_types) for a cached table or None, marking it as recently used.
+        """
+        self._check_file()
+        entry = self.entries.get(table)
+        if entry is None:
+            return None
+        self.entries.move_to_end(table)
+        return entry[:3]
+
+    def put(self, table, df, engine=None, column_types=None):
+        """
+        Cache a fully loaded table, evicting the least recently used tables to stay under the cap.
+        Tables larger than the whole cap are not cached.
+        """
+        self._check_file()
+        self.invalidate(table)
+        nbytes = frame_memory(df) + (engine.memory_usage() if engine is not None else 0)
+        if nbytes > self.max_bytes:
+            return
+        while self.entries and self.total_bytes + nbytes > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.total_bytes -= evicted[3]
+        self.entries[table] = (df, engine, column_types, nbytes)
+        self.total_bytes += nbytes
+
+    def __contains__(self, table):
+        return table in self.entries
+
+    def invalidate(self, *tables):
+        """
+        Drop the given tables from the cache.
+        """
+        for table in tables:
+            entry = self.entries.pop(table, None)
+            if entry is not None:
+                self.total_bytes -= entry[3]
+
+    def written(self, *tables):
+        """
+        Record a write by the app: drop the written tables and accept the new file mtime,
+        so the app's own commits don't flush the other cached tables.
+        """
+        self.invalidate(*tables)
+        self._stamp = self._file_stamp()
+        self.version += 1
+
+    def clear(self):
+        self.entries.clear()
+        self.total_bytes = 0
+        self.version += 1
+
+    def record_switch(self, previous, table):
+        """
+        Count a switch from one table to another for prefetching.
+        """
+        if previous and previous != table:
+            counts = self.transitions.setdefault(previous, {})
+            counts[table] = counts.get(table, 0) + 1
+
+    def likely_next(self, table, count=2):
+        """
+        Return up to count uncached tables most often opened after the given table.
+        """
+        counts = self.transitions.get(table, {})
+        ranked = sorted(counts, key=counts.get, reverse=True)
+        return [t for t in ranked if t not in self.entries][:count]
@@ -0,0 +1,334 @@
+import re
+from utils.lazy_import import LazyModule
+
+np = LazyModule("numpy")
+pd = LazyModule("pandas")
+
+TOKEN_RE = re.compile(r'\w+')
+# Above this many matching distinct values a column is filtered through its codes instead of its postings
+GATHER_THRESHOLD = 256
+# Above this many matching vocabulary tokens, keyword lookups scan the distinct values per column instead
+VOCAB_THRESHOLD = 4096
+# Candidate sets smaller than 1/DIRECT_RATIO of the table are checked row by row
+DIRECT_RATIO = 16
+# Number of recent keyword terms whose matching values are kept for as-you-type refinement
+TERM_CACHE_SIZE = 8
+INT_CHARS = set("0123456789-")
+
+# ------------------ Query Parsing ------------------
+
+def parse_query(query, columns):
+    """
+    Parse a search query into OR groups of AND terms.
+    Each term is a tuple (column, value) for col='value' conditions or (None, keyword) for keyword terms.
+    """
+    groups = []
+    for or_part in re.split(r'\s+OR\s+', query.strip(), flags=re.IGNORECASE):
+        terms = []
+        for cond in re.split(r'\s+AND\s+', or_part, flags=re.IGNORECASE):
+            cond = cond.strip()
+            m = re.match(r"(\w+)\s*=\s*'([^']*)'", cond)
+            if m and m.group(1) in columns:
+                terms.append((m.group(1), m.group(2)))
+            elif cond:
+                terms.append((None, cond.lower()))
+        groups.append(terms)
+    return groups
+
+def _implies(term, previous):
+    """
+    True if every row matching term also matches the previous term.
+    """
+    if term[0] != previous[0]:
+        return False
+    if term[0] is None:
+        return previous[1] in term[1]
+    return term[1] == previous[1]
+
+def _contains(strings, term):
+    """
+    Vectorized substring test over an object array of strings.
+    """
+    return pd.Series(strings, dtype=object).str.contains(term, regex=False).to_numpy(dtype=bool, na_value=False)
+
+# ------------------ Search Engine ------------------
+
+class TableSearch:
+    """
+    Indexed search over a loaded DataFrame.
+    Every column is dictionary-encoded once: each row stores the code of its distinct cell string,
+    and an inverted index maps (column, value) and (token, column) to row ids. Keyword and
+    col='value' terms become index lookups combined with NumPy boolean masks (bitsets).
+    Queries that extend the previous one only re-check the previous result, and cell edits
+    update the index in place instead of rebuilding it.
+    """
+    def __init__(self, df):
+        self.df = df
+        self.columns = list(df.columns)
+        self.n = len(df)
+        self.codes = {}        # col -> int32 array, distinct value code per row
+        self.values = {}       # col -> list of distinct cell strings
+        self.lowered = {}      # col -> object array of lower-cased distinct strings
+        self.value_codes = {}  # col -> {cell string: code}
+        self.postings = {}     # col -> (row ids sorted by code, start offset of each code)
+        self.moved = {}        # col -> rows whose code changed since the postings were built
+        self.tokens = {}       # token -> list of (col, code), text columns only
+        self.numeric = {}      # col -> None, "int" or "other" for numeric columns (not tokenized)
+        self._vocab = None
+        self._term_codes = {}  # keyword term -> {col: codes}, most recent last
+        self._last = None      # (terms, mask) of the previous single-group query
+        for col in self.columns:
+            self._index_column(col)
+
+    def _index_column(self, col):
+        """
+        Dictionary-encode one column and add its postings and tokens to the index.
+        """
+        codes, uniques = pd.factorize(self.df[col], use_na_sentinel=False)
+        # Different raw values can print the same (1 and 1.0), so encode on the displayed string
+        str_codes, values = pd.factorize(np.array([str(u) for u in uniques], dtype=object))
+        codes = str_codes[codes].astype(np.int32)
+        values = list(values)
+        order = np.argsort(codes, kind='stable').astype(np.int32)
+        starts = np.searchsorted(codes[order], np.arange(len(values) + 1))
+        self.codes[col] = codes
+        self.values[col] = values
+        self.lowered[col] = np.array([v.lower() for v in values], dtype=object)
+        self.value_codes[col] = {v: i for i, v in enumerate(values)}
+        self.postings[col] = (order, starts)
+        self.moved[col] = set()
+        dtype = self.df[col].dtype
+        if pd.api.types.is_numeric_dtype(dtype):
+            # Numbers are single tokens, so their distinct values are scanned directly
+            self.numeric[col] = "int" if pd.api.types.is_integer_dtype(dtype) else "other"
+        else:
+            self.numeric[col] = None
+            for code, text in enumerate(self.lowered[col]):
+                self._add_tokens(col, code, text)
+
+    def _add_tokens(self, col, code, text):
+        for tok in set(TOKEN_RE.findall(text)):
+            self.tokens.setdefault(tok, []).append((col, code))
+        self._vocab = None
+
+    def _rows_for_codes(self, col, codes):
+        """
+        Return a mask of rows whose value in col has one of the given codes.
+        """
+        if len(codes) > GATHER_THRESHOLD:
+            hit = np.zeros(len(self.values[col]), dtype=bool)
+            hit[list(codes)] = True
+            return hit[self.codes[col]]
+        mask = np.zeros(self.n, dtype=bool)
+        order, starts = self.postings[col]
+        for code in codes:
+            if code < len(starts) - 1:  # values added by edits have no postings
+                mask[order[starts[code]:starts[code + 1]]] = True
+        if self.moved[col]:
+            rows = np.fromiter(self.moved[col], dtype=np.int64)
+            mask[rows] = np.isin(self.codes[col][rows], list(codes))
+        return mask
+
+    def _matching_codes(self, term):
+        """
+        Return {col: codes} of distinct values containing the keyword term.
+        A term extending a recent term only re-checks that term's values; otherwise
+        single-word terms go through the token vocabulary and others scan the distinct values.
+        """
+        previous = [t for t in self._term_codes if t in term]
+        if previous:
+            cached = self._term_codes[max(previous, key=len)]
+            by_col = {col: codes[_contains(self.lowered[col][codes], term)] for col, codes in cached.items()}
+        else:
+            by_col = None
+            text_columns = [col for col in self.columns if self.numeric[col] is None]
+            if TOKEN_RE.fullmatch(term):
+                if self._vocab is None:
+                    self._vocab = np.array(list(self.tokens), dtype=object)
+                matched = self._vocab[_contains(self._vocab, term)]
+                if len(matched) <= VOCAB_THRESHOLD:
+                    found = {}
+                    for tok in matched:
+                        for col, code in self.tokens[tok]:
+                            found.setdefault(col, set()).add(code)
+                    by_col = {col: np.fromiter(found.get(col, ()), dtype=np.int64) for col in text_columns}
+            if by_col is None:
+                by_col = {col: np.flatnonzero(_contains(self.lowered[col], term)) for col in text_columns}
+            for col in self.columns:
+                kind = self.numeric[col]
+                if kind == "other" or (kind == "int" and set(term) <= INT_CHARS):
+                    by_col[col] = np.flatnonzero(_contains(self.lowered[col], term))
+        self._term_codes.pop(term, None)
+        self._term_codes[term] = by_col
+        while len(self._term_codes) > TERM_CACHE_SIZE:
+            del self._term_codes[next(iter(self._term_codes))]
+        return by_col
+
+    def _keyword_mask(self, term, candidates):
+        """
+        Return a mask of candidate rows where any column contains the keyword term.
+        """
+        count = int(candidates.sum())
+        if count * DIRECT_RATIO < self.n:
+            positions = np.flatnonzero(candidates)
+            hits = np.zeros(count, dtype=bool)
+            for col in self.columns:
+                hits |= _contains(self.lowered[col][self.codes[col][positions]], term)
+            mask = np.zeros(self.n, dtype=bool)
+            mask[positions[hits]] = True
+            return mask
+        mask = np.zeros(self.n, dtype=bool)
+        for col, codes in self._matching_codes(term).items():
+            if len(codes):
+                mask |= self._rows_for_codes(col, codes)
+        return mask & candidates
+
+    def _evaluate(self, terms, candidates=None):
+        m = np.ones(self.n, dtype=bool) if candidates is None else candidates.copy()
+        # Column terms are cheap and selective, so they narrow the rows before keyword lookups
+        for col, val in sorted(terms, key=lambda t: t[0] is None):
+            if not m.any():
+                break
+            if col is None:
+                m &= self._keyword_mask(val, m)
+            else:
+                m &= self.equals_mask(col, val)
+        return m
+
+    def mask(self, query):
+        """
+        Evaluate the query and return a NumPy boolean mask over the rows of the DataFrame.
+        A query that only narrows the previous one (as-you-type) is evaluated on the previous result.
+        """
+        if not query.strip():
+            self._last = None
+            return np.ones(self.n, dtype=bool)
+        groups = parse_query(query, self.columns)
+        if len(groups) == 1:
+            terms = groups[0]
+            candidates = None
+            if self._last is not None:
+                last_terms, last_mask = self._last
+                if all(any(_implies(t, p) for t in terms) for p in last_terms):
+                    candidates = last_mask
+            result = self._evaluate(terms, candidates)
+            self._last = (terms, result)
+            return result.copy()
+        self._last = None
+        result = np.zeros(self.n, dtype=bool)
+        for terms in groups:
+            result |= self._evaluate(terms)
+        return result
+
+    def memory_usage(self):
+        """
+        Return the approximate memory used by the index in bytes.
+        """
+        total = 0
+        for col in self.columns:
+            rows, starts = self.postings[col]
+            total += self.codes[col].nbytes + rows.nbytes + starts.nbytes
+            total += sum(2 * len(v) + 100 for v in self.values[col])  # strings, lowered copies and dict slots
+        return total + 100 * len(self.tokens)
+
+    def keyword_mask(self, term, columns=None):
+        """
+        Return a mask of rows where any column, or any of the given columns, contains the keyword
+        term (case-insensitive).
+        """
+        if columns is None:
+            return self._keyword_mask(term.lower(), np.ones(self.n, dtype=bool))
+        mask = np.zeros(self.n, dtype=bool)
+        for col, codes in self._matching_codes(term.lower()).items():
+            if col in columns and len(codes):
+                mask |= self._rows_for_codes(col, codes)
+        return mask
+
+    def equals_mask(self, col, value):
+        """
+        Return a mask of rows whose displayed value in col equals value.
+        """
+        code = self.value_codes[col].get(value)
+        return self._rows_for_codes(col, [code]) if code is not None else np.zeros(self.n, dtype=bool)
+
+    def search(self, query):
+        """
+        Evaluate the query and return the matching rows by their DataFrame index labels.
+        """
+        return self.df.index[self.mask(query)]
+
+    def take(self, order):
+        """
+        Reorder the index after the DataFrame was reordered in place.
+        order[i] is the previous position of the row now at position i.
+        """
+        order = np.asarray(order)
+        inv = np.empty(len(order), dtype=np.int64)
+        inv[order] = np.arange(len(order))
+        for col in self.columns:
+            self.codes[col] = self.codes[col][order]
+            rows, starts = self.postings[col]
+            self.postings[col] = (inv[rows].astype(np.int32), starts)
+            self.moved[col] = {int(inv[r]) for r in self.moved[col]}
+        self._last = None
+
+    def update_cell(self, row, col, value):
+        """
+        Update the index for a single edited cell without rebuilding it.
+        """
+        text = str(value)
+        code = self.value_codes[col].get(text)
+        if code is None:
+            code = len(self.values[col])
+            self.values[col].append(text)
+            self.value_codes[col][text] = code
+            self.lowered[col] = np.append(self.lowered[col], text.lower())
+            if self.numeric[col] is None:
+                self._add_tokens(col, code, text.lower())
+        self.codes[col][row] = code
+        self.moved[col].add(row)
+        self._term_codes = {}
+        self._last = None
+
+class ScanSearch:
+    """
+    Unindexed search with the interface of TableSearch, used while a table's index is built.
+    Every query scans the displayed strings of the columns, converted once per column on first use.
+    """
+    def __init__(self, df):
+        self.df = df
+        self.columns = list(df.columns)
+        self.n = len(df)
+        self._lowered = {}  # col -> object array of lower-cased cell strings
+
+    def _strings(self, col):
+        if col not in self._lowered:
+            self._lowered[col] = np.array([str(v).lower() for v in self.df[col].tolist()], dtype=object)
+        return self._lowered[col]
+
+    def mask(self, query):
+        """
+        Evaluate the query and return a NumPy boolean mask over the rows of the DataFrame.
+        """
+        if not query.strip():
+            return np.ones(self.n, dtype=bool)
+        result = np.zeros(self.n, dtype=bool)
+        for terms in parse_query(query, self.columns):
+            m = np.ones(self.n, dtype=bool)
+            for col, val in terms:
+                m &= self.keyword_mask(val) if col is None else self.equals_mask(col, val)
+            result |= m
+        return result
+
+    def keyword_mask(self, term, columns=None):
+        mask = np.zeros(self.n, dtype=bool)
+        for col in self.columns if columns is None else columns:
+            mask |= _contains(self._strings(col), term.lower())
+        return mask
+
+    def equals_mask(self, col, value):
+        return np.array([str(v) == value for v in self.df[col].tolist()], dtype=bool)
+
+    def update_cell(self, row, col, value):
+        if col in self._lowered:
+            self._lowered[col][row] = str(value).lower()
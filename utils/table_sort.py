@@ -0,0 +1,71 @@
+from utils.lazy_import import LazyModule
+
+np = LazyModule("numpy")
+pd = LazyModule("pandas")
+
+class SortCache:
+    """
+    Sort orders of a DataFrame that leave the DataFrame itself untouched.
+    Each column is ranked once (equal values share a rank, missing values rank last), and its
+    ascending and descending permutations are stable argsorts of those ranks. Missing values
+    sort last in both directions, as in pandas. Multi-column sort keys are a lexsort over the ranks.
+    """
+    def __init__(self, df):
+        self.df = df
+        self._ranks = {}  # col -> dense rank per row
+        self._missing = {}  # col -> rank given to missing values
+        self._perms = {}  # (col, descending) -> permutation of positional rows
+
+    def ranks(self, col):
+        """
+        Return the dense rank of every row in col.
+        """
+        if col not in self._ranks:
+            series = self.df[col]
+            try:
+                codes, uniques = pd.factorize(series, sort=True)
+            except TypeError:
+                # Mixed types can't be compared, fall back to their displayed strings
+                codes, uniques = pd.factorize(series.astype(str), sort=True)
+            codes = codes.astype(np.int64)
+            codes[codes < 0] = len(uniques)
+            self._ranks[col] = codes
+            self._missing[col] = len(uniques)
+        return self._ranks[col]
+
+    def sort_key(self, col, descending=False):
+        """
+        Return the ranks of col, flipped for a descending sort with missing values kept last.
+        """
+        ranks = self.ranks(col)
+        if not descending:
+            return ranks
+        missing = self._missing[col]
+        return np.where(ranks == missing, missing, missing - 1 - ranks)
+
+    def permutation(self, col, descending=False):
+        """
+        Return the permutation of positional rows sorting col.
+        """
+        if (col, descending) not in self._perms:
+            self._perms[(col, descending)] = np.argsort(self.sort_key(col, descending), kind="stable")
+        return self._perms[(col, descending)]
+
+    def order(self, keys):
+        """
+        Return the positional rows in the order given by keys, a list of (column, descending).
+        """
+        if len(keys) == 1:
+            col, descending = keys[0]
+            return self.permutation(col, descending)
+        # lexsort uses the last key as the primary one
+        return np.lexsort([self.sort_key(col, descending) for col, descending in reversed(keys)])
+
+    def invalidate(self, col):
+        """
+        Forget the cached order of a column after one of its cells was edited.
+        """
+        self._ranks.pop(col, None)
+        self._missing.pop(col, None)
+        self._perms.pop((col, False), None)
+        self._perms.pop((col, True), None)
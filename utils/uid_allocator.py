@@ -0,0 +1,67 @@
+import os
+import threading
+
+class UidAllocator:
+    """
+    Hands out new UIDs for inserts, shared by every writer of one connection.
+    The highest UID of a table is read once, then contiguous ranges are given out from memory,
+    so two operations never get the same UID and a batch insert needs no MAX(UID) round-trip.
+    If the database file changes on disk other than through the app's own writes (see written()),
+    the known tables are checked against the database again; ranges only ever move up.
+    """
+    def __init__(self, conn, db_file):
+        self.conn = conn
+        self.db_file = db_file
+        self.next_uid = {}  # table -> next free UID
+        self._stamp = self._file_stamp()
+        # Allocations come from the Tk thread and database jobs. The lock is never held while
+        # querying: the query runs on the executor, where a job may be waiting for the lock.
+        self._lock = threading.Lock()
+
+    def _file_stamp(self):
+        try:
+            st = os.stat(self.db_file)
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+
+    def _high_water(self, table):
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(f"SELECT MAX(UID) FROM [{table}]")
+            row = cursor.fetchone()
+            return int(row[0]) if row and row[0] else 0
+        finally:
+            cursor.close()
+
+    def allocate(self, table, count=1):
+        """
+        Reserve count consecutive UIDs of table and return the first one.
+        UIDs of a range that ends up unused (e.g. a rolled back insert) are not given out again.
+        """
+        stamp = self._file_stamp()
+        with self._lock:
+            changed = stamp != self._stamp
+            if not changed and table in self.next_uid:
+                first = self.next_uid[table]
+                self.next_uid[table] += count
+                return first
+            # The file changed on disk or the table is new: re-read outside the lock
+            check = set(self.next_uid) if changed else set()
+            check.add(table)
+        marks = {t: self._high_water(t) for t in check}
+        with self._lock:
+            for t, mark in marks.items():
+                self.next_uid[t] = max(self.next_uid.get(t, 0), mark + 1)
+            if changed:
+                self._stamp = stamp
+            first = self.next_uid[table]
+            self.next_uid[table] += count
+            return first
+
+    def written(self):
+        """
+        Accept the file's new mtime after a commit by the app, whose UIDs came from here.
+        """
+        with self._lock:
+            self._stamp = self._file_stamp()
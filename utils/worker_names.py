@@ -0,0 +1,77 @@
+import threading
+from collections import OrderedDict
+
+# Access caps the number of parameters in one statement well above this
+BATCH_SIZE = 100
+
+class WorkerNames:
+    """
+    Resolves worker UIDs to names from tblWorker for one connection.
+    Names that are not cached yet are fetched in batched IN (...) queries and kept in an
+    LRU of max_size entries; a new resolver is made for every connection, so reconnecting
+    or opening another save starts from an empty cache.
+    """
+    def __init__(self, conn, max_size=20000):
+        self.conn = conn
+        self.max_size = max_size
+        self.names = OrderedDict()  # uid -> name
+        self.queries = 0
+        # Used from the Tk thread and from database jobs. Only held around the dict: the queries
+        # run on the executor, and holding it there could deadlock with a job waiting for it.
+        self._lock = threading.Lock()
+
+    def resolve(self, uids):
+        """
+        Return {uid: name} for the given worker UIDs, with "Unknown" for missing workers.
+        None and 0 are skipped.
+        """
+        wanted = list(dict.fromkeys(int(uid) for uid in uids if uid))
+        found = {}
+        missing = []
+        with self._lock:
+            for uid in wanted:
+                if uid in self.names:
+                    self.names.move_to_end(uid)
+                    found[uid] = self.names[uid]
+                else:
+                    missing.append(uid)
+        if not missing:
+            return found
+        fetched = {}
+        cursor = self.conn.cursor()
+        try:
+            for i in range(0, len(missing), BATCH_SIZE):
+                batch = missing[i:i + BATCH_SIZE]
+                qmarks = ",".join("?" * len(batch))
+                cursor.execute(f"SELECT UID, Name FROM tblWorker WHERE UID IN ({qmarks})", batch)
+                for row in cursor.fetchall():
+                    fetched[int(row[0])] = row[1]
+        finally:
+            cursor.close()
+        with self._lock:
+            self.queries += (len(missing) + BATCH_SIZE - 1) // BATCH_SIZE
+            for uid in missing:
+                found[uid] = fetched.get(uid, "Unknown")
+                self.names[uid] = found[uid]
+            while len(self.names) > self.max_size:
+                self.names.popitem(last=False)
+        return found
+
+    def name(self, uid):
+        """
+        Return the name of one worker, or "Unknown".
+        """
+        if not uid:
+            return "Unknown"
+        return self.resolve([uid])[int(uid)]
+
+    def team(self, uids, sep="|"):
+        """
+        Return the names of a team's members joined with sep.
+        """
+        names = self.resolve(uids)
+        return sep.join(names.get(int(uid), "Unknown") if uid else "Unknown" for uid in uids)
+
+    def clear(self):
+        with self._lock:
+            self.names.clear()